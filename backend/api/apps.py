@@ -1,6 +1,27 @@
+import logging
+import threading
 from django.apps import AppConfig
 
+logger = logging.getLogger("app")
+
 
 class MathProblemApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+
+        # OCRを専用ワーカーに任せる場合、Webのプロセスではモデルを読み込まない
+        if settings.OCR_MODEL_PRELOAD and settings.OCR_BACKEND == "local":
+            # 起動を遅らせないよう、モデルの読み込みはバックグラウンドで行う
+            threading.Thread(target=_preload_ocr_model, daemon=True).start()
+
+
+def _preload_ocr_model():
+    from api.ocr.services.model_registry import Pix2TextRegistry
+
+    try:
+        Pix2TextRegistry.get().preload()
+    except Exception as e:
+        logger.warning(f"OCRモデルの事前読み込みに失敗しました: {str(e)}")
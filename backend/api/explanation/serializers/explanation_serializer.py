@@ -3,12 +3,20 @@ from rest_framework import serializers
 
 class ExplanationRequestSerializer(serializers.Serializer):
     problem_id = serializers.UUIDField(help_text="プロジェクトID")
+    mode = serializers.ChoiceField(
+        choices=['sync', 'async'],
+        required=False,
+        help_text="PDFコンパイルの実行方式（sync: 同期 / async: ジョブとして非同期実行）"
+    )
 
 
 class ExplanationResponseSerializer(serializers.Serializer):
     explanation_id = serializers.UUIDField(help_text="解説ID")
     latex_code = serializers.CharField(help_text="解説のLaTeXコード")
-    pdf_url = serializers.URLField(help_text="解説PDFのURL")
+    pdf_url = serializers.URLField(
+        allow_null=True, help_text="解説PDFのURL（非同期実行の場合はnull）")
+    job_id = serializers.UUIDField(
+        allow_null=True, help_text="コンパイルジョブID（非同期実行の場合のみ）")
     version = serializers.IntegerField(help_text="バージョン番号")
     created_at = serializers.DateTimeField(help_text="作成日時")
 
@@ -2,6 +2,7 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
+from django.conf import settings
 from api.shared.views.base_api_view import BaseAPIView
 from api.explanation.serializers.explanation_serializer import (
     ExplanationRequestSerializer,
@@ -14,6 +15,11 @@ from app.utils.file_storage import FileStorage
 from api.explanation.services.explanation_service import (
     ExplanationService,
 )
+from api.latex.services.compile_job_service import (
+    enqueue_compile_job,
+    check_compile_admission,
+)
+from api.latex.services.exceptions import CompileQueueFullError
 from api.template.services.template_service import (
     get_user_template,
     get_system_default_template,
@@ -38,6 +44,8 @@ class ExplanationView(BaseAPIView):
             serializer.is_valid(raise_exception=True)
 
             problem_id = serializer.validated_data["problem_id"]
+            mode = serializer.validated_data.get(
+                "mode") or settings.LATEX_COMPILE_MODE
 
             try:
                 # select_relatedでuserを事前に取得（N+1問題を防止）
@@ -54,6 +62,8 @@ class ExplanationView(BaseAPIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
+            check_compile_admission(request.user, mode)
+
             problem_doc = ProblemLatexDocument.objects.select_related('problem').filter(
                 problem=problem,
                 is_confirmed=True
@@ -92,25 +102,50 @@ class ExplanationView(BaseAPIView):
             ).aggregate(max_version=Max('version'))['max_version'] or 0
             new_version = max_version + 1
 
-            from api.latex.services.pdf_service import PDFService
-            pdf_service = PDFService()
-            explanation_pdf_path = pdf_service.latex_to_pdf(
-                wrapped_explanation_latex,
-                output_filename=f"explanation_{problem.id}",
-                use_template=False
-            )
+            job_id = None
+            if mode == "async":
+                explanation_doc = Explanation.objects.create(
+                    problem=problem,
+                    source_problem_latex=problem_doc,
+                    latex_code=wrapped_explanation_latex,
+                    template=template,
+                    version=new_version,
+                    is_confirmed=False,
+                )
+                job = enqueue_compile_job(
+                    user,
+                    problem,
+                    "explanation",
+                    explanation_doc,
+                    output_filename=f"explanation_{problem.id}",
+                )
+                job_id = job.id
+                explanation_pdf_url = None
+            else:
+                from api.latex.services.pdf_service import PDFService
+                pdf_service = PDFService()
+                explanation_pdf_path = pdf_service.latex_to_pdf(
+                    wrapped_explanation_latex,
+                    output_filename=f"explanation_{problem.id}",
+                    use_template=False,
+                    user_id=user.id,
+                    build_key=f"{problem.id}_explanation",
+                    engine=template.engine or None,
+                )
 
-            explanation_doc = Explanation.objects.create(
-                problem=problem,
-                source_problem_latex=problem_doc,
-                latex_code=wrapped_explanation_latex,
-                pdf_path=explanation_pdf_path,
-                version=new_version,
-                is_confirmed=False,
-            )
+                explanation_doc = Explanation.objects.create(
+                    problem=problem,
+                    source_problem_latex=problem_doc,
+                    latex_code=wrapped_explanation_latex,
+                    template=template,
+                    pdf_path=explanation_pdf_path,
+                    engine=pdf_service.latex_command,
+                    version=new_version,
+                    is_confirmed=False,
+                )
 
-            explanation_pdf_url = FileStorage.get_file_url(
-                explanation_pdf_path)
+                explanation_pdf_url = FileStorage.get_file_url(
+                    explanation_pdf_path)
 
             response_serializer = ExplanationResponseSerializer(
                 {
@@ -118,6 +153,7 @@ class ExplanationView(BaseAPIView):
                     "latex_document_id": explanation_doc.id,  # 後方互換性のため
                     "latex_code": wrapped_explanation_latex,  # ラップされたLaTeXコードを返す
                     "pdf_url": explanation_pdf_url,
+                    "job_id": job_id,
                     "version": new_version,
                     "created_at": explanation_doc.created_at,
                 }
@@ -126,6 +162,13 @@ class ExplanationView(BaseAPIView):
             self.log_info(f"解説生成成功: Explanation {explanation_doc.id}")
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+        except CompileQueueFullError as e:
+            self.log_warning(f"解説生成: {str(e)}")
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(e.retry_after)},
+            )
         except Exception as e:
             self.log_error(f"解説生成エラー: {str(e)}")
             return Response(
@@ -1,6 +1,15 @@
 from api.latex.serializers.latex_serializer import (
     LatexRenderRequestSerializer,
     LatexRenderResponseSerializer,
+    CompileJobSerializer,
+    CompileBatchRequestSerializer,
+    CompileBatchSerializer,
 )
 
-__all__ = ["LatexRenderRequestSerializer", "LatexRenderResponseSerializer"]
+__all__ = [
+    "LatexRenderRequestSerializer",
+    "LatexRenderResponseSerializer",
+    "CompileJobSerializer",
+    "CompileBatchRequestSerializer",
+    "CompileBatchSerializer",
+]
@@ -17,8 +17,40 @@ class ExplanationLatexRenderRequestSerializer(serializers.Serializer):
     latex_code = serializers.CharField(help_text="編集されたLaTeXコード")
 
 
+class LatexTextPatchSerializer(serializers.Serializer):
+    start = serializers.IntegerField(min_value=0, help_text="置き換える範囲の開始位置（元のテキストでの位置。JavaScriptの文字列と同じUTF-16のコード単位）")
+    end = serializers.IntegerField(min_value=0, help_text="置き換える範囲の終了位置（UTF-16のコード単位。この位置の文字は含まない）")
+    text = serializers.CharField(
+        allow_blank=True, trim_whitespace=False, help_text="置き換える文字列（削除の場合は空文字列）")
+
+
+class LatexSourceRequestSerializer(serializers.Serializer):
+    """
+    LaTeXコードを全文（latex_code）、または保存済みバージョンに対する差分（base_document_id + patches）で受け取る
+    """
+    latex_code = serializers.CharField(required=False, help_text="編集されたLaTeXコード（全文）")
+    base_document_id = serializers.UUIDField(
+        required=False, allow_null=True, help_text="差分の元になるLaTeXドキュメントID（patchesを指定する場合は必須）"
+    )
+    patches = LatexTextPatchSerializer(
+        many=True, required=False, help_text="元のドキュメントのLaTeXコードに適用する差分のリスト")
+    base_checksum = serializers.RegexField(
+        r"^[0-9a-f]{64}$",
+        required=False,
+        help_text="元のドキュメントのLaTeXコードのSHA-256（一致しない場合は競合として409を返す）",
+    )
+
+    def validate(self, attrs):
+        if attrs.get("patches") is not None:
+            if not attrs.get("base_document_id"):
+                raise serializers.ValidationError("差分を指定する場合はbase_document_idが必要です")
+        elif not attrs.get("latex_code"):
+            raise serializers.ValidationError("latex_codeまたはpatchesのいずれかが必要です")
+        return attrs
+
+
 # 後方互換性のため、旧シリアライザーも残す
-class LatexRenderRequestSerializer(serializers.Serializer):
+class LatexRenderRequestSerializer(LatexSourceRequestSerializer):
     problem_id = serializers.UUIDField(help_text="プロジェクトID（必須）")
     document_type = serializers.ChoiceField(
         choices=['problem', 'explanation'],
@@ -27,7 +59,77 @@ class LatexRenderRequestSerializer(serializers.Serializer):
     latex_document_id = serializers.UUIDField(
         required=False, allow_null=True, help_text="LaTeXドキュメントID（存在する場合、バージョン管理用）"
     )
-    latex_code = serializers.CharField(help_text="編集されたLaTeXコード")
+    mode = serializers.ChoiceField(
+        choices=['sync', 'async'],
+        required=False,
+        help_text="コンパイルの実行方式（sync: 同期 / async: ジョブとして非同期実行）"
+    )
+    skip_validation = serializers.BooleanField(
+        required=False, default=False, help_text="コンパイル前の構文チェックを省略するかどうか"
+    )
+    preview_pages = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10,
+        help_text="プレビュー画像を生成するページ番号のリスト（同期実行の場合のみ）"
+    )
+    preview_dpi = serializers.IntegerField(
+        required=False, min_value=36, max_value=300, help_text="プレビュー画像の解像度（DPI）"
+    )
+
+
+class LatexEphemeralRenderRequestSerializer(LatexSourceRequestSerializer):
+    problem_id = serializers.UUIDField(help_text="プロジェクトID（必須）")
+    document_type = serializers.ChoiceField(
+        choices=['problem', 'explanation'],
+        help_text="ドキュメントタイプ（問題または解説）"
+    )
+    skip_validation = serializers.BooleanField(
+        required=False, default=False, help_text="コンパイル前の構文チェックを省略するかどうか"
+    )
+    preview_pages = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10,
+        help_text="プレビュー画像を生成するページ番号のリスト"
+    )
+    preview_dpi = serializers.IntegerField(
+        required=False, min_value=36, max_value=300, help_text="プレビュー画像の解像度（DPI）"
+    )
+
+
+class LatexRenderCommitRequestSerializer(serializers.Serializer):
+    preview_id = serializers.UUIDField(help_text="確定するプレビューのID")
+
+
+class LatexDraftUpdateRequestSerializer(serializers.Serializer):
+    latex_code = serializers.CharField(
+        allow_blank=True, trim_whitespace=False, help_text="編集中のLaTeXコード（全文）")
+    base_revision = serializers.IntegerField(
+        required=False, allow_null=True, help_text="編集元の下書きのリビジョン（指定した場合、他の保存との競合を検出する）"
+    )
+
+
+class LatexDraftPatchRequestSerializer(serializers.Serializer):
+    patches = LatexTextPatchSerializer(many=True, help_text="下書きに適用する差分のリスト")
+    base_revision = serializers.IntegerField(
+        required=False, allow_null=True, help_text="差分の元になった下書きのリビジョン"
+    )
+    base_document_id = serializers.UUIDField(
+        required=False, allow_null=True,
+        help_text="差分の元になるLaTeXドキュメントID（省略時は現在の下書きに適用する）"
+    )
+    base_checksum = serializers.RegexField(
+        r"^[0-9a-f]{64}$",
+        required=False,
+        help_text="差分の元になったLaTeXコードのSHA-256（一致しない場合は競合として409を返す）",
+    )
+
+
+class LatexDraftCommitRequestSerializer(serializers.Serializer):
+    confirm = serializers.BooleanField(
+        required=False, default=False, help_text="作成したバージョンを確認済みにするかどうか（確認済みにする場合はコンパイルする）"
+    )
 
 
 class ProblemLatexRenderResponseSerializer(serializers.Serializer):
@@ -47,6 +149,74 @@ class ExplanationLatexRenderResponseSerializer(serializers.Serializer):
 # 後方互換性のため、旧シリアライザーも残す
 class LatexRenderResponseSerializer(serializers.Serializer):
     latex_document_id = serializers.UUIDField(help_text="LaTeXドキュメントID")
-    pdf_url = serializers.URLField(help_text="生成されたPDFのURL")
+    pdf_url = serializers.URLField(
+        allow_null=True, help_text="生成されたPDFのURL（非同期実行の場合はnull）")
     version = serializers.IntegerField(help_text="バージョン番号")
     updated_at = serializers.DateTimeField(help_text="更新日時")
+    job_id = serializers.UUIDField(
+        allow_null=True, help_text="コンパイルジョブID（非同期実行の場合のみ）")
+    checksum = serializers.CharField(
+        required=False, help_text="保存したLaTeXコードのSHA-256（次の差分のbase_checksumに指定する）")
+    preview_urls = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="ページごとのプレビュー画像のURL（preview_pagesを指定した場合のみ）",
+    )
+
+
+class LatexEphemeralRenderResponseSerializer(serializers.Serializer):
+    preview_id = serializers.UUIDField(help_text="プレビューID（確定時に指定）")
+    pdf_url = serializers.CharField(help_text="一時的なPDFのURL（有効期限まで利用可能）")
+    expires_at = serializers.DateTimeField(help_text="プレビューの有効期限")
+    preview_urls = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="ページごとのプレビュー画像のURL（preview_pagesを指定した場合のみ）",
+    )
+
+
+class LatexDraftSerializer(serializers.Serializer):
+    problem_id = serializers.UUIDField(help_text="プロジェクトID")
+    document_type = serializers.CharField(help_text="ドキュメントタイプ（問題または解説）")
+    latex_code = serializers.CharField(help_text="編集中のLaTeXコード")
+    revision = serializers.IntegerField(help_text="下書きのリビジョン（保存されていない場合は0）")
+    checksum = serializers.CharField(help_text="下書きのLaTeXコードのSHA-256（次の差分のbase_checksumに指定する）")
+    updated_at = serializers.DateTimeField(allow_null=True, help_text="更新日時（保存されていない場合はnull）")
+
+
+class CompileJobSerializer(serializers.Serializer):
+    job_id = serializers.UUIDField(help_text="コンパイルジョブID")
+    status = serializers.CharField(help_text="ジョブの状態（queued/running/succeeded/failed/cancelled）")
+    document_type = serializers.CharField(help_text="ドキュメントタイプ（問題または解説）")
+    document_id = serializers.UUIDField(help_text="コンパイル対象のドキュメントID")
+    pdf_url = serializers.URLField(allow_null=True, help_text="生成されたPDFのURL（完了時のみ）")
+    error = serializers.CharField(allow_blank=True, help_text="失敗時のエラー内容")
+    created_at = serializers.DateTimeField(help_text="作成日時")
+    started_at = serializers.DateTimeField(allow_null=True, help_text="実行開始日時")
+    finished_at = serializers.DateTimeField(allow_null=True, help_text="実行終了日時")
+
+
+class CompileBatchRequestSerializer(serializers.Serializer):
+    document_type = serializers.ChoiceField(
+        choices=['problem', 'explanation'],
+        help_text="ドキュメントタイプ（問題または解説）"
+    )
+    document_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        help_text="コンパイルするドキュメントIDのリスト（省略時はproblem_idsで絞り込んだ最新バージョン）"
+    )
+    problem_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        help_text="対象のプロジェクトIDのリスト（省略時はすべてのプロジェクト）"
+    )
+
+
+class CompileBatchSerializer(serializers.Serializer):
+    batch_id = serializers.UUIDField(help_text="バッチID")
+    total = serializers.IntegerField(help_text="ジョブ数")
+    status_counts = serializers.DictField(
+        child=serializers.IntegerField(), help_text="状態ごとのジョブ数")
+    done = serializers.BooleanField(help_text="すべてのジョブが終了したかどうか")
+    items = CompileJobSerializer(many=True, required=False, help_text="ジョブごとの結果")
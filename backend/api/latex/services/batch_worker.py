@@ -0,0 +1,32 @@
+"""
+一括コンパイルの子プロセスで実行する処理
+子プロセスの起動時にモデルを読み込まないよう、Django関連のimportは関数内で行う
+"""
+
+
+def init_batch_process():
+    import django
+
+    django.setup()
+
+
+def compile_batch_item(item):
+    """
+    1件のドキュメントをコンパイルし、(ジョブID, PDFパス, 使用したエンジン, エラー内容)を返す
+    子プロセスではDBにアクセスせず、結果の保存は親プロセスでまとめて行う
+    """
+    from api.latex.services.pdf_service import PDFService
+
+    pdf_service = PDFService()
+    try:
+        pdf_path = pdf_service.latex_to_pdf(
+            item["latex_code"],
+            output_filename=item["output_filename"],
+            use_template=False,
+            user_id=item["user_id"],
+            build_key=item["build_key"],
+            engine=item["engine"] or None,
+        )
+        return item["job_id"], pdf_path, pdf_service.latex_command, ""
+    except Exception as e:
+        return item["job_id"], "", "", str(e)
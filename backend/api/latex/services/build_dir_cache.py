@@ -0,0 +1,102 @@
+import fcntl
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+
+BUILD_KEY_PATTERN = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class BuildDirectoryCache:
+    """
+    ドキュメントごとに再利用するビルドディレクトリの管理
+    .auxなどの中間ファイルを残すことで、再レンダリング時のLaTeXの実行回数を減らす
+    """
+
+    def __init__(self, root=None, max_dirs=None, max_idle_seconds=None):
+        self.root = Path(root or settings.LATEX_BUILD_DIR_ROOT)
+        self.max_dirs = max_dirs or settings.LATEX_BUILD_DIR_MAX_DIRS
+        self.max_idle_seconds = (
+            max_idle_seconds or settings.LATEX_BUILD_DIR_MAX_IDLE_SECONDS
+        )
+
+    def _dir_path(self, build_key):
+        return self.root / BUILD_KEY_PATTERN.sub("_", str(build_key))
+
+    @staticmethod
+    def _lock_path(dir_path):
+        return dir_path.with_name(f"{dir_path.name}.lock")
+
+    @staticmethod
+    def _open_locked(lock_path):
+        while True:
+            lock_file = open(lock_path, "a")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # 待っている間に削除されたロックファイルでなければ取得完了
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    @contextmanager
+    def acquire(self, build_key):
+        dir_path = self._dir_path(build_key)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        # 同じドキュメントのレンダリングが重なった場合は前のビルドの完了を待つ
+        lock_file = self._open_locked(self._lock_path(dir_path))
+        try:
+            dir_path.mkdir(exist_ok=True)
+            os.utime(dir_path)
+            yield str(dir_path)
+            os.utime(dir_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for dir_path in self.root.iterdir():
+            if not dir_path.is_dir():
+                continue
+            try:
+                entries.append((dir_path.stat().st_mtime, dir_path))
+            except OSError:
+                continue
+
+        entries.sort()
+        now = time.time()
+        excess = len(entries) - self.max_dirs
+        removed = 0
+        for mtime, dir_path in entries:
+            if excess <= 0 and now - mtime < self.max_idle_seconds:
+                break
+            if self._remove_if_idle(dir_path):
+                excess -= 1
+                removed += 1
+        return removed
+
+    def _remove_if_idle(self, dir_path):
+        lock_path = self._lock_path(dir_path)
+        try:
+            with open(lock_path, "a") as lock_file:
+                # 使用中のディレクトリは削除しない
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+                try:
+                    shutil.rmtree(dir_path, ignore_errors=True)
+                    lock_path.unlink()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError:
+            return False
+        return True
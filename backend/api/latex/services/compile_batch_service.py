@@ -0,0 +1,217 @@
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+from app.models.compile_job import CompileJob, CompileJobStatus
+from app.models.latex_document import DocumentType
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+from api.latex.services.batch_worker import init_batch_process, compile_batch_item
+from api.template.services.template_service import get_template_engine
+from api.latex.services.compile_job_service import job_owner, requeue_stale_jobs
+
+logger = logging.getLogger("app")
+
+
+def _document_model(document_type):
+    if document_type == DocumentType.PROBLEM:
+        return ProblemLatexDocument
+    return Explanation
+
+
+def select_batch_documents(document_type, document_ids=None, problem_ids=None, user=None,
+                           latest_only=True):
+    """
+    一括コンパイルの対象ドキュメントを取得
+    ドキュメントIDを指定しない場合は、問題ごとの最新バージョンを対象にする
+    """
+    model = _document_model(document_type)
+    queryset = model.objects.select_related("problem")
+    if user is not None:
+        queryset = queryset.filter(problem__user=user)
+
+    if document_ids:
+        return queryset.filter(id__in=document_ids).order_by("created_at")
+
+    queryset = queryset.filter(problem__deleted_at__isnull=True)
+    if problem_ids:
+        queryset = queryset.filter(problem_id__in=problem_ids)
+    if latest_only:
+        latest_ids = model.objects.filter(
+            problem=OuterRef("problem")
+        ).order_by("-version").values("id")[:1]
+        queryset = queryset.filter(id=Subquery(latest_ids))
+    return queryset.order_by("created_at")
+
+
+def create_compile_batch(documents, document_type):
+    """
+    対象ドキュメントごとにジョブを登録し、バッチIDを返す
+    通常のレンダリングと異なり、新しいバージョンは作成しない
+    """
+    batch_id = uuid.uuid4()
+    CompileJob.objects.bulk_create(
+        [
+            CompileJob(
+                user_id=document.problem.user_id,
+                problem_id=document.problem_id,
+                document_type=document_type,
+                document_id=document.id,
+                output_filename=f"latex_{document.id}",
+                batch_id=batch_id,
+            )
+            for document in documents
+        ],
+        batch_size=500,
+    )
+    return batch_id
+
+
+def _claim_batch_jobs(batch_id, statuses, limit):
+    with transaction.atomic():
+        jobs = list(
+            CompileJob.objects.select_for_update(skip_locked=True)
+            .filter(batch_id=batch_id, status__in=statuses)
+            .order_by("created_at")[:limit]
+        )
+        started_at = timezone.now()
+        owner = job_owner()
+        CompileJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=CompileJobStatus.RUNNING, started_at=started_at, error="", **owner
+        )
+    for job in jobs:
+        job.status = CompileJobStatus.RUNNING
+        job.started_at = started_at
+        for field, value in owner.items():
+            setattr(job, field, value)
+    return jobs
+
+
+def _load_batch_items(jobs):
+    documents = {}
+    for document_type in {job.document_type for job in jobs}:
+        document_ids = [job.document_id for job in jobs if job.document_type == document_type]
+        documents.update(
+            _document_model(document_type).objects.select_related("template").in_bulk(document_ids)
+        )
+
+    items = []
+    missing_jobs = []
+    for job in jobs:
+        document = documents.get(job.document_id)
+        if document is None:
+            missing_jobs.append(job)
+            continue
+        items.append({
+            "job_id": job.id,
+            "latex_code": document.latex_code,
+            "output_filename": job.output_filename or f"latex_{document.id}",
+            "user_id": job.user_id,
+            "build_key": f"{job.problem_id}_{job.document_type}",
+            "engine": get_template_engine(document.template),
+        })
+    return items, documents, missing_jobs
+
+
+def _save_batch_results(jobs, documents, results):
+    jobs_by_id = {job.id: job for job in jobs}
+    finished_at = timezone.now()
+    updated_documents = {}
+    for job_id, pdf_path, engine, error in results:
+        job = jobs_by_id[job_id]
+        job.finished_at = finished_at
+        if error:
+            job.status = CompileJobStatus.FAILED
+            job.error = error
+            continue
+
+        job.status = CompileJobStatus.SUCCEEDED
+        job.pdf_path = pdf_path
+        document = documents[job.document_id]
+        document.pdf_path = pdf_path
+        document.engine = engine
+        document.updated_at = finished_at
+        updated_documents.setdefault(job.document_type, []).append(document)
+
+    # 1件ずつ保存せず、まとめて更新する
+    with transaction.atomic():
+        for document_type, document_list in updated_documents.items():
+            _document_model(document_type).objects.bulk_update(
+                document_list, ["pdf_path", "engine", "updated_at"]
+            )
+        CompileJob.objects.bulk_update(
+            list(jobs_by_id.values()), ["status", "pdf_path", "error", "finished_at"]
+        )
+
+
+def requeue_running_jobs(batch_id, lease_seconds=None):
+    """
+    中断された一括コンパイルで実行中のまま残ったジョブを待機中に戻す
+    同じホストで中断されたプロセスのジョブはすぐに、他のホストのジョブは実行開始から一定時間を過ぎた場合に戻す
+    """
+    lease_seconds = (
+        lease_seconds if lease_seconds is not None
+        else settings.LATEX_COMPILE_JOB_LEASE_SECONDS
+    )
+    return requeue_stale_jobs(CompileJob.objects.filter(batch_id=batch_id), lease_seconds)
+
+
+def run_compile_batch(batch_id, workers=None, retry_failed=False, on_result=None):
+    """
+    バッチのジョブをプロセスプールで並列にコンパイルする
+    完了したジョブは再実行しないため、中断後に同じバッチIDで再開できる
+    """
+    workers = workers or settings.LATEX_BATCH_WORKERS or os.cpu_count() or 1
+    statuses = [CompileJobStatus.QUEUED]
+    if retry_failed:
+        statuses.append(CompileJobStatus.FAILED)
+
+    # 子プロセスにDB接続を引き継がないよう、起動前に接続を閉じる
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_batch_process,
+    ) as executor:
+        while True:
+            jobs = _claim_batch_jobs(batch_id, statuses, workers * settings.LATEX_BATCH_CHUNK_SIZE)
+            if not jobs:
+                break
+
+            items, documents, missing_jobs = _load_batch_items(jobs)
+            results = [
+                (job.id, "", "", "コンパイル対象のドキュメントが見つかりません")
+                for job in missing_jobs
+            ]
+            results.extend(executor.map(compile_batch_item, items))
+            _save_batch_results(jobs, documents, results)
+
+            for job_id, pdf_path, _, error in results:
+                if error:
+                    logger.warning(f"一括コンパイル失敗: CompileJob {job_id}: {error}")
+                if on_result:
+                    on_result(job_id, pdf_path, error)
+
+    return compile_batch_status(batch_id)
+
+
+def compile_batch_status(batch_id):
+    status_counts = dict(
+        CompileJob.objects.filter(batch_id=batch_id)
+        .values_list("status")
+        .annotate(count=Count("id"))
+    )
+    return {
+        "batch_id": batch_id,
+        "total": sum(status_counts.values()),
+        "status_counts": status_counts,
+        "done": not (
+            status_counts.get(CompileJobStatus.QUEUED, 0)
+            or status_counts.get(CompileJobStatus.RUNNING, 0)
+        ),
+    }
@@ -0,0 +1,221 @@
+import math
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from django.test import override_settings
+from api.latex.services.pdf_service import PDFService
+
+CORPUS_DIR = Path(__file__).parent.parent / "benchmark_corpus"
+ENGINES = ["pdflatex", "platex", "uplatex"]
+# 比較に使う指標（値が大きいほど遅い・メモリを使う）
+COMPARED_METRICS = ["p50_seconds", "p95_seconds", "cpu_seconds", "max_rss_kb", "p95_rss_kb"]
+
+
+def load_corpus(names=None):
+    """
+    ベンチマーク用のLaTeXドキュメントを読み込む
+    各ファイルの先頭の「% engines: ...」でコンパイル可能なエンジンを指定する
+    """
+    documents = []
+    for path in sorted(CORPUS_DIR.glob("*.tex")):
+        if names and path.stem not in names:
+            continue
+        source = path.read_text(encoding="utf-8")
+        engines = ENGINES
+        first_line = source.splitlines()[0] if source else ""
+        if first_line.startswith("% engines:"):
+            engines = [engine.strip() for engine in first_line.split(":", 1)[1].split(",")]
+        documents.append({"name": path.stem, "source": source, "engines": engines})
+    return documents
+
+
+def _percentile(values, ratio):
+    ordered = sorted(values)
+    index = max(0, math.ceil(ratio * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _cache_settings(cache_root, media_root, use_pdf_cache):
+    # 本番のキャッシュを読み書きしないよう、キャッシュのディレクトリはすべて計測用のものに差し替える
+    return {
+        "MEDIA_ROOT": media_root,
+        "LATEX_CACHE_ROOT": cache_root,
+        "LATEX_COMPILE_CACHE_ENABLED": use_pdf_cache,
+        "LATEX_COMPILE_CACHE_DIR": cache_root / "pdf",
+        "LATEX_FORMAT_CACHE_DIR": cache_root / "formats",
+        "LATEX_FAILURE_CACHE_DIR": cache_root / "failures",
+        "LATEX_PREVIEW_CACHE_DIR": cache_root / "previews",
+        "LATEX_BUILD_DIR_ROOT": cache_root / "builds",
+        "LATEX_SCHEDULER_ENABLED": False,
+    }
+
+
+def _children_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _compile_once(engine, document, cache_root, media_root, use_pdf_cache):
+    with override_settings(
+        LATEX_TO_PDF_COMMAND=engine,
+        **_cache_settings(cache_root, media_root, use_pdf_cache),
+    ):
+        pdf_service = PDFService()
+        cpu_started = _children_cpu_seconds() + time.process_time()
+        started = time.perf_counter()
+        pdf_service.latex_to_pdf(
+            document["source"],
+            output_filename="benchmark",
+            use_template=False,
+            build_key=f"benchmark_{document['name']}",
+        )
+        seconds = time.perf_counter() - started
+        cpu_seconds = _children_cpu_seconds() + time.process_time() - cpu_started
+    return seconds, cpu_seconds, pdf_service.last_compile_metrics or {}
+
+
+def _summarize(samples, failures, errors):
+    if not samples:
+        return {"runs": 0, "failures": failures, "errors": errors[:3]}
+    seconds = [sample["seconds"] for sample in samples]
+    # PDFキャッシュにヒットした場合などTeXを実行していない計測はメモリ量の集計から除く
+    rss = [sample["max_rss_kb"] for sample in samples if sample["max_rss_kb"] is not None]
+    summary = {
+        "runs": len(samples),
+        "failures": failures,
+        "errors": errors[:3],
+        "p50_seconds": _percentile(seconds, 0.5),
+        "p95_seconds": _percentile(seconds, 0.95),
+        "mean_seconds": sum(seconds) / len(seconds),
+        "cpu_seconds": sum(sample["cpu_seconds"] for sample in samples) / len(samples),
+        "passes": samples[-1]["passes"],
+        "cache_hit": samples[-1]["cache_hit"],
+    }
+    if rss:
+        # コンパイルごとの子プロセスの最大常駐メモリ量（Linuxではキロバイト単位）
+        summary["max_rss_kb"] = max(rss)
+        summary["p95_rss_kb"] = _percentile(rss, 0.95)
+    return summary
+
+
+def benchmark_document(engine, document, runs, mode, work_root):
+    """
+    1つのドキュメントを指定回数コンパイルして計測する
+    cold: 実行ごとに空のキャッシュを使う
+    warm: キャッシュを使い回す（PDFキャッシュは無効にしてTeXの実行時間を計測する）
+    warm_hit: PDFキャッシュも含めて使い回す
+    """
+    media_root = work_root / "media"
+    shared_cache_root = work_root / f"cache_{engine}_{document['name']}_{mode}"
+    samples = []
+    errors = []
+    failures = 0
+
+    if mode != "cold":
+        # 計測前にキャッシュを作成しておく
+        try:
+            _compile_once(engine, document, shared_cache_root, media_root, mode == "warm_hit")
+        except Exception as e:
+            return _summarize([], runs, [str(e)])
+
+    for run in range(runs):
+        cache_root = shared_cache_root
+        if mode == "cold":
+            cache_root = work_root / f"cache_{engine}_{document['name']}_cold_{run}"
+        try:
+            seconds, cpu_seconds, metrics = _compile_once(
+                engine, document, cache_root, media_root, mode == "warm_hit")
+        except Exception as e:
+            failures += 1
+            errors.append(str(e))
+            continue
+        finally:
+            if mode == "cold":
+                shutil.rmtree(cache_root, ignore_errors=True)
+        samples.append({
+            "seconds": seconds,
+            "cpu_seconds": cpu_seconds,
+            "passes": metrics.get("passes", 0),
+            "cache_hit": metrics.get("cache_hit", False),
+            "max_rss_kb": metrics.get("max_rss_kb"),
+        })
+    return _summarize(samples, failures, errors)
+
+
+def _engine_version(engine):
+    try:
+        result = subprocess.run(
+            [engine, "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.splitlines()[0] if result.stdout else None
+
+
+def run_benchmark(engines=None, documents=None, runs=5, modes=("cold", "warm")):
+    """
+    エンジン・ドキュメント・キャッシュ状態ごとにlatex_to_pdfを計測し、結果をdictで返す
+    """
+    engines = engines or ENGINES
+    documents = documents if documents is not None else load_corpus()
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "engines": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="latex_benchmark_") as work_dir:
+        work_root = Path(work_dir)
+        for engine in engines:
+            if shutil.which(engine) is None:
+                result["engines"][engine] = {"skipped": "コマンドが見つかりません"}
+                continue
+
+            engine_result = {"version": _engine_version(engine), "documents": {}}
+            for document in documents:
+                if engine not in document["engines"]:
+                    continue
+                engine_result["documents"][document["name"]] = {
+                    mode: benchmark_document(engine, document, runs, mode, work_root)
+                    for mode in modes
+                }
+            result["engines"][engine] = engine_result
+    return result
+
+
+def compare_with_baseline(result, baseline, threshold=0.1):
+    """
+    ベースラインと比較し、指標ごとの変化率を返す
+    変化率がthresholdを超えて悪化した（遅くなった・メモリ使用量が増えた）ものをregressionとする
+    """
+    comparisons = []
+    for engine, engine_result in result["engines"].items():
+        baseline_documents = baseline.get("engines", {}).get(engine, {}).get("documents", {})
+        for name, modes in engine_result.get("documents", {}).items():
+            for mode, summary in modes.items():
+                baseline_summary = baseline_documents.get(name, {}).get(mode)
+                if not baseline_summary:
+                    continue
+                for metric in COMPARED_METRICS:
+                    current = summary.get(metric)
+                    previous = baseline_summary.get(metric)
+                    if current is None or not previous:
+                        continue
+                    change = (current - previous) / previous
+                    comparisons.append({
+                        "engine": engine,
+                        "document": name,
+                        "mode": mode,
+                        "metric": metric,
+                        "baseline": previous,
+                        "current": current,
+                        "change": change,
+                        "regression": change > threshold,
+                    })
+    return comparisons
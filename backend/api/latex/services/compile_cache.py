@@ -0,0 +1,125 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from django.conf import settings
+
+
+class PDFCompileCache:
+    """
+    LaTeXソースのハッシュをキーとしたコンパイル済みPDFのキャッシュ
+    ディスク上に保存し、合計サイズが上限を超えたら最終アクセスが古いものから削除する
+    """
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or settings.LATEX_COMPILE_CACHE_DIR)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None
+            else settings.LATEX_COMPILE_CACHE_MAX_BYTES
+        )
+
+    @staticmethod
+    def make_key(full_latex, engine, template_name=None):
+        hasher = hashlib.sha256()
+        for part in (engine, template_name or "", full_latex):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    def get(self, key):
+        entry_path = self._entry_path(key)
+        try:
+            # 最終アクセス時刻を更新してLRUの順序に反映する
+            os.utime(entry_path)
+        except OSError:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return entry_path
+
+    def put(self, key, pdf_file_path):
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 書き込み途中のファイルを読まれないよう一時ファイルからリネームする
+        tmp_path = entry_path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            # 作業ディレクトリのPDFは保存時に移動されるため、リンクせずにコピーして別のファイルにする
+            shutil.copyfile(pdf_file_path, tmp_path)
+            os.replace(tmp_path, entry_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self.evict()
+        return entry_path
+
+    def evict(self):
+        entries = []
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*/*.pdf"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @classmethod
+    def _count(cls, hit):
+        with cls._lock:
+            if hit:
+                cls._hits += 1
+            else:
+                cls._misses += 1
+
+    def stats(self):
+        entries = 0
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*/*.pdf"):
+            try:
+                total_bytes += entry_path.stat().st_size
+            except OSError:
+                continue
+            entries += 1
+
+        with self._lock:
+            hits = self._hits
+            misses = self._misses
+
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
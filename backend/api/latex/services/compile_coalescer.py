@@ -0,0 +1,143 @@
+import logging
+import os
+import re
+import signal
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from django.conf import settings
+from api.latex.services.exceptions import CompileCancelledError
+
+logger = logging.getLogger("app")
+
+MARKER_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def kill_process_group(process):
+    # TeXが起動した子プロセスごとまとめて終了させる
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class CancelToken:
+    """
+    実行中のコンパイルを取り消すためのトークン
+    取り消されると実行中のTeXのプロセスグループを終了させる
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            kill_process_group(process)
+
+    def check(self):
+        if self.is_cancelled():
+            raise CompileCancelledError("より新しいコンパイル要求により取り消されました")
+
+    def attach(self, process):
+        with self._lock:
+            self._processes.add(process)
+        # 登録前に取り消されていた場合もプロセスを残さない
+        if self.is_cancelled():
+            kill_process_group(process)
+
+    def detach(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+
+class CoalescedCancelToken(CancelToken):
+    """
+    同じキーの最新のコンパイルを表すマーカーファイルを確認するトークン
+    他のプロセスで新しいコンパイルが始まりマーカーが書き換えられると取り消されたとみなす
+    """
+
+    def __init__(self, marker_path):
+        super().__init__()
+        self.marker_path = Path(marker_path)
+        self.token_id = uuid.uuid4().hex
+
+    def _read_marker(self):
+        try:
+            return self.marker_path.read_text(encoding="ascii")
+        except (OSError, ValueError):
+            return None
+
+    def publish(self):
+        # 一時ファイルに書き込んでからリネームし、書き込み途中の内容が読まれないようにする
+        try:
+            self.marker_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.marker_path.parent, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="ascii") as f:
+                    f.write(self.token_id)
+                os.replace(tmp_path, self.marker_path)
+            except OSError:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"コンパイルの取り消し用マーカーを作成できませんでした: {str(e)}")
+
+    def unpublish(self):
+        # 新しいコンパイルのマーカーに置き換わっている場合は残す
+        if self._read_marker() == self.token_id:
+            try:
+                self.marker_path.unlink()
+            except OSError:
+                pass
+
+    def is_cancelled(self):
+        if super().is_cancelled():
+            return True
+        marker = self._read_marker()
+        if marker and marker != self.token_id:
+            self._cancelled.set()
+            return True
+        return False
+
+
+class CompileCoalescer:
+    """
+    同じ（問題, ドキュメントタイプ）に対するコンパイルをまとめ、古い要求を取り消す
+    同じプロセス内のコンパイルはすぐに終了させ、他のプロセスのコンパイルは
+    LATEX_COALESCER_DIRのマーカーファイルを介して実行中の確認時に取り消す
+    """
+    _lock = threading.Lock()
+    _latest = {}
+
+    @staticmethod
+    def _marker_path(key):
+        name = MARKER_NAME_PATTERN.sub("_", "_".join(str(part) for part in key))
+        return Path(settings.LATEX_COALESCER_DIR) / name
+
+    @classmethod
+    def begin(cls, key):
+        token = CoalescedCancelToken(cls._marker_path(key))
+        token.publish()
+        with cls._lock:
+            previous = cls._latest.get(key)
+            cls._latest[key] = token
+        if previous:
+            previous.cancel()
+        return token
+
+    @classmethod
+    def finish(cls, key, token):
+        with cls._lock:
+            if cls._latest.get(key) is token:
+                del cls._latest[key]
+        token.unpublish()
@@ -0,0 +1,254 @@
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from app.models.compile_job import CompileJob, CompileJobStatus
+from api.latex.services.pdf_service import PDFService
+from api.latex.services.exceptions import CompileQueueFullError, CompileCancelledError
+from api.latex.services.compile_coalescer import CancelToken
+from api.latex.services.compile_scheduler import CompileScheduler
+from api.template.services.template_service import get_template_engine
+
+logger = logging.getLogger("app")
+
+
+def _check_queued_limit(user):
+    # 一括コンパイルのジョブは通常のレンダリングの上限に含めない
+    queued_count = CompileJob.objects.filter(
+        user=user, status=CompileJobStatus.QUEUED, batch_id__isnull=True
+    ).count()
+    if queued_count >= settings.LATEX_SCHEDULER_PER_USER_MAX_QUEUED:
+        raise CompileQueueFullError(
+            "待機中のコンパイルジョブ数の上限に達しています。しばらくしてから再試行してください",
+            retry_after=max(1, queued_count),
+        )
+
+
+def check_compile_admission(user, mode):
+    # ドキュメントの作成やOCRなどの重い処理の前に、コンパイルを受け付けられるか確認する
+    if mode == "async":
+        _check_queued_limit(user)
+    elif settings.LATEX_SCHEDULER_ENABLED:
+        CompileScheduler.get().check_admission(user.id)
+
+
+def enqueue_compile_job(user, problem, document_type, document, output_filename="") -> CompileJob:
+    _check_queued_limit(user)
+
+    # 同じドキュメントの古いジョブは取り消す（実行中のジョブはワーカーが検知して終了させる）
+    CompileJob.objects.filter(
+        problem=problem,
+        document_type=document_type,
+        status__in=[CompileJobStatus.QUEUED, CompileJobStatus.RUNNING],
+    ).update(status=CompileJobStatus.CANCELLED, finished_at=timezone.now())
+
+    return CompileJob.objects.create(
+        user=user,
+        problem=problem,
+        document_type=document_type,
+        document_id=document.id,
+        output_filename=output_filename,
+    )
+
+
+class CompileJobCancelToken(CancelToken):
+    """
+    DB上でジョブが取り消されたかを定期的に確認するトークン
+    """
+
+    def __init__(self, job_id, check_interval=1.0):
+        super().__init__()
+        self.job_id = job_id
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+
+    def is_cancelled(self):
+        if super().is_cancelled():
+            return True
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        if CompileJob.objects.filter(id=self.job_id, status=CompileJobStatus.CANCELLED).exists():
+            self._cancelled.set()
+            return True
+        return False
+
+
+def job_owner():
+    """
+    ジョブを取り出したプロセスを表すホスト名とプロセスID
+    """
+    return {"worker_host": socket.gethostname(), "worker_pid": os.getpid()}
+
+
+def _owner_is_gone(worker_host, worker_pid):
+    # 生存を確認できるのは同じホストのプロセスだけ（他のホストのジョブは実行開始日時で判断する）
+    if not worker_pid or worker_host != socket.gethostname() or worker_pid == os.getpid():
+        return False
+    try:
+        os.kill(worker_pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def requeue_stale_jobs(jobs, lease_seconds):
+    """
+    実行中のまま残ったジョブを待機中に戻す
+    実行開始からlease_secondsを過ぎたジョブと、同じホストで取り出したプロセスが終了しているジョブを対象にする
+    """
+    running = jobs.filter(status=CompileJobStatus.RUNNING)
+    orphaned_ids = [
+        job_id
+        for job_id, worker_host, worker_pid in running.filter(
+            worker_host=socket.gethostname()
+        ).values_list("id", "worker_host", "worker_pid")
+        if _owner_is_gone(worker_host, worker_pid)
+    ]
+    expired = Q(started_at__lt=timezone.now() - timedelta(seconds=lease_seconds))
+    return running.filter(expired | Q(id__in=orphaned_ids)).update(
+        status=CompileJobStatus.QUEUED, started_at=None, worker_host="", worker_pid=None
+    )
+
+
+def requeue_stale_compile_jobs():
+    """
+    ワーカーの異常終了などで実行中のまま残ったジョブを待機中に戻す
+    残ったジョブはユーザーごとの同時実行数に数えられるため、戻さないとそのユーザーのジョブが実行されなくなる
+    """
+    return requeue_stale_jobs(CompileJob.objects.all(), settings.LATEX_COMPILE_JOB_LEASE_SECONDS)
+
+
+def _fair_user_order():
+    # 実行中のジョブが少ないユーザーを優先し、同数なら最も古いジョブを持つユーザーから取り出す
+    running_counts = dict(
+        CompileJob.objects.filter(status=CompileJobStatus.RUNNING, batch_id__isnull=True)
+        .values_list("user_id")
+        .annotate(count=Count("id"))
+    )
+    queued_users = (
+        CompileJob.objects.filter(status=CompileJobStatus.QUEUED, batch_id__isnull=True)
+        .values("user_id")
+        .annotate(oldest=Min("created_at"))
+    )
+    candidates = [
+        (running_counts.get(row["user_id"], 0), row["oldest"], row["user_id"])
+        for row in queued_users
+        if running_counts.get(row["user_id"], 0) < settings.LATEX_SCHEDULER_PER_USER_LIMIT
+    ]
+    return [user_id for _, _, user_id in sorted(candidates)]
+
+
+def _claim(queryset):
+    # 複数ワーカーが同じジョブを取り出さないように行ロックを取得する
+    with transaction.atomic():
+        job = (
+            queryset.select_for_update(skip_locked=True)
+            .filter(status=CompileJobStatus.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = CompileJobStatus.RUNNING
+        job.started_at = timezone.now()
+        for field, value in job_owner().items():
+            setattr(job, field, value)
+        job.save(update_fields=["status", "started_at", "worker_host", "worker_pid"])
+        return job
+
+
+def claim_next_job() -> CompileJob | None:
+    for user_id in _fair_user_order():
+        job = _claim(CompileJob.objects.filter(user_id=user_id, batch_id__isnull=True))
+        if job is not None:
+            return job
+
+    # 通常のレンダリングのジョブがない場合だけ、一括コンパイルのジョブを古い順に実行する
+    # （compile_batch --batchでプロセスプールを使って並列に処理することもできる）
+    return _claim(CompileJob.objects.filter(batch_id__isnull=False))
+
+
+def _finish_job(job: CompileJob, **fields) -> bool:
+    # 実行中に取り消されたジョブや、再実行のために他のワーカーが取り出したジョブの状態を上書きしないよう、
+    # このワーカーが実行中の場合だけ更新する
+    fields["finished_at"] = timezone.now()
+    updated = CompileJob.objects.filter(
+        pk=job.pk,
+        status=CompileJobStatus.RUNNING,
+        worker_host=job.worker_host,
+        worker_pid=job.worker_pid,
+    ).update(**fields)
+    job.refresh_from_db()
+    return updated > 0
+
+
+def run_compile_job(job: CompileJob) -> CompileJob:
+    try:
+        document = job.get_document()
+        pdf_service = PDFService()
+        pdf_path = pdf_service.latex_to_pdf(
+            document.latex_code,
+            output_filename=job.output_filename or f"latex_{document.id}",
+            use_template=False,
+            user_id=job.user_id,
+            cancel_token=CompileJobCancelToken(job.id),
+            build_key=f"{job.problem_id}_{job.document_type}",
+            engine=get_template_engine(document.template) or None,
+        )
+
+        with transaction.atomic():
+            if not _finish_job(job, status=CompileJobStatus.SUCCEEDED, pdf_path=pdf_path):
+                logger.info(f"コンパイルジョブ取り消し: CompileJob {job.id}")
+                return job
+            # 取り消されたジョブの結果でドキュメントのPDFを置き換えない
+            document.pdf_path = pdf_path
+            document.engine = pdf_service.latex_command
+            document.save(update_fields=["pdf_path", "engine", "updated_at"])
+        logger.info(f"コンパイルジョブ成功: CompileJob {job.id}")
+    except CompileCancelledError:
+        _finish_job(job, status=CompileJobStatus.CANCELLED)
+        logger.info(f"コンパイルジョブ取り消し: CompileJob {job.id}")
+    except Exception as e:
+        if _finish_job(job, status=CompileJobStatus.FAILED, error=str(e)):
+            logger.error(f"コンパイルジョブエラー: CompileJob {job.id}: {str(e)}")
+        else:
+            logger.info(f"コンパイルジョブ取り消し: CompileJob {job.id}")
+
+    return job
+
+
+def compile_job_stats(window=timedelta(hours=1)):
+    since = timezone.now() - window
+    finished_jobs = CompileJob.objects.filter(
+        finished_at__gte=since, started_at__isnull=False
+    ).values_list("created_at", "started_at", "finished_at")
+
+    # 待ち時間と実行時間を分けて集計する
+    wait_seconds = []
+    run_seconds = []
+    for created_at, started_at, finished_at in finished_jobs:
+        wait_seconds.append((started_at - created_at).total_seconds())
+        run_seconds.append((finished_at - started_at).total_seconds())
+
+    status_counts = dict(
+        CompileJob.objects.filter(created_at__gte=since)
+        .values_list("status")
+        .annotate(count=Count("id"))
+    )
+    return {
+        "window_seconds": int(window.total_seconds()),
+        "status_counts": status_counts,
+        "queued": CompileJob.objects.filter(status=CompileJobStatus.QUEUED).count(),
+        "avg_queue_wait_seconds": sum(wait_seconds) / len(wait_seconds) if wait_seconds else 0.0,
+        "avg_run_seconds": sum(run_seconds) / len(run_seconds) if run_seconds else 0.0,
+    }
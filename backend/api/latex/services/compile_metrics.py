@@ -0,0 +1,46 @@
+import threading
+
+
+class CompileMetrics:
+    """
+    プロセス内のLaTeXコンパイル統計（実行パス数・所要時間など）
+    """
+    _lock = threading.Lock()
+    _compiles = 0
+    _failures = 0
+    _seconds_total = 0.0
+    _passes_total = 0
+    _passes_histogram = {}
+    _engines = {}
+    _containment = {}
+
+    @classmethod
+    def record(cls, engine, passes, seconds, succeeded=True):
+        with cls._lock:
+            cls._compiles += 1
+            if not succeeded:
+                cls._failures += 1
+            cls._seconds_total += seconds
+            cls._passes_total += passes
+            cls._passes_histogram[passes] = cls._passes_histogram.get(passes, 0) + 1
+            cls._engines[engine] = cls._engines.get(engine, 0) + 1
+
+    @classmethod
+    def record_containment(cls, limit):
+        # リソース制限の超過によってTeXのプロセスを終了させた回数
+        with cls._lock:
+            cls._containment[limit] = cls._containment.get(limit, 0) + 1
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            compiles = cls._compiles
+            return {
+                "compiles": compiles,
+                "failures": cls._failures,
+                "avg_seconds": cls._seconds_total / compiles if compiles else 0.0,
+                "avg_passes": cls._passes_total / compiles if compiles else 0.0,
+                "passes": dict(cls._passes_histogram),
+                "engines": dict(cls._engines),
+                "containment": dict(cls._containment),
+            }
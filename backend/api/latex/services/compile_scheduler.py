@@ -0,0 +1,249 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from api.latex.services.exceptions import CompileQueueFullError
+
+try:
+    import fcntl
+except ImportError:  # Windowsではホスト全体の制限を行わない
+    fcntl = None
+
+# 統計に使用する直近の計測数
+SAMPLE_SIZE = 1000
+# ホスト全体の実行枠が空くのを確認する間隔（秒）
+HOST_SLOT_POLL_INTERVAL = 0.05
+
+
+class HostSlots:
+    """
+    同じホストの全プロセスで共有する実行枠
+    枠ごとのロックファイルにflockをかけ、プロセスが異常終了した場合もOSが解放する
+    """
+
+    def __init__(self, lock_dir):
+        self.lock_dir = Path(lock_dir)
+
+    def try_acquire(self, name, count):
+        """
+        name の枠をcount個のうち1つ取得し、ロックしたファイル記述子を返す（空きがなければNone）
+        """
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(count):
+            fd = os.open(self.lock_dir / f"{name}.{index}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    @staticmethod
+    def release(fd):
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class _Ticket:
+    def __init__(self, user_key):
+        self.user_key = user_key
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class CompileScheduler:
+    """
+    LaTeXコンパイルの同時実行数を制御するスケジューラ
+    全体の上限とユーザーごとの上限を守りつつ、待機中のユーザー間で順番に実行枠を割り当てる
+    順番の管理はプロセス内で行い、上限はHostSlotsでホスト全体（gunicornの全ワーカーとコンパイルワーカー）に適用する
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_concurrent=None, per_user_limit=None,
+                 max_queued=None, per_user_max_queued=None, max_wait_seconds=None,
+                 host_slots=None):
+        self.max_concurrent = (
+            max_concurrent or settings.LATEX_SCHEDULER_MAX_CONCURRENT or os.cpu_count() or 1
+        )
+        self.per_user_limit = per_user_limit or settings.LATEX_SCHEDULER_PER_USER_LIMIT
+        self.max_queued = max_queued or settings.LATEX_SCHEDULER_MAX_QUEUED
+        self.per_user_max_queued = (
+            per_user_max_queued or settings.LATEX_SCHEDULER_PER_USER_MAX_QUEUED
+        )
+        self.max_wait_seconds = max_wait_seconds or settings.LATEX_SCHEDULER_MAX_WAIT_SECONDS
+        if host_slots is None and fcntl is not None and settings.LATEX_SCHEDULER_HOST_WIDE:
+            host_slots = HostSlots(settings.LATEX_SCHEDULER_LOCK_DIR)
+        self.host_slots = host_slots
+
+        self._condition = threading.Condition()
+        # ユーザーごとの待機チケット（挿入順がラウンドロビンの順番）
+        self._waiting = {}
+        self._running = {}
+        self._running_total = 0
+        self._rejected = 0
+        self._wait_samples = deque(maxlen=SAMPLE_SIZE)
+        self._run_samples = deque(maxlen=SAMPLE_SIZE)
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _queued_total(self):
+        return sum(len(tickets) for tickets in self._waiting.values())
+
+    def _retry_after(self):
+        # 待ち行列を捌くのにかかるおおよその秒数
+        avg_run = (
+            sum(self._run_samples) / len(self._run_samples) if self._run_samples else 5.0
+        )
+        queued = self._queued_total() + 1
+        return max(1, math.ceil(avg_run * queued / self.max_concurrent))
+
+    def check_admission(self, user_key):
+        with self._condition:
+            self._check_admission(user_key)
+
+    def _check_admission(self, user_key):
+        if self._queued_total() >= self.max_queued:
+            self._rejected += 1
+            raise CompileQueueFullError(
+                "コンパイルの待ち行列が混雑しています。しばらくしてから再試行してください",
+                retry_after=self._retry_after(),
+            )
+        if len(self._waiting.get(user_key, ())) >= self.per_user_max_queued:
+            self._rejected += 1
+            raise CompileQueueFullError(
+                "同時に実行できるコンパイル数の上限に達しています。しばらくしてから再試行してください",
+                retry_after=self._retry_after(),
+            )
+
+    def _dispatch(self):
+        while self._running_total < self.max_concurrent:
+            granted_user = None
+            for user_key, tickets in self._waiting.items():
+                if tickets and self._running.get(user_key, 0) < self.per_user_limit:
+                    granted_user = user_key
+                    break
+            if granted_user is None:
+                return
+
+            tickets = self._waiting.pop(granted_user)
+            ticket = tickets.popleft()
+            # 実行枠を得たユーザーは順番の最後に回す
+            if tickets:
+                self._waiting[granted_user] = tickets
+
+            ticket.granted = True
+            self._running[granted_user] = self._running.get(granted_user, 0) + 1
+            self._running_total += 1
+            self._wait_samples.append(time.monotonic() - ticket.enqueued_at)
+            self._condition.notify_all()
+
+    def _release(self, user_key, run_seconds=None):
+        self._running[user_key] -= 1
+        if self._running[user_key] == 0:
+            del self._running[user_key]
+        self._running_total -= 1
+        if run_seconds is not None:
+            self._run_samples.append(run_seconds)
+        self._dispatch()
+
+    def _wait_timeout_error(self):
+        self._rejected += 1
+        return CompileQueueFullError(
+            "コンパイルの待ち時間が上限を超えました。しばらくしてから再試行してください",
+            retry_after=self._retry_after(),
+        )
+
+    def _acquire_host_slots(self, user_key, deadline):
+        # 他のプロセスと合わせた同時実行数を制限する（ユーザーの枠、全体の枠の順に取得する）
+        fds = []
+        try:
+            for name, count in ((f"user_{user_key}", self.per_user_limit),
+                                ("global", self.max_concurrent)):
+                while True:
+                    fd = self.host_slots.try_acquire(name, count)
+                    if fd is not None:
+                        fds.append(fd)
+                        break
+                    if time.monotonic() >= deadline:
+                        with self._condition:
+                            raise self._wait_timeout_error()
+                    time.sleep(HOST_SLOT_POLL_INTERVAL)
+        except BaseException:
+            for fd in fds:
+                self.host_slots.release(fd)
+            raise
+        return fds
+
+    @contextmanager
+    def slot(self, user_key):
+        with self._condition:
+            self._check_admission(user_key)
+            ticket = _Ticket(user_key)
+            self._waiting.setdefault(user_key, deque()).append(ticket)
+            self._dispatch()
+
+            deadline = ticket.enqueued_at + self.max_wait_seconds
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting[user_key].remove(ticket)
+                    if not self._waiting[user_key]:
+                        del self._waiting[user_key]
+                    raise self._wait_timeout_error()
+                self._condition.wait(remaining)
+
+        host_fds = []
+        if self.host_slots is not None:
+            try:
+                host_fds = self._acquire_host_slots(user_key, deadline)
+            except BaseException:
+                with self._condition:
+                    self._release(user_key)
+                raise
+
+        started = time.monotonic()
+        try:
+            yield started - ticket.enqueued_at
+        finally:
+            for fd in host_fds:
+                self.host_slots.release(fd)
+            with self._condition:
+                self._release(user_key, time.monotonic() - started)
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return {"count": 0, "avg": 0.0, "p95": 0.0}
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "avg": sum(ordered) / len(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        }
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "per_user_limit": self.per_user_limit,
+                # Falseの場合、上限はこのプロセス内だけに適用される
+                "host_wide": self.host_slots is not None,
+                "running": self._running_total,
+                "queued": self._queued_total(),
+                "rejected": self._rejected,
+                "queue_wait_seconds": self._summary(self._wait_samples),
+                "run_seconds": self._summary(self._run_samples),
+            }
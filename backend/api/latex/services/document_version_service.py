@@ -0,0 +1,92 @@
+from django.db.models import Max
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+from app.utils.file_storage import FileStorage
+from api.latex.services.pdf_service import PDFService
+from api.template.services.template_service import get_template_engine
+
+
+def get_document_template(problem, document_type):
+    """
+    最新バージョンのドキュメントが作成時に使用したテンプレートを返す
+    """
+    document_model = ProblemLatexDocument if document_type == "problem" else Explanation
+    latest = document_model.objects.select_related('template').filter(
+        problem=problem
+    ).order_by('-version').first()
+    return latest.template if latest else None
+
+
+def create_document_version(problem, document_type, latex_code):
+    """
+    プロジェクトに問題LaTeXドキュメントまたは解説の新しいバージョンを作成する
+    新しいバージョンは前のバージョンのテンプレート（エンジンの指定）を引き継ぐ
+    """
+    template = get_document_template(problem, document_type)
+    if document_type == "problem":
+        max_version = ProblemLatexDocument.objects.filter(
+            problem=problem
+        ).aggregate(max_version=Max('version'))['max_version'] or 0
+
+        return ProblemLatexDocument.objects.create(
+            problem=problem,
+            latex_code=latex_code,
+            version=max_version + 1,
+            template=template,
+        )
+
+    max_version = Explanation.objects.filter(
+        problem=problem
+    ).aggregate(max_version=Max('version'))['max_version'] or 0
+
+    source_problem_latex = ProblemLatexDocument.objects.filter(
+        problem=problem,
+        is_confirmed=True
+    ).order_by('-version').first()
+
+    if not source_problem_latex:
+        source_problem_latex = ProblemLatexDocument.objects.filter(
+            problem=problem
+        ).order_by('-version').first()
+
+    return Explanation.objects.create(
+        problem=problem,
+        source_problem_latex=source_problem_latex,
+        latex_code=latex_code,
+        version=max_version + 1,
+        template=template,
+    )
+
+
+def get_document(document_type, document_id):
+    document_model = ProblemLatexDocument if document_type == "problem" else Explanation
+    return document_model.objects.select_related('problem').get(id=document_id)
+
+
+def get_document_pdf_url(document_type, document):
+    """
+    PDFのURLを返す。まだコンパイルしていないドキュメントは、初回表示時にコンパイルするURLを返す
+    """
+    if document.pdf_path:
+        return FileStorage.get_file_url(document.pdf_path)
+    return f"/api/latex/documents/{document_type}/{document.id}/pdf/"
+
+
+def compile_document(document, document_type, user):
+    """
+    保存済みのドキュメントをコンパイルし、PDFのパスと使用したエンジンを記録する
+    """
+    pdf_service = PDFService()
+    pdf_path = pdf_service.latex_to_pdf(
+        document.latex_code,
+        output_filename=f"latex_{document.id}",
+        use_template=False,
+        user_id=user.id,
+        skip_validation=True,
+        build_key=f"{document.problem_id}_{document_type}",
+        engine=get_template_engine(document.template) or None,
+    )
+    document.pdf_path = pdf_path
+    document.engine = pdf_service.latex_command
+    document.save(update_fields=["pdf_path", "engine", "updated_at"])
+    return pdf_path
@@ -0,0 +1,150 @@
+import hashlib
+from django.db import IntegrityError, transaction
+from app.models.latex_draft import LatexDraft
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+from api.latex.services.exceptions import (
+    LatexPatchError,
+    DraftConflictError,
+    LatexSourceConflictError,
+)
+
+
+def _code_point_index(utf16_text, offset):
+    # UTF-16のコード単位での位置を、Pythonの文字列の位置（コードポイント）に変換する
+    try:
+        return len(utf16_text[:offset * 2].decode("utf-16-le"))
+    except UnicodeDecodeError:
+        raise LatexPatchError(f"差分の位置がサロゲートペアの途中を指しています: {offset}")
+
+
+def apply_text_patches(text, patches):
+    """
+    テキストに差分を適用する
+    各差分はstart・end（元のテキストでの位置）とtext（置き換える文字列）を持ち、位置が重なってはならない
+    位置はブラウザのJavaScriptの文字列と同じUTF-16のコード単位で数える（絵文字などは2単位）
+    """
+    ordered = sorted(patches, key=lambda patch: (patch["start"], patch["end"]))
+    utf16_text = text.encode("utf-16-le")
+    utf16_length = len(utf16_text) // 2
+    previous_end = 0
+    for patch in ordered:
+        if patch["start"] > patch["end"] or patch["end"] > utf16_length:
+            raise LatexPatchError(
+                f"差分の範囲が不正です: {patch['start']}〜{patch['end']}（UTF-16での長さ: {utf16_length}）")
+        if patch["start"] < previous_end:
+            raise LatexPatchError("差分の範囲が重なっています")
+        previous_end = patch["end"]
+
+    ranges = [
+        (_code_point_index(utf16_text, patch["start"]), _code_point_index(utf16_text, patch["end"]))
+        for patch in ordered
+    ]
+    # 後ろの差分から適用すると、前の差分の位置がずれない
+    for patch, (start, end) in reversed(list(zip(ordered, ranges))):
+        text = text[:start] + patch["text"] + text[end:]
+    return text
+
+
+def text_checksum(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def patch_source(base_text, patches, base_checksum=None):
+    """
+    差分の元になったテキストがクライアントの持つ内容と一致することを確認してから差分を適用する
+    """
+    if base_checksum is not None:
+        current_checksum = text_checksum(base_text)
+        if base_checksum != current_checksum:
+            raise LatexSourceConflictError(
+                "差分の元になったLaTeXコードがサーバー上の内容と一致しません", current_checksum)
+    return apply_text_patches(base_text, patches)
+
+
+def get_base_document(problem, document_type, document_id):
+    document_model = ProblemLatexDocument if document_type == "problem" else Explanation
+    return document_model.objects.get(id=document_id, problem=problem)
+
+
+def resolve_request_source(problem, document_type, validated_data):
+    """
+    リクエストのLaTeXコードを返す。差分で送られた場合は元のバージョンに適用して全文を組み立てる
+    """
+    patches = validated_data.get("patches")
+    if patches is None:
+        return validated_data["latex_code"]
+
+    base_document = get_base_document(problem, document_type, validated_data["base_document_id"])
+    return patch_source(base_document.latex_code, patches, validated_data.get("base_checksum"))
+
+
+def latest_document(problem, document_type):
+    document_model = ProblemLatexDocument if document_type == "problem" else Explanation
+    return document_model.objects.filter(problem=problem).order_by('-version').first()
+
+
+def get_draft(problem, document_type):
+    """
+    下書きを返す。下書きがなければ最新バージョンのLaTeXコードを元にした未保存の下書きを返す
+    """
+    draft = LatexDraft.objects.filter(problem=problem, document_type=document_type).first()
+    if draft:
+        return draft
+
+    document = latest_document(problem, document_type)
+    return LatexDraft(
+        problem=problem,
+        document_type=document_type,
+        latex_code=document.latex_code if document else "",
+    )
+
+
+def save_draft(problem, document_type, latex_code=None, patches=None, base_revision=None,
+               base_checksum=None, base_document=None):
+    """
+    下書きを全文または差分で更新する。TeXは実行しない
+    base_revisionを指定した場合、その後に別の保存があれば競合としてエラーにする
+    差分はbase_documentを指定した場合はそのバージョンのLaTeXコード、それ以外は現在の下書きに適用する
+    """
+    with transaction.atomic():
+        draft = _lock_draft(problem, document_type)
+
+        if base_revision is not None and base_revision != draft.revision:
+            raise DraftConflictError(
+                "下書きが他の編集によって更新されています", draft.revision)
+
+        if patches is not None:
+            base_text = base_document.latex_code if base_document else draft.latex_code
+            draft.latex_code = patch_source(base_text, patches, base_checksum)
+        else:
+            draft.latex_code = latex_code
+        draft.revision += 1
+        draft.save()
+    return draft
+
+
+def _lock_draft(problem, document_type):
+    # 下書きの行をロックして返す。初回の保存が重なった場合も一意制約で1件に揃える
+    drafts = LatexDraft.objects.select_for_update().filter(
+        problem=problem, document_type=document_type)
+    draft = drafts.first()
+    if draft is not None:
+        return draft
+
+    draft = get_draft(problem, document_type)
+    try:
+        with transaction.atomic():
+            draft.save()
+    except IntegrityError:
+        # 他のリクエストが先に作成した下書きを使う
+        pass
+    return drafts.get()
+
+
+def discard_draft(problem, document_type, latex_code=None):
+    # 保存されたバージョンと同じ内容の下書きは不要になる
+    drafts = LatexDraft.objects.filter(problem=problem, document_type=document_type)
+    if latex_code is not None:
+        drafts = drafts.filter(latex_code=latex_code)
+    drafts.delete()
@@ -0,0 +1,66 @@
+import re
+from django.conf import settings
+
+DOCUMENT_CLASS_PATTERN = re.compile(r"\\documentclass\s*(?:\[([^\]]*)\])?\s*\{([^}]*)\}")
+USE_PACKAGE_PATTERN = re.compile(r"\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}")
+COMMENT_PATTERN = re.compile(r"(?<!\\)%.*")
+# ひらがな・カタカナ・CJK統合漢字・全角記号
+CJK_CHAR_PATTERN = re.compile(
+    r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff01-\uff60]"
+)
+
+ENGINE_NAMES = ["pdflatex", "platex", "uplatex"]
+# upLaTeX専用のクラス
+UPLATEX_CLASSES = {"ujarticle", "ujreport", "ujbook", "utarticle", "utreport", "utbook"}
+# pLaTeX/upLaTeX用のクラス（uplatexオプションがなければ日本語用のエンジンを使う）
+JAPANESE_CLASSES = {
+    "jsarticle", "jsreport", "jsbook",
+    "jarticle", "jreport", "jbook",
+    "tarticle", "treport", "tbook",
+}
+# エンジンをクラスオプションで指定するクラス
+ENGINE_OPTION_CLASSES = {"bxjsarticle", "bxjsreport", "bxjsbook", "bxjsslide"}
+# pLaTeX/upLaTeXでのみ使えるパッケージ
+JAPANESE_PACKAGES = {"otf", "plext", "okumacro", "pxcjkcat"}
+# pdfLaTeXで日本語を扱うパッケージ
+PDFLATEX_CJK_PACKAGES = {"CJK", "CJKutf8"}
+
+
+def _strip_comments(latex_code):
+    return "\n".join(COMMENT_PATTERN.sub("", line) for line in latex_code.splitlines())
+
+
+def select_engine(latex_code, template_engine=None):
+    """
+    ドキュメントの内容からコンパイルに使うエンジンを選択する
+    テンプレートでエンジンが指定されている場合はそれを優先する
+    """
+    if template_engine:
+        return template_engine
+
+    source = _strip_comments(latex_code)
+
+    class_match = DOCUMENT_CLASS_PATTERN.search(source)
+    if class_match:
+        options = {option.strip() for option in (class_match.group(1) or "").split(",")}
+        class_name = class_match.group(2).strip()
+        if class_name in UPLATEX_CLASSES:
+            return "uplatex"
+        if class_name in JAPANESE_CLASSES:
+            return "uplatex" if "uplatex" in options else settings.LATEX_JAPANESE_ENGINE
+        if class_name in ENGINE_OPTION_CLASSES:
+            for engine in ENGINE_NAMES:
+                if engine in options:
+                    return engine
+
+    packages = set()
+    for package_match in USE_PACKAGE_PATTERN.finditer(source):
+        packages.update(name.strip() for name in package_match.group(1).split(","))
+    if packages & JAPANESE_PACKAGES:
+        return settings.LATEX_JAPANESE_ENGINE
+    if packages & PDFLATEX_CJK_PACKAGES:
+        return "pdflatex"
+
+    if CJK_CHAR_PATTERN.search(source):
+        return settings.LATEX_JAPANESE_ENGINE
+    return settings.LATEX_LATIN_ENGINE
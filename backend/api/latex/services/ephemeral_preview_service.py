@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from django.conf import settings
+
+PREVIEW_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class EphemeralPreviewStore:
+    """
+    DBに保存しないプレビュー用PDFの一時保存領域
+    PDFとソースなどのメタデータをMEDIA_ROOT配下に置き、有効期限を過ぎたものは削除する
+    確定（コミット）時は保存済みのPDFをそのまま使い、再コンパイルしない
+    """
+
+    def __init__(self, folder_name=None, ttl_seconds=None):
+        self.folder_name = folder_name or settings.LATEX_EPHEMERAL_PREVIEW_FOLDER
+        self.root = Path(settings.MEDIA_ROOT) / self.folder_name
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None
+            else settings.LATEX_EPHEMERAL_PREVIEW_TTL_SECONDS
+        )
+
+    def _entry_path(self, preview_id):
+        if not PREVIEW_ID_PATTERN.match(preview_id):
+            return None
+        return self.root / f"{preview_id}.json"
+
+    def save(self, user_id, problem_id, document_type, latex_code, pdf_path, engine):
+        """
+        コンパイル済みのPDFをプレビューとして登録し、プレビューIDと有効期限を返す
+        """
+        preview_id = uuid.uuid4().hex
+        created_at = time.time()
+        entry = {
+            "user_id": str(user_id),
+            "problem_id": str(problem_id),
+            "document_type": document_type,
+            "latex_code": latex_code,
+            "pdf_path": pdf_path,
+            "engine": engine,
+            "created_at": created_at,
+        }
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(preview_id)
+        tmp_path = entry_path.with_name(f".{preview_id}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self.evict()
+        return preview_id, self.expires_at(created_at)
+
+    def expires_at(self, created_at):
+        return datetime.fromtimestamp(created_at + self.ttl_seconds, tz=dt_timezone.utc)
+
+    def get(self, preview_id, user_id):
+        """
+        有効期限内で、指定ユーザーが作成したプレビューのメタデータを返す
+        """
+        entry_path = self._entry_path(preview_id)
+        if entry_path is None:
+            return None
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            return None
+        if entry.get("user_id") != str(user_id):
+            return None
+        if not os.path.isfile(os.path.join(settings.MEDIA_ROOT, entry["pdf_path"])):
+            return None
+        return entry
+
+    def discard(self, preview_id):
+        # 確定済みのプレビューIDを再利用させない（PDFは有効期限まで表示できるよう残す）
+        entry_path = self._entry_path(preview_id)
+        if entry_path is None:
+            return
+        try:
+            entry_path.unlink()
+        except OSError:
+            pass
+
+    def evict(self):
+        # 有効期限を過ぎたPDFとメタデータを削除する
+        removed = 0
+        expires_before = time.time() - self.ttl_seconds
+        if not self.root.is_dir():
+            return removed
+        for entry_path in self.root.iterdir():
+            try:
+                if entry_path.is_file() and entry_path.stat().st_mtime < expires_before:
+                    entry_path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self):
+        entries = 0
+        total_bytes = 0
+        if self.root.is_dir():
+            for entry_path in self.root.iterdir():
+                try:
+                    total_bytes += entry_path.stat().st_size
+                except OSError:
+                    continue
+                if entry_path.suffix == ".json":
+                    entries += 1
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
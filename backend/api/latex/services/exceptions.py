@@ -0,0 +1,81 @@
+class CompileQueueFullError(Exception):
+    """
+    コンパイルの待ち行列が上限に達したため受け付けられない場合の例外
+    """
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LatexValidationError(ValueError):
+    """
+    コンパイル前の静的チェックでLaTeXソースに誤りが見つかった場合の例外
+    errorsには行・列・メッセージを持つ辞書のリストが入る
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        details = "\n".join(
+            f"{error['line']}行目 {error['column']}列目: {error['message']}"
+            for error in errors[:10]
+        )
+        super().__init__(f"LaTeXの構文エラーが見つかりました:\n{details}")
+
+
+class LatexCompileError(RuntimeError):
+    """
+    LaTeXのコンパイルに失敗した場合の例外
+    diagnosticsにはログから抽出したファイル・行・メッセージ・不足パッケージを持つ辞書のリストが入る
+    """
+
+    def __init__(self, message, diagnostics=None, cacheable=True):
+        super().__init__(message)
+        self.diagnostics = diagnostics or []
+        # 失敗のキャッシュから返された場合はTrue
+        self.cached = False
+        # 同じソースで再現する失敗の場合はTrue（シグナルで終了させられた場合などは失敗のキャッシュに記録しない）
+        self.cacheable = cacheable
+
+
+class CompileResourceLimitError(LatexCompileError):
+    """
+    TeXのプロセスがCPU時間・ファイルサイズなどのリソース制限を超えたため中止した場合の例外
+    limitには超過した制限の名前が入る
+    """
+
+    def __init__(self, message, limit, cacheable=True):
+        super().__init__(message, cacheable=cacheable)
+        self.limit = limit
+
+
+class CompileCancelledError(Exception):
+    """
+    同じドキュメントに対するより新しいコンパイル要求によって取り消された場合の例外
+    """
+
+
+class LatexPatchError(ValueError):
+    """
+    差分（パッチ）をLaTeXコードに適用できない場合の例外
+    """
+
+
+class DraftConflictError(Exception):
+    """
+    下書きが指定したリビジョン以降に更新されていた場合の例外
+    """
+
+    def __init__(self, message, current_revision):
+        super().__init__(message)
+        self.current_revision = current_revision
+
+
+class LatexSourceConflictError(Exception):
+    """
+    差分の元になったLaTeXコードのチェックサムがサーバー上の内容と一致しない場合の例外
+    """
+
+    def __init__(self, message, current_checksum):
+        super().__init__(message)
+        self.current_checksum = current_checksum
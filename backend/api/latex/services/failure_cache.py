@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+from api.latex.services.exceptions import LatexCompileError, CompileResourceLimitError
+
+
+class CompileFailureCache:
+    """
+    同じソース・エンジンで必ず失敗するコンパイルの結果を短時間キャッシュする
+    再送されたリクエストではTeXを起動せずに前回のエラーと診断情報を返す
+    キーはPDFCompileCacheと同じくソースとエンジンのハッシュで、テンプレートやエンジンを変えると別のキーになる
+    """
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    def __init__(self, cache_dir=None, ttl_seconds=None):
+        self.cache_dir = Path(cache_dir or settings.LATEX_FAILURE_CACHE_DIR)
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None
+            else settings.LATEX_FAILURE_CACHE_TTL_SECONDS
+        )
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def _engine_mtime(engine):
+        engine_path = shutil.which(engine)
+        if not engine_path:
+            return None
+        try:
+            return os.stat(engine_path).st_mtime
+        except OSError:
+            return None
+
+    def _is_fresh(self, entry, engine):
+        created_at = entry.get("created_at", 0)
+        if time.time() - created_at > self.ttl_seconds:
+            return False
+        # エラーを記録した後にエンジンが更新されていれば結果が変わる可能性がある
+        engine_mtime = self._engine_mtime(engine)
+        return engine_mtime is None or engine_mtime <= created_at
+
+    def get(self, key, engine):
+        """
+        キャッシュされた失敗があれば、そのエラーを再現した例外を返す
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        if not self._is_fresh(entry, engine):
+            try:
+                entry_path.unlink()
+            except OSError:
+                pass
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        if entry.get("limit"):
+            error = CompileResourceLimitError(entry["message"], entry["limit"])
+        else:
+            error = LatexCompileError(entry["message"], entry.get("diagnostics"))
+        error.cached = True
+        return error
+
+    def put(self, key, engine, error):
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "engine": engine,
+            "message": str(error),
+            "diagnostics": error.diagnostics,
+            "limit": getattr(error, "limit", None),
+            "created_at": time.time(),
+        }
+
+        # 書き込み途中のファイルを読まれないよう一時ファイルからリネームする
+        tmp_path = entry_path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self.evict()
+
+    def evict(self):
+        # 有効期限を過ぎたエントリを削除する
+        removed = 0
+        expires_before = time.time() - self.ttl_seconds
+        for entry_path in self.cache_dir.glob("*/*.json"):
+            try:
+                if entry_path.stat().st_mtime < expires_before:
+                    entry_path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @classmethod
+    def _count(cls, hit):
+        with cls._lock:
+            if hit:
+                cls._hits += 1
+            else:
+                cls._misses += 1
+
+    def stats(self):
+        entries = sum(1 for _ in self.cache_dir.glob("*/*.json"))
+        with self._lock:
+            hits = self._hits
+            misses = self._misses
+
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import uuid
+from pathlib import Path
+from django.conf import settings
+from api.latex.services.compile_coalescer import kill_process_group
+from api.latex.services.process_limits import limited_command
+
+DOCUMENT_BEGIN_PATTERN = re.compile(r"^[^%\n]*?(\\begin\s*\{document\})", re.MULTILINE)
+
+
+class PreambleFormatCache:
+    """
+    テンプレートのプリアンブルをダンプしたTeXフォーマット（.fmt）のキャッシュ
+    プリアンブルのハッシュをキーとして保存し、本文のみをフォーマットに対してコンパイルできるようにする
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir or settings.LATEX_FORMAT_CACHE_DIR)
+
+    @staticmethod
+    def split_preamble(full_latex):
+        """
+        ドキュメントをプリアンブルと本文に分ける
+        本文の前にはプリアンブルの行数だけ改行を入れ、TeXが報告する行番号を元のソースと一致させる
+        """
+        match = DOCUMENT_BEGIN_PATTERN.search(full_latex)
+        if not match:
+            return None, None
+        preamble = full_latex[:match.start(1)]
+        if "\\documentclass" not in preamble:
+            return None, None
+        body = "\n" * preamble.count("\n") + full_latex[match.start(1):]
+        return preamble, body
+
+    @staticmethod
+    def make_key(preamble, engine):
+        hasher = hashlib.sha256()
+        hasher.update(engine.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(preamble.encode("utf-8"))
+        return f"preamble_{hasher.hexdigest()[:32]}"
+
+    def _format_path(self, key):
+        return self.cache_dir / f"{key}.fmt"
+
+    def _failed_marker_path(self, key):
+        return self.cache_dir / f"{key}.failed"
+
+    @staticmethod
+    def _engine_mtime(engine):
+        engine_path = shutil.which(engine)
+        if not engine_path:
+            return None
+        try:
+            return os.stat(engine_path).st_mtime
+        except OSError:
+            return None
+
+    def _is_fresh(self, path, engine):
+        try:
+            fmt_mtime = path.stat().st_mtime
+        except OSError:
+            return False
+        # エンジン本体がフォーマット作成後に更新されていれば古いフォーマットとみなす
+        engine_mtime = self._engine_mtime(engine)
+        return engine_mtime is None or engine_mtime <= fmt_mtime
+
+    def texformats_env(self):
+        # 末尾の区切り文字でkpathseaの既定の検索パスも残す
+        return dict(os.environ, TEXFORMATS=f"{self.cache_dir}{os.pathsep}")
+
+    def get_or_build(self, preamble, engine):
+        key = self.make_key(preamble, engine)
+        format_path = self._format_path(key)
+
+        if self._is_fresh(format_path, engine):
+            return key
+        # ダンプできないプリアンブルは毎回ビルドを試みない
+        if self._is_fresh(self._failed_marker_path(key), engine):
+            return None
+
+        if self._build(key, preamble, engine):
+            return key
+        return None
+
+    def _build(self, key, preamble, engine):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            preamble_path = os.path.join(temp_dir, "preamble.tex")
+            with open(preamble_path, "w", encoding="utf-8") as f:
+                f.write(preamble)
+                f.write("\n\\dump\n")
+
+            command = [engine, "-ini", f"-jobname={key}", "-interaction=nonstopmode"]
+            if engine in ["platex", "uplatex"]:
+                command.append("-kanji=utf8")
+            command += [f"&{engine}", "preamble.tex"]
+
+            returncode = None
+            try:
+                # プリアンブルもユーザーの入力なので、コンパイルと同じリソース制限を適用する
+                process = subprocess.Popen(
+                    limited_command(command),
+                    cwd=temp_dir,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+                try:
+                    returncode = process.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    kill_process_group(process)
+                    process.wait()
+            except OSError:
+                pass
+
+            built_path = os.path.join(temp_dir, f"{key}.fmt")
+            if returncode != 0 or not os.path.exists(built_path):
+                self._failed_marker_path(key).touch()
+                return False
+
+            tmp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(built_path, tmp_path)
+            os.replace(tmp_path, self._format_path(key))
+            return True
+
+    def mark_failed(self, key):
+        # フォーマットでは正しくコンパイルできないプリアンブルとして記録する
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._failed_marker_path(key).touch()
+        try:
+            self._format_path(key).unlink()
+        except OSError:
+            pass
@@ -0,0 +1,277 @@
+import re
+
+CONTROL_SEQUENCE_PATTERN = re.compile(r"\\([A-Za-z@]+\*?|.)", re.DOTALL)
+SPECIAL_CHARACTER_PATTERN = re.compile(r"[\\{}%$\n]")
+ENVIRONMENT_NAME_PATTERN = re.compile(r"\s*\{([^{}\n]*)\}")
+# 中身をLaTeXとして解釈しない環境
+VERBATIM_ENVIRONMENTS = {"verbatim", "verbatim*", "lstlisting", "minted", "comment"}
+# 区切り文字（または波括弧）までの引数をそのまま読むコマンド
+VERBATIM_COMMANDS = {"verb", "verb*", "lstinline"}
+# 最初の引数をそのまま読むコマンド（引数の中の % や # は文字として、\ はエスケープではなく文字として読まれる）
+URL_COMMANDS = {"url", "href", "nolinkurl", "path"}
+MAX_ERRORS = 50
+
+
+def _error(errors, line, column, message):
+    if len(errors) < MAX_ERRORS:
+        errors.append({"line": line, "column": column, "message": message})
+
+
+def _skip_optional_argument(source, pos):
+    # \lstinline[language=C]|...| のオプション引数を読み飛ばす
+    if pos < len(source) and source[pos] == "[":
+        closing = source.find("]", pos + 1)
+        if closing != -1:
+            return closing + 1
+    return pos
+
+
+def _verbatim_argument_end(source, pos, allow_braces=False):
+    """
+    \\verb|...| などの引数の終わりの位置を返す（同じ行で閉じられていない場合はNone）
+    \\lstinline は区切り文字の代わりに波括弧でも囲める
+    """
+    if pos >= len(source) or source[pos] == "\n":
+        return None
+    closing_char = "}" if allow_braces and source[pos] == "{" else source[pos]
+    closing = source.find(closing_char, pos + 1)
+    newline = source.find("\n", pos + 1)
+    if closing == -1 or (newline != -1 and newline < closing):
+        return None
+    return closing + 1
+
+
+def _url_argument_end(source, pos, allow_delimiter=False):
+    """
+    \\url{...} の引数の終わりの位置を返す
+    引数の中の % はコメントではなく、\\ も波括弧をエスケープしないため、
+    \\url{C:\\dir\\} のように \\ の直後にある波括弧も含めて対応だけを見る（閉じられていない場合はNone）
+    """
+    while pos < len(source) and source[pos] in " \t":
+        pos += 1
+    if pos >= len(source) or source[pos] == "\n":
+        return pos
+    if source[pos] != "{":
+        # \url|...| のように区切り文字で囲まれた引数
+        return _verbatim_argument_end(source, pos) if allow_delimiter else pos
+    depth = 0
+    for index in range(pos, len(source)):
+        char = source[index]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        elif char == "\n" and source.startswith("\n", index + 1):
+            # 段落の区切りを越える引数はTeXでもエラーになる
+            return None
+    return None
+
+
+def lint_latex(source, require_document=True):
+    """
+    TeXを起動する前にLaTeXソースを静的にチェックする
+    波括弧の対応、\\begin/\\endの対応、document環境の有無、インライン数式の閉じ忘れを
+    ソースを一度走査するだけで検出し、行・列つきのエラーのリストを返す
+    """
+    errors = []
+    brace_stack = []
+    env_stack = []
+    has_documentclass = False
+    document_begun = False
+    math_open = None
+
+    length = len(source)
+    pos = 0
+    line = 1
+    line_start = 0
+    blank_line_candidate = True
+
+    while pos < length:
+        char = source[pos]
+        column = pos - line_start + 1
+
+        if char == "\n":
+            if blank_line_candidate and math_open and math_open[0] == "$":
+                # 段落の区切りを越えたインライン数式はTeXでエラーになる
+                _error(errors, math_open[1], math_open[2], "数式（$）が閉じられていません")
+                math_open = None
+            line += 1
+            line_start = pos + 1
+            blank_line_candidate = True
+            pos += 1
+            continue
+
+        if not char.isspace():
+            blank_line_candidate = False
+
+        if char == "%":
+            newline = source.find("\n", pos)
+            pos = length if newline == -1 else newline
+            continue
+
+        if char == "{":
+            brace_stack.append((line, column))
+            pos += 1
+            continue
+
+        if char == "}":
+            if brace_stack:
+                brace_stack.pop()
+            else:
+                _error(errors, line, column, "対応する { がない } があります")
+            pos += 1
+            continue
+
+        if char == "$":
+            delimiter = "$$" if source.startswith("$$", pos) else "$"
+            if math_open is None:
+                math_open = (delimiter, line, column)
+            elif math_open[0] == delimiter:
+                math_open = None
+            else:
+                _error(errors, line, column, f"数式の区切り {delimiter} が {math_open[0]} と対応していません")
+                math_open = None
+            pos += len(delimiter)
+            continue
+
+        if char != "\\":
+            # 特別な意味を持つ文字までまとめて読み飛ばす
+            special = SPECIAL_CHARACTER_PATTERN.search(source, pos + 1)
+            next_pos = special.start() if special else length
+            if blank_line_candidate and source[pos:next_pos].strip():
+                blank_line_candidate = False
+            pos = next_pos
+            continue
+
+        match = CONTROL_SEQUENCE_PATTERN.match(source, pos)
+        if not match:
+            # 末尾のバックスラッシュ
+            pos += 1
+            continue
+
+        name = match.group(1)
+        pos = match.end()
+
+        if name == "\n":
+            line += 1
+            line_start = pos
+            blank_line_candidate = True
+            continue
+
+        if name == "documentclass":
+            has_documentclass = True
+            continue
+
+        if name in VERBATIM_COMMANDS:
+            # \verb|...| は区切り文字まで読み飛ばす
+            if name == "lstinline":
+                pos = _skip_optional_argument(source, pos)
+            end = _verbatim_argument_end(source, pos, allow_braces=name == "lstinline")
+            if end is None:
+                _error(errors, line, column, f"\\{name} が閉じられていません")
+                newline = source.find("\n", pos)
+                pos = length if newline == -1 else newline
+            else:
+                pos = end
+            continue
+
+        if name in URL_COMMANDS:
+            end = _url_argument_end(source, pos, allow_delimiter=name != "href")
+            if end is None:
+                _error(errors, line, column, f"\\{name} の引数が閉じられていません")
+                newline = source.find("\n", pos)
+                pos = length if newline == -1 else newline
+            else:
+                # 引数の中の改行を行番号に反映する
+                newlines = source.count("\n", pos, end)
+                if newlines:
+                    line += newlines
+                    line_start = source.rfind("\n", pos, end) + 1
+                pos = end
+            continue
+
+        if name not in ("begin", "end"):
+            continue
+
+        env_match = ENVIRONMENT_NAME_PATTERN.match(source, pos)
+        if not env_match:
+            _error(errors, line, column, f"\\{name} の環境名がありません")
+            continue
+
+        env_name = env_match.group(1).strip()
+        pos = env_match.end()
+
+        if name == "begin":
+            if env_name == "document":
+                if document_begun:
+                    _error(errors, line, column, "\\begin{document} が複数あります")
+                document_begun = True
+            env_stack.append((env_name, line, column))
+
+            if env_name in VERBATIM_ENVIRONMENTS:
+                end_marker = f"\\end{{{env_name}}}"
+                end_pos = source.find(end_marker, pos)
+                if end_pos == -1:
+                    _error(errors, line, column, f"\\begin{{{env_name}}} に対応する \\end{{{env_name}}} がありません")
+                    pos = length
+                    env_stack.pop()
+                    continue
+                # 読み飛ばした範囲の改行数を行番号に反映する
+                newlines = source.count("\n", pos, end_pos)
+                if newlines:
+                    line += newlines
+                    line_start = source.rfind("\n", pos, end_pos) + 1
+                pos = end_pos
+            continue
+
+        if not env_stack:
+            _error(errors, line, column, f"\\end{{{env_name}}} に対応する \\begin がありません")
+            continue
+
+        open_name, open_line, open_column = env_stack[-1]
+        if open_name == env_name:
+            env_stack.pop()
+        elif any(entry[0] == env_name for entry in env_stack):
+            # 間の環境が閉じられていない
+            while env_stack and env_stack[-1][0] != env_name:
+                unclosed_name, unclosed_line, unclosed_column = env_stack.pop()
+                _error(
+                    errors, unclosed_line, unclosed_column,
+                    f"\\begin{{{unclosed_name}}} が \\end{{{env_name}}} より前に閉じられていません",
+                )
+            env_stack.pop()
+        else:
+            _error(
+                errors, line, column,
+                f"\\end{{{env_name}}} が \\begin{{{open_name}}}（{open_line}行目）と対応していません",
+            )
+
+        if env_name == "document":
+            # \end{document} 以降はTeXに読まれないため、本文の途中に紛れ込んだものを検出する
+            stray_pos = source.find("\\end{document}", pos)
+            if stray_pos != -1:
+                stray_line = line + source.count("\n", pos, stray_pos)
+                stray_line_start = source.rfind("\n", 0, stray_pos) + 1
+                _error(
+                    errors, line, column,
+                    "\\end{document} が複数あります（これ以降の内容は出力されません）",
+                )
+                _error(
+                    errors, stray_line, stray_pos - stray_line_start + 1,
+                    "余分な \\end{document} があります",
+                )
+            break
+
+    if math_open:
+        _error(errors, math_open[1], math_open[2], f"数式（{math_open[0]}）が閉じられていません")
+    for open_line, open_column in brace_stack:
+        _error(errors, open_line, open_column, "{ が閉じられていません")
+    for env_name, open_line, open_column in env_stack:
+        _error(errors, open_line, open_column, f"\\begin{{{env_name}}} に対応する \\end{{{env_name}}} がありません")
+
+    if require_document and has_documentclass and not document_begun:
+        _error(errors, 1, 1, "\\begin{document} がありません")
+
+    return errors
@@ -0,0 +1,100 @@
+import os
+import re
+
+# 診断情報として返す最大件数
+MAX_DIAGNOSTICS = 20
+
+# -file-line-error 形式のエラー行（例: ./document.tex:12: Undefined control sequence.）
+FILE_LINE_ERROR_PATTERN = re.compile(
+    r"^(?P<file>[^\s:][^:]*\.(?:tex|sty|cls|clo|def|cfg|fd|ltx)):(?P<line>\d+): (?P<message>.+)$"
+)
+# 通常形式のエラー行（例: ! Undefined control sequence.）
+BANG_ERROR_PATTERN = re.compile(r"^! (?P<message>.+)$")
+# 通常形式のエラーに続く行番号（例: l.12 \foo）
+LINE_NUMBER_PATTERN = re.compile(r"^l\.(?P<line>\d+)")
+MISSING_FILE_PATTERN = re.compile(
+    r"File `(?P<name>[^']+?)\.(?P<extension>sty|cls)' not found"
+)
+# 個別のエラーの後に出力されるだけで情報を持たない行
+IGNORED_MESSAGES = [
+    "Emergency stop.",
+    "==> Fatal error occurred, no output PDF file produced!",
+]
+
+
+def read_file_tail(file_path, max_bytes, max_lines=None):
+    """
+    ファイルの末尾のみを読み込む
+    ファイル全体を読まず、末尾からmax_bytesの位置にシークして読むため、メモリ使用量は一定
+    """
+    try:
+        with open(file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            offset = max(0, size - max_bytes)
+            f.seek(offset)
+            data = f.read(max_bytes)
+    except OSError:
+        return ""
+
+    text = data.decode("utf-8", errors="replace")
+    lines = text.split("\n")
+    if offset > 0:
+        # 途中から読んだ最初の行は不完全なので捨てる
+        lines = lines[1:]
+    if max_lines is not None:
+        lines = lines[-max_lines:]
+    return "\n".join(lines)
+
+
+def _diagnostic(message, file=None, line=None):
+    missing_match = MISSING_FILE_PATTERN.search(message)
+    return {
+        "file": file,
+        "line": line,
+        "message": message.strip(),
+        "missing_package": missing_match.group("name") if missing_match else None,
+    }
+
+
+def parse_latex_log(log_text):
+    """
+    LaTeXのログ（末尾）から、ファイル・行番号・メッセージ・不足しているパッケージを持つ診断情報を抽出する
+    """
+    diagnostics = []
+    seen = set()
+    lines = log_text.split("\n")
+    for index, raw_line in enumerate(lines):
+        line_text = raw_line.rstrip()
+
+        file_line_match = FILE_LINE_ERROR_PATTERN.match(line_text)
+        if file_line_match:
+            diagnostic = _diagnostic(
+                file_line_match.group("message"),
+                file=file_line_match.group("file"),
+                line=int(file_line_match.group("line")),
+            )
+        else:
+            bang_match = BANG_ERROR_PATTERN.match(line_text)
+            if not bang_match:
+                continue
+            line_number = None
+            # 行番号はエラーメッセージの数行後に出力される
+            for following in lines[index + 1:index + 12]:
+                number_match = LINE_NUMBER_PATTERN.match(following)
+                if number_match:
+                    line_number = int(number_match.group("line"))
+                    break
+            diagnostic = _diagnostic(bang_match.group("message"), line=line_number)
+
+        if diagnostic["message"] in IGNORED_MESSAGES:
+            continue
+        # -file-line-error と通常形式で同じエラーが重複して出力される場合がある
+        key = (diagnostic["line"], diagnostic["message"])
+        if key in seen:
+            continue
+        seen.add(key)
+        diagnostics.append(diagnostic)
+        if len(diagnostics) >= MAX_DIAGNOSTICS:
+            break
+    return diagnostics
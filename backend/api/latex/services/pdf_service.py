@@ -1,9 +1,62 @@
+import logging
 import os
+import shutil
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 from django.conf import settings
 from app.utils.file_storage import FileStorage
+from api.latex.services.compile_cache import PDFCompileCache
+from api.latex.services.failure_cache import CompileFailureCache
+from api.latex.services.format_cache import PreambleFormatCache
+from api.latex.services.compile_metrics import CompileMetrics
+from api.latex.services.compile_scheduler import CompileScheduler
+from api.latex.services.latex_linter import lint_latex
+from api.latex.services.exceptions import (
+    LatexValidationError,
+    CompileCancelledError,
+    LatexCompileError,
+    CompileResourceLimitError,
+)
+from api.latex.services.process_limits import (
+    LIMIT_MESSAGES,
+    limited_command,
+    wait_with_rusage,
+    limit_for_returncode,
+    directory_size,
+)
+from api.latex.services.log_parser import read_file_tail, parse_latex_log
+from api.latex.services.compile_coalescer import kill_process_group
+from api.latex.services.build_dir_cache import BuildDirectoryCache
+from api.latex.services.engine_selector import select_engine
+
+logger = logging.getLogger("app")
+
+# 実行中のプロセスの取り消し・タイムアウトを確認する間隔（秒）
+PROCESS_POLL_INTERVAL = 0.2
+# エラーメッセージに含めるログの最大行数
+LOG_TAIL_LINES = 200
+
+# 相互参照が未解決であることを示すログ出力
+RERUN_LOG_PATTERNS = [
+    "Rerun to get",
+    "Label(s) may have changed",
+    "Rerun LaTeX",
+]
+# フォーマットを読み込めなかったことを示すTeXの出力（フォーマットの破損・エンジンとの不一致）
+FORMAT_LOAD_ERROR_PATTERNS = [
+    "can't find the format file",
+    "Fatal format file error",
+    "format file error",
+    "was written by",
+]
+# 2回目以降の実行で参照される情報を.auxに書き出すコマンド
+CROSS_REFERENCE_AUX_MARKERS = [
+    "\\newlabel",
+    "\\@writefile",
+    "\\bibcite",
+]
 
 
 class PDFService:
@@ -11,6 +64,8 @@ class PDFService:
         self.latex_command = settings.LATEX_TO_PDF_COMMAND
         self.template_name = template_name
         self.template_dir = Path(__file__).parent.parent / "templates"
+        self.last_compile_metrics = None
+        self.cancel_token = None
 
     def _load_template(self, template_name=None):
         template_name = template_name or self.template_name
@@ -24,155 +79,417 @@ class PDFService:
         with open(template_path, "r", encoding="utf-8") as f:
             return f.read()
 
-    def latex_to_pdf(self, latex_code, output_filename=None, template_name=None, use_template=False):
+    def latex_to_pdf(self, latex_code, output_filename=None, template_name=None, use_template=False,
+                     user_id=None, skip_validation=False, cancel_token=None, build_key=None,
+                     engine=None, folder_name="pdfs"):
         if use_template:
             template_content = self._load_template(template_name)
             full_latex = template_content.replace("{latex_code}", latex_code)
         else:
             full_latex = latex_code
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            tex_file_path = os.path.join(temp_dir, "document.tex")
+        # テンプレートで指定されたエンジンを優先し、設定が"auto"の場合はドキュメントの内容から選ぶ
+        if engine or settings.LATEX_TO_PDF_COMMAND == "auto":
+            self.latex_command = select_engine(full_latex, template_engine=engine)
+        else:
+            self.latex_command = settings.LATEX_TO_PDF_COMMAND
+
+        self.last_compile_metrics = None
+        self.cancel_token = cancel_token
+        compile_cache = None
+        cache_key = PDFCompileCache.make_key(
+            full_latex,
+            self.latex_command,
+            (template_name or self.template_name) if use_template else None,
+        )
+        if settings.LATEX_COMPILE_CACHE_ENABLED:
+            compile_cache = PDFCompileCache()
+            cached_pdf_path = compile_cache.get(cache_key)
+            if cached_pdf_path:
+                # 同一ソースのコンパイル済みPDFがあればTeXを実行せずに返す
+                self.last_compile_metrics = {
+                    "engine": self.latex_command,
+                    "passes": 0,
+                    "format": None,
+                    "cache_hit": True,
+                }
+                return FileStorage.save_pdf_file(
+                    cached_pdf_path, folder_name=folder_name, prefix=output_filename or "latex"
+                )
+
+        failure_cache = None
+        if settings.LATEX_FAILURE_CACHE_ENABLED:
+            failure_cache = CompileFailureCache()
+            cached_error = failure_cache.get(cache_key, self.latex_command)
+            if cached_error:
+                # 直前に失敗したソースはTeXを実行せずに同じエラーを返す
+                self.last_compile_metrics = {
+                    "engine": self.latex_command,
+                    "passes": 0,
+                    "format": None,
+                    "cache_hit": False,
+                    "failure_cache_hit": True,
+                }
+                raise cached_error
 
-            with open(tex_file_path, "w", encoding="utf-8") as f:
-                f.write(full_latex)
+        if settings.LATEX_PREFLIGHT_ENABLED and not skip_validation:
+            # 構文エラーが明らかなソースはTeXを起動せずに弾く
+            lint_errors = lint_latex(full_latex)
+            if lint_errors:
+                raise LatexValidationError(lint_errors)
 
+        def compile_and_save(work_dir):
+            self._check_cancelled()
+            started = time.monotonic()
             try:
-                is_platex = self.latex_command in ["platex", "uplatex"]
-
-                if is_platex:
-                    # platex/uplatexは相互参照のため2回実行が必要
-                    for i in range(2):
-                        result = subprocess.run(
-                            [self.latex_command, "-kanji=utf8",
-                                "-interaction=nonstopmode", "document.tex"],
-                            cwd=temp_dir,
-                            capture_output=True,
-                            text=True,
-                            encoding='utf-8',
-                            errors='replace',
-                            timeout=30,
-                        )
-                        if result.returncode != 0:
-                            error_parts = [f"LaTeXコンパイルエラー ({i+1}回目)"]
-
-                            if result.stderr:
-                                error_parts.append(
-                                    f"\n標準エラー出力:\n{result.stderr}")
-                            if result.stdout:
-                                error_parts.append(f"\n標準出力:\n{result.stdout}")
-
-                            log_file_path = os.path.join(
-                                temp_dir, "document.log")
-                            if os.path.exists(log_file_path):
-                                try:
-                                    with open(log_file_path, "r", encoding="utf-8", errors="replace") as f:
-                                        log_content = f.read()
-                                        log_lines = log_content.split("\n")
-                                        relevant_log = "\n".join(
-                                            log_lines[-200:])
-                                        if relevant_log.strip():
-                                            error_parts.append(
-                                                f"\nLaTeXログファイル:\n{relevant_log}")
-                                except Exception:
-                                    pass
-
-                            error_msg = "\n".join(error_parts)
-                            raise RuntimeError(error_msg)
-
-                    dvi_file_path = os.path.join(temp_dir, "document.dvi")
-                    if not os.path.exists(dvi_file_path):
-                        error_parts = ["DVIファイルが生成されませんでした"]
-                        error_parts.append(
-                            f"\nLaTeXコマンド: {self.latex_command}")
-
-                        log_file_path = os.path.join(temp_dir, "document.log")
-                        if os.path.exists(log_file_path):
-                            try:
-                                with open(log_file_path, "r", encoding="utf-8", errors="replace") as f:
-                                    log_content = f.read()
-                                    # ログの最後の200行を取得
-                                    log_lines = log_content.split("\n")
-                                    relevant_log = "\n".join(log_lines[-200:])
-                                    if relevant_log.strip():
-                                        error_parts.append(
-                                            f"\nLaTeXログファイル:\n{relevant_log}")
-                            except Exception:
-                                pass
-
-                        error_msg = "\n".join(error_parts)
-                        raise FileNotFoundError(error_msg)
-
-                    pdf_file_path = os.path.join(temp_dir, "document.pdf")
-                    result = subprocess.run(
-                        ["dvipdfmx", "-o", "document.pdf", "document.dvi"],
-                        cwd=temp_dir,
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8',
-                        errors='replace',
-                        timeout=30,
+                pdf_file_path = self._compile_in_work_dir(full_latex, work_dir)
+            except Exception:
+                passes = (self.last_compile_metrics or {}).get("passes", 0)
+                CompileMetrics.record(
+                    self.latex_command, passes, time.monotonic() - started, succeeded=False)
+                raise
+            self.last_compile_metrics["seconds"] = time.monotonic() - started
+            self.last_compile_metrics["cache_hit"] = False
+            CompileMetrics.record(
+                self.latex_command,
+                self.last_compile_metrics["passes"],
+                self.last_compile_metrics["seconds"],
+            )
+
+            if compile_cache:
+                try:
+                    compile_cache.put(cache_key, pdf_file_path)
+                except OSError as e:
+                    logger.warning(f"PDFキャッシュの保存に失敗しました: {str(e)}")
+
+            # 取り消されたコンパイルの結果は保存しない
+            self._check_cancelled()
+
+            # PDFをメモリに読み込まず、作業ディレクトリからそのまま移動する
+            return FileStorage.save_pdf_file(
+                pdf_file_path, folder_name=folder_name, prefix=output_filename or "latex", move=True
+            )
+
+        try:
+            return self._schedule_compile_job(compile_and_save, user_id, build_key)
+        except LatexCompileError as e:
+            # 同じソースの再送でTeXを再実行しないよう、失敗した結果を記録する
+            # 取り消しやシグナルによる終了など、同じソースでも結果が変わりうる失敗は記録しない
+            if failure_cache and e.cacheable and not (cancel_token and cancel_token.is_cancelled()):
+                try:
+                    failure_cache.put(cache_key, self.latex_command, e)
+                except OSError as put_error:
+                    logger.warning(f"コンパイルエラーのキャッシュの保存に失敗しました: {str(put_error)}")
+            raise
+
+    def _schedule_compile_job(self, job, user_id=None, build_key=None):
+        if not settings.LATEX_SCHEDULER_ENABLED:
+            return self._run_compile_job(job, build_key)
+
+        # 同時実行数の上限内で、ユーザー間で公平に実行枠を割り当てる
+        with CompileScheduler.get().slot(user_id or "anonymous") as queue_wait_seconds:
+            saved_path = self._run_compile_job(job, build_key)
+        self.last_compile_metrics["queue_wait_seconds"] = queue_wait_seconds
+        return saved_path
+
+    def _check_cancelled(self):
+        if self.cancel_token:
+            self.cancel_token.check()
+
+    def _run_compile_job(self, job, build_key=None):
+        try:
+            return self._run_in_work_dir(job, build_key)
+        except CompileCancelledError:
+            raise
+        except CompileResourceLimitError as e:
+            raise CompileResourceLimitError(f"PDF生成エラー: {str(e)}", e.limit, e.cacheable)
+        except LatexCompileError as e:
+            raise LatexCompileError(f"PDF生成エラー: {str(e)}", e.diagnostics, e.cacheable)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("LaTeXコンパイルがタイムアウトしました")
+        except Exception as e:
+            raise RuntimeError(f"PDF生成エラー: {str(e)}")
+
+    @staticmethod
+    def _run_in_work_dir(job, build_key=None):
+        if build_key and settings.LATEX_BUILD_DIR_ENABLED:
+            # ドキュメントごとのビルドディレクトリで前回の.auxを再利用する
+            with BuildDirectoryCache().acquire(build_key) as build_dir:
+                return job(build_dir)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return job(temp_dir)
+
+    def _compile_in_work_dir(self, full_latex, work_dir):
+        # 再利用したビルドディレクトリでは前回の.auxや.tocが原因で失敗することがあるため、
+        # 空のディレクトリでやり直しても失敗した場合だけソースの誤りとみなす
+        reused = bool(os.listdir(work_dir))
+        try:
+            return self._compile(full_latex, work_dir)
+        except CompileResourceLimitError:
+            raise
+        except LatexCompileError as e:
+            if not reused or not e.cacheable:
+                raise
+        self._check_cancelled()
+        logger.info("再利用したビルドディレクトリでのコンパイルに失敗したため、空のディレクトリでやり直します")
+        self._clean_work_dir(work_dir)
+        return self._compile(full_latex, work_dir)
+
+    def _compile(self, full_latex, work_dir):
+        if settings.LATEX_FORMAT_CACHE_ENABLED:
+            format_cache = PreambleFormatCache()
+            preamble, body = format_cache.split_preamble(full_latex)
+            format_name = (
+                format_cache.get_or_build(preamble, self.latex_command)
+                if preamble else None
+            )
+
+            if format_name:
+                # プリアンブルをダンプしたフォーマットに対して本文のみをコンパイルする
+                try:
+                    return self._compile_document(
+                        body, work_dir, format_name=format_name,
+                        env=format_cache.texformats_env(),
                     )
+                except CompileResourceLimitError:
+                    # 制限を超えたドキュメントは通常コンパイルでも超えるため再実行しない
+                    raise
+                except LatexCompileError as e:
+                    # ドキュメント自体のエラーは通常コンパイルでも失敗するため、
+                    # フォーマットを読み込めなかった場合だけ通常コンパイルし直す
+                    if not self._is_format_load_error(str(e)):
+                        raise
+                    logger.warning(
+                        f"プリコンパイル済みフォーマットでのコンパイルに失敗したため通常コンパイルします: {format_name}")
+                    self._clean_work_dir(work_dir)
+                    pdf_file_path = self._compile_document(full_latex, work_dir)
+                    # 通常コンパイルでは成功したのでフォーマットが原因とみなす
+                    format_cache.mark_failed(format_name)
+                    return pdf_file_path
+
+        return self._compile_document(full_latex, work_dir)
+
+    @staticmethod
+    def _is_format_load_error(message):
+        return any(pattern in message for pattern in FORMAT_LOAD_ERROR_PATTERNS)
+
+    @staticmethod
+    def _clean_work_dir(work_dir):
+        for entry in os.listdir(work_dir):
+            entry_path = os.path.join(work_dir, entry)
+            if os.path.isdir(entry_path) and not os.path.islink(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+            else:
+                os.remove(entry_path)
+
+    def _latex_args(self, format_name=None):
+        args = [self.latex_command]
+        if format_name:
+            args.append(f"-fmt={format_name}")
+        if self.latex_command in ["platex", "uplatex"]:
+            args.append("-kanji=utf8")
+        args += ["-interaction=nonstopmode", "-file-line-error", "document.tex"]
+        return args
+
+    @staticmethod
+    def _read_log_tail(work_dir):
+        # ログ全体を読み込まず、末尾のみを読む
+        log_file_path = os.path.join(work_dir, "document.log")
+        return read_file_tail(
+            log_file_path, settings.LATEX_LOG_TAIL_BYTES, max_lines=LOG_TAIL_LINES)
 
-                    if result.returncode != 0:
-                        error_parts = ["DVIからPDFへの変換エラー"]
-                        if result.stderr:
-                            error_parts.append(f"\n標準エラー出力:\n{result.stderr}")
-                        if result.stdout:
-                            error_parts.append(f"\n標準出力:\n{result.stdout}")
-                        error_msg = "\n".join(error_parts)
-                        raise RuntimeError(error_msg)
+    @staticmethod
+    def _output_path(work_dir, args):
+        return os.path.join(work_dir, f"{os.path.basename(args[0])}.out")
+
+    def _read_output_tail(self, work_dir, args):
+        return read_file_tail(
+            self._output_path(work_dir, args),
+            settings.LATEX_LOG_TAIL_BYTES,
+            max_lines=LOG_TAIL_LINES,
+        )
+
+    def _contain(self, process, args, work_dir, limit):
+        # プロセスグループごと終了させ、他のコンパイルへの影響を防ぐ
+        kill_process_group(process)
+        process.wait()
+        # 再利用されるビルドディレクトリに巨大なファイルを残さない
+        self._clean_work_dir(work_dir)
+        CompileMetrics.record_containment(limit)
+        logger.warning(f"TeXプロセスを終了しました（{limit}）: {args[0]}")
+        raise CompileResourceLimitError(LIMIT_MESSAGES[limit], limit)
+
+    def _run_process(self, args, work_dir, env=None, timeout=None):
+        # 標準出力・標準エラー出力はメモリに溜めずにファイルへ書き出す
+        with open(self._output_path(work_dir, args), "wb") as output_file:
+            # 取り消し時やタイムアウト時に子プロセスごと終了できるよう別のプロセスグループで起動する
+            process = subprocess.Popen(
+                limited_command(args),
+                cwd=work_dir,
+                stdin=subprocess.DEVNULL,
+                stdout=output_file,
+                stderr=subprocess.STDOUT,
+                env=env,
+                start_new_session=True,
+            )
+        cancel_token = self.cancel_token
+        if cancel_token:
+            cancel_token.attach(process)
+
+        timeout = timeout or settings.LATEX_PROCESS_TIMEOUT
+        max_work_dir_bytes = settings.LATEX_LIMIT_WORK_DIR_BYTES
+        deadline = time.monotonic() + timeout
+        rusage = None
+        try:
+            while True:
+                try:
+                    rusage = wait_with_rusage(process, PROCESS_POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_token and cancel_token.is_cancelled():
+                        kill_process_group(process)
+                        process.wait()
+                        cancel_token.check()
+                    if max_work_dir_bytes and directory_size(work_dir) > max_work_dir_bytes:
+                        self._contain(process, args, work_dir, "work_dir_size")
+                    if time.monotonic() >= deadline:
+                        kill_process_group(process)
+                        process.wait()
+                        CompileMetrics.record_containment("timeout")
+                        raise subprocess.TimeoutExpired(args, timeout)
+        finally:
+            if cancel_token:
+                cancel_token.detach(process)
+
+        # 取り消しによって終了させられた場合はコンパイルエラーとして扱わない
+        if cancel_token:
+            cancel_token.check()
+
+        if rusage is not None and self.last_compile_metrics is not None:
+            # コンパイル中に実行したTeX・dvipdfmxのうち、最も大きい最大常駐メモリ量（Linuxではキロバイト単位）
+            self.last_compile_metrics["max_rss_kb"] = max(
+                self.last_compile_metrics.get("max_rss_kb", 0), rusage.ru_maxrss)
+
+        limit = limit_for_returncode(process.returncode, rusage)
+        if limit:
+            self._contain(process, args, work_dir, limit)
+
+        return subprocess.CompletedProcess(args, process.returncode)
+
+    @staticmethod
+    def _read_aux(work_dir):
+        aux_file_path = os.path.join(work_dir, "document.aux")
+        try:
+            with open(aux_file_path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _log_requests_rerun(work_dir):
+        # 再実行を求める警告は\end{document}の処理時に出力されるため末尾のみを確認する
+        log_content = read_file_tail(
+            os.path.join(work_dir, "document.log"), settings.LATEX_LOG_TAIL_BYTES)
+        return any(pattern in log_content for pattern in RERUN_LOG_PATTERNS)
+
+    def _needs_rerun(self, work_dir, previous_aux, current_aux):
+        if self._log_requests_rerun(work_dir):
+            return True
+        if not current_aux or not any(
+            marker in current_aux for marker in CROSS_REFERENCE_AUX_MARKERS
+        ):
+            return False
+        # 相互参照の情報が前回の実行から変わっていなければ再実行は不要
+        return current_aux != previous_aux
+
+    def _run_latex_passes(self, work_dir, format_name=None, env=None):
+        max_passes = max(1, settings.LATEX_MAX_PASSES)
+        previous_aux = self._read_aux(work_dir)
+        passes = 0
+
+        while True:
+            passes += 1
+            self.last_compile_metrics["passes"] = passes
+            args = self._latex_args(format_name)
+            result = self._run_process(args, work_dir, env=env)
+            if result.returncode != 0:
+                error_parts = [f"LaTeXコンパイルエラー ({passes}回目)"]
+
+                relevant_log = self._read_log_tail(work_dir)
+                if relevant_log.strip():
+                    error_parts.append(
+                        f"\nLaTeXログファイル:\n{relevant_log}")
                 else:
-                    result = subprocess.run(
-                        [self.latex_command, "-interaction=nonstopmode", "document.tex"],
-                        cwd=temp_dir,
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8',
-                        errors='replace',
-                        timeout=30,
-                    )
+                    # フォーマットが見つからない場合などはログが作成されないため出力を使う
+                    relevant_log = self._read_output_tail(work_dir, args)
+                    if relevant_log.strip():
+                        error_parts.append(f"\n出力:\n{relevant_log}")
 
-                    if result.returncode != 0:
-                        error_parts = ["LaTeXコンパイルエラー"]
-
-                        if result.stderr:
-                            error_parts.append(f"\n標準エラー出力:\n{result.stderr}")
-                        if result.stdout:
-                            error_parts.append(f"\n標準出力:\n{result.stdout}")
-
-                        log_file_path = os.path.join(temp_dir, "document.log")
-                        if os.path.exists(log_file_path):
-                            try:
-                                with open(log_file_path, "r", encoding="utf-8", errors="replace") as f:
-                                    log_content = f.read()
-                                    # ログの最後の200行を取得
-                                    log_lines = log_content.split("\n")
-                                    relevant_log = "\n".join(log_lines[-200:])
-                                    if relevant_log.strip():
-                                        error_parts.append(
-                                            f"\nLaTeXログファイル:\n{relevant_log}")
-                            except Exception:
-                                pass
-
-                        error_msg = "\n".join(error_parts)
-                        raise RuntimeError(error_msg)
-
-                    pdf_file_path = os.path.join(temp_dir, "document.pdf")
-
-                if not os.path.exists(pdf_file_path):
-                    raise FileNotFoundError("PDFファイルが生成されませんでした")
-
-                with open(pdf_file_path, "rb") as pdf_file:
-                    pdf_content = pdf_file.read()
-
-                saved_path = FileStorage.save_pdf(
-                    pdf_content, folder_name="pdfs", prefix=output_filename or "latex"
-                )
+                error_msg = "\n".join(error_parts)
+                # リソース制限以外のシグナル（OOM Killerなど）で終了した場合はソースの誤りとは限らない
+                raise LatexCompileError(
+                    error_msg, parse_latex_log(relevant_log), cacheable=result.returncode > 0)
+
+            current_aux = self._read_aux(work_dir)
+            if passes >= max_passes or not self._needs_rerun(
+                work_dir, previous_aux, current_aux
+            ):
+                return passes
+            previous_aux = current_aux
+
+    def _compile_document(self, source, work_dir, format_name=None, env=None):
+        tex_file_path = os.path.join(work_dir, "document.tex")
+
+        # 再利用するディレクトリに前回の出力が残っていても誤って返さないようにする
+        for output_name in ("document.log", "document.dvi", "document.pdf"):
+            output_path = os.path.join(work_dir, output_name)
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+        with open(tex_file_path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+        self.last_compile_metrics = {
+            "engine": self.latex_command,
+            "passes": 0,
+            "format": format_name,
+        }
+        # 相互参照の解決に必要な場合のみ再実行する
+        self._run_latex_passes(work_dir, format_name=format_name, env=env)
+
+        is_platex = self.latex_command in ["platex", "uplatex"]
+
+        if is_platex:
+            dvi_file_path = os.path.join(work_dir, "document.dvi")
+            if not os.path.exists(dvi_file_path):
+                error_parts = ["DVIファイルが生成されませんでした"]
+                error_parts.append(
+                    f"\nLaTeXコマンド: {self.latex_command}")
+
+                relevant_log = self._read_log_tail(work_dir)
+                if relevant_log.strip():
+                    error_parts.append(
+                        f"\nLaTeXログファイル:\n{relevant_log}")
+
+                error_msg = "\n".join(error_parts)
+                raise FileNotFoundError(error_msg)
+
+            pdf_file_path = os.path.join(work_dir, "document.pdf")
+            dvipdfmx_args = ["dvipdfmx", "-o", "document.pdf", "document.dvi"]
+            result = self._run_process(dvipdfmx_args, work_dir)
+
+            if result.returncode != 0:
+                error_parts = ["DVIからPDFへの変換エラー"]
+                output = self._read_output_tail(work_dir, dvipdfmx_args)
+                if output.strip():
+                    error_parts.append(f"\n出力:\n{output}")
+                error_msg = "\n".join(error_parts)
+                raise RuntimeError(error_msg)
+        else:
+            pdf_file_path = os.path.join(work_dir, "document.pdf")
 
-                return saved_path
+        if not os.path.exists(pdf_file_path):
+            raise FileNotFoundError("PDFファイルが生成されませんでした")
 
-            except subprocess.TimeoutExpired:
-                raise RuntimeError("LaTeXコンパイルがタイムアウトしました")
-            except Exception as e:
-                raise RuntimeError(f"PDF生成エラー: {str(e)}")
+        return pdf_file_path
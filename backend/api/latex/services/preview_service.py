@@ -0,0 +1,164 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import uuid
+from pathlib import Path
+from django.conf import settings
+
+logger = logging.getLogger("app")
+
+PREVIEW_FILE_PATTERN = re.compile(r"^(?P<key>[0-9a-f]{64})_p(?P<page>\d+)_(?P<dpi>\d+)\.png$")
+
+
+class PDFPreviewCache:
+    """
+    PDFの指定ページを低解像度のPNGに変換したプレビュー画像のキャッシュ
+    ソースのハッシュ・ページ番号・DPIをキーとするため、同じURLの内容は変わらない
+    画像はプレビューを作成したユーザーにだけ配信するため、ソースのハッシュごとに閲覧できるユーザーを記録する
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or settings.LATEX_PREVIEW_CACHE_DIR)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None
+            else settings.LATEX_PREVIEW_CACHE_MAX_BYTES
+        )
+        self.command = settings.LATEX_PREVIEW_COMMAND
+
+    @staticmethod
+    def file_name(key, page, dpi):
+        return f"{key}_p{page}_{dpi}.png"
+
+    def entry_path(self, file_name):
+        match = PREVIEW_FILE_PATTERN.match(file_name)
+        if not match:
+            return None
+        return self.cache_dir / match.group("key")[:2] / file_name
+
+    def _owner_dir(self, key):
+        return self.cache_dir / "owners" / key
+
+    def _add_owner(self, key, user_id):
+        owner_dir = self._owner_dir(key)
+        owner_dir.mkdir(parents=True, exist_ok=True)
+        (owner_dir / str(user_id)).touch()
+
+    def is_owner(self, file_name, user_id):
+        """
+        プレビュー画像を閲覧できるユーザーかどうか
+        """
+        match = PREVIEW_FILE_PATTERN.match(file_name)
+        if not match:
+            return False
+        return (self._owner_dir(match.group("key")) / str(user_id)).exists()
+
+    @staticmethod
+    def get_file_url(key, page, dpi):
+        return f"/api/latex/preview/{PDFPreviewCache.file_name(key, page, dpi)}"
+
+    def render_pages(self, key, pdf_path, pages, dpi, user_id):
+        """
+        PDFの指定ページのプレビュー画像を作成し、URLのリストを返す
+        文書のページ数を超えたページは無視する
+        """
+        full_pdf_path = os.path.join(settings.MEDIA_ROOT, pdf_path)
+        self._add_owner(key, user_id)
+        preview_urls = []
+        for page in sorted(set(pages)):
+            entry_path = self.entry_path(self.file_name(key, page, dpi))
+            if entry_path.exists():
+                os.utime(entry_path)
+            elif not self._rasterize(full_pdf_path, page, dpi, entry_path):
+                break
+            preview_urls.append(self.get_file_url(key, page, dpi))
+
+        self.evict()
+        return preview_urls
+
+    def _rasterize(self, full_pdf_path, page, dpi, entry_path):
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_prefix = os.path.join(temp_dir, "preview")
+            result = subprocess.run(
+                [
+                    self.command,
+                    "-png",
+                    "-r", str(dpi),
+                    "-f", str(page),
+                    "-l", str(page),
+                    "-singlefile",
+                    full_pdf_path,
+                    output_prefix,
+                ],
+                capture_output=True,
+                timeout=settings.LATEX_PREVIEW_TIMEOUT,
+            )
+            output_path = f"{output_prefix}.png"
+            if result.returncode != 0 or not os.path.exists(output_path):
+                if page == 1:
+                    logger.warning(
+                        f"プレビュー画像の生成に失敗しました: "
+                        f"{result.stderr.decode('utf-8', errors='ignore').strip()}"
+                    )
+                return False
+
+            # 書き込み途中のファイルを配信しないよう一時ファイルからリネームする
+            tmp_path = entry_path.with_name(f".{entry_path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                os.replace(output_path, tmp_path)
+                os.replace(tmp_path, entry_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        return True
+
+    def evict(self):
+        entries = []
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*/*.png"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return 0
+
+        removed = 0
+        removed_keys = set()
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total_bytes -= size
+            removed += 1
+            removed_keys.add(PREVIEW_FILE_PATTERN.match(entry_path.name).group("key"))
+
+        # 画像が残っていないソースの閲覧ユーザーの記録も削除する
+        for key in removed_keys:
+            if not any((self.cache_dir / key[:2]).glob(f"{key}_p*.png")):
+                shutil.rmtree(self._owner_dir(key), ignore_errors=True)
+        return removed
+
+    def stats(self):
+        entries = 0
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*/*.png"):
+            try:
+                total_bytes += entry_path.stat().st_size
+            except OSError:
+                continue
+            entries += 1
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
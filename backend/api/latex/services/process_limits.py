@@ -0,0 +1,114 @@
+import os
+import signal
+import subprocess
+import time
+from django.conf import settings
+
+# 制限超過時にカーネルから送られるシグナルと、統計に記録する制限の名前
+# CPU時間のハードリミットによるSIGKILLは、OOM Killerや取り消しによるものと区別するためCPU時間を確認して判定する
+LIMIT_SIGNALS = {
+    signal.SIGXCPU: "cpu_time",
+    signal.SIGXFSZ: "file_size",
+}
+LIMIT_MESSAGES = {
+    "cpu_time": "CPU時間の上限を超えたためコンパイルを中止しました",
+    "file_size": "出力ファイルのサイズが上限を超えたためコンパイルを中止しました",
+    "work_dir_size": "作業ディレクトリの合計サイズが上限を超えたためコンパイルを中止しました",
+    "timeout": "LaTeXコンパイルがタイムアウトしました",
+}
+
+
+def limited_command(args):
+    """
+    CPU時間・アドレス空間・ファイルサイズ・オープンファイル数の上限を設定してからコマンドをexecするシェルで包む
+    preexec_fnはスレッドを持つプロセスでは安全に使えないため、上限は起動したシェルの中で設定する
+    （TeXが起動する子プロセスにも引き継がれる）
+    """
+    if os.name != "posix":
+        return list(args)
+
+    commands = []
+    cpu_seconds = settings.LATEX_LIMIT_CPU_SECONDS
+    if cpu_seconds > 0:
+        # ソフトリミットでSIGXCPUを送り、応答しない場合はハードリミットで強制終了させる
+        commands += [f"ulimit -S -t {cpu_seconds}", f"ulimit -H -t {cpu_seconds + 1}"]
+    if settings.LATEX_LIMIT_MEMORY_BYTES > 0:
+        commands.append(f"ulimit -v {max(1, settings.LATEX_LIMIT_MEMORY_BYTES // 1024)}")
+    if settings.LATEX_LIMIT_FILE_BYTES > 0:
+        # POSIXのshのファイルサイズは512バイト単位
+        commands.append(f"ulimit -f {max(1, settings.LATEX_LIMIT_FILE_BYTES // 512)}")
+    if settings.LATEX_LIMIT_OPEN_FILES > 0:
+        commands.append(f"ulimit -n {settings.LATEX_LIMIT_OPEN_FILES}")
+    if not commands:
+        return list(args)
+
+    # 現在のハードリミットより大きい値は設定できないため、失敗してもそのまま起動する
+    script = "".join(f"{command} 2>/dev/null; " for command in commands) + 'exec "$@"'
+    return ["/bin/sh", "-c", script, "sh", *args]
+
+
+def wait_with_rusage(process, timeout):
+    """
+    process.wait(timeout)と同様に終了を待ち、終了したプロセスのリソース使用量（os.wait4の結果）を返す
+    終了していない場合はsubprocess.TimeoutExpiredを送出する。使用量を取得できない場合はNoneを返す
+    """
+    if not hasattr(os, "wait4"):
+        process.wait(timeout=timeout)
+        return None
+
+    deadline = time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        try:
+            pid, wait_status, rusage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:
+            # 他の箇所で回収済みの場合は使用量を取得できない
+            process.wait(timeout=timeout)
+            return None
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            return rusage
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        delay = min(delay * 2, remaining, 0.05)
+        time.sleep(delay)
+
+
+def limit_for_returncode(returncode, rusage=None):
+    """
+    終了コードとリソース使用量から、リソース制限の超過によって終了したかどうかを判定する
+    """
+    if returncode is None or returncode >= 0:
+        return None
+
+    cpu_seconds = settings.LATEX_LIMIT_CPU_SECONDS
+    if -returncode == signal.SIGKILL:
+        # CPU時間を使い切っている場合だけハードリミットによる終了とみなす
+        if cpu_seconds > 0 and rusage is not None and \
+                rusage.ru_utime + rusage.ru_stime >= cpu_seconds:
+            return "cpu_time"
+        return None
+
+    limit = LIMIT_SIGNALS.get(-returncode)
+    if limit == "cpu_time" and cpu_seconds <= 0:
+        return None
+    return limit
+
+
+def directory_size(path):
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        total += directory_size(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
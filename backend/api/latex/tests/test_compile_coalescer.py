@@ -0,0 +1,36 @@
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from api.latex.services.compile_coalescer import CoalescedCancelToken, CompileCoalescer
+from api.latex.services.exceptions import CompileCancelledError
+
+
+class CompileCoalescerTest(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        override = override_settings(LATEX_COALESCER_DIR=temp_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_newer_compile_in_another_process_cancels_token(self):
+        key = (1, "problem")
+        token = CompileCoalescer.begin(key)
+        self.addCleanup(CompileCoalescer.finish, key, token)
+        self.assertFalse(token.is_cancelled())
+
+        # 他のプロセスのbeginと同様に、マーカーだけを書き換える
+        CoalescedCancelToken(CompileCoalescer._marker_path(key)).publish()
+        self.assertTrue(token.is_cancelled())
+        with self.assertRaises(CompileCancelledError):
+            token.check()
+
+    def test_finish_keeps_newer_marker(self):
+        key = (2, "explanation")
+        older = CompileCoalescer.begin(key)
+        newer = CompileCoalescer.begin(key)
+        self.assertTrue(older.is_cancelled())
+
+        CompileCoalescer.finish(key, older)
+        self.assertFalse(newer.is_cancelled())
+        CompileCoalescer.finish(key, newer)
+        self.assertFalse(CompileCoalescer._marker_path(key).exists())
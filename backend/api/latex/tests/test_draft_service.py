@@ -0,0 +1,47 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from app.models.latex_draft import LatexDraft
+from app.models.problem import Problem
+from api.latex.services import draft_service
+from api.latex.services.draft_service import apply_text_patches, save_draft
+from api.latex.services.exceptions import LatexPatchError
+
+
+class ApplyTextPatchesTest(SimpleTestCase):
+    def test_offsets_are_utf16_code_units(self):
+        # 絵文字はUTF-16で2単位になる
+        text = "😀 $x$ 😀 $y$"
+        patched = apply_text_patches(text, [
+            {"start": 4, "end": 5, "text": "a"},
+            {"start": 11, "end": 12, "text": "b"},
+        ])
+        self.assertEqual(patched, "😀 $a$ 😀 $b$")
+
+    def test_offset_inside_surrogate_pair_is_rejected(self):
+        with self.assertRaises(LatexPatchError):
+            apply_text_patches("😀", [{"start": 1, "end": 2, "text": ""}])
+
+    def test_end_beyond_utf16_length_is_rejected(self):
+        with self.assertRaises(LatexPatchError):
+            apply_text_patches("😀", [{"start": 0, "end": 3, "text": ""}])
+
+
+class SaveDraftTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("draft-user", password="password")
+        self.problem = Problem.objects.create(user=user, title="問題")
+
+    def test_concurrent_first_save_updates_existing_draft(self):
+        def create_concurrently(problem, document_type):
+            # 下書きがないことを確認した後に、他のリクエストが初回の保存を終えた状態
+            LatexDraft.objects.create(
+                problem=problem, document_type=document_type, latex_code="other", revision=1)
+            return LatexDraft(problem=problem, document_type=document_type, latex_code="")
+
+        with mock.patch.object(draft_service, "get_draft", side_effect=create_concurrently):
+            draft = save_draft(self.problem, "problem", latex_code="mine")
+
+        self.assertEqual(draft.revision, 2)
+        self.assertEqual(draft.latex_code, "mine")
+        self.assertEqual(LatexDraft.objects.filter(problem=self.problem).count(), 1)
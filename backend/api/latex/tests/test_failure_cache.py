@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from django.test import SimpleTestCase, override_settings
+from api.latex.services.exceptions import LatexCompileError
+from api.latex.services.failure_cache import CompileFailureCache
+from api.latex.services.pdf_service import PDFService
+
+VALID_SOURCE = "\\documentclass{article}\n\\begin{document}\nok\n\\end{document}\n"
+INVALID_SOURCE = "\\documentclass{article}\n\\begin{document}\n\\undefinedmacro\n\\end{document}\n"
+
+
+@unittest.skipUnless(shutil.which("pdflatex"), "pdflatexがインストールされていません")
+class FailureCacheBuildDirTest(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        root = Path(temp_dir.name)
+        override = override_settings(
+            MEDIA_ROOT=root / "media",
+            LATEX_TO_PDF_COMMAND="pdflatex",
+            LATEX_COMPILE_CACHE_ENABLED=False,
+            LATEX_FORMAT_CACHE_ENABLED=False,
+            LATEX_SCHEDULER_ENABLED=False,
+            LATEX_FAILURE_CACHE_ENABLED=True,
+            LATEX_FAILURE_CACHE_DIR=root / "failures",
+            LATEX_BUILD_DIR_ENABLED=True,
+            LATEX_BUILD_DIR_ROOT=root / "builds",
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.build_dir = root / "builds" / "doc"
+
+    def _render(self, source):
+        return PDFService().latex_to_pdf(source, use_template=False, build_key="doc")
+
+    def test_stale_aux_is_retried_in_clean_build_dir(self):
+        # 前回のビルドで壊れた.auxが残っている状態
+        self.build_dir.mkdir(parents=True)
+        (self.build_dir / "document.aux").write_text("\\STALE\n", encoding="utf-8")
+
+        self.assertTrue(self._render(VALID_SOURCE))
+        self.assertEqual(CompileFailureCache().stats()["entries"], 0)
+
+    def test_source_error_is_cached_after_clean_retry(self):
+        self._render(VALID_SOURCE)
+        with self.assertRaises(LatexCompileError) as first:
+            self._render(INVALID_SOURCE)
+        self.assertFalse(first.exception.cached)
+        with self.assertRaises(LatexCompileError) as second:
+            self._render(INVALID_SOURCE)
+        self.assertTrue(second.exception.cached)
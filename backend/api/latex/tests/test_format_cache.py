@@ -0,0 +1,48 @@
+import shutil
+import tempfile
+import unittest
+from django.test import SimpleTestCase, override_settings
+from api.latex.services.exceptions import LatexCompileError
+from api.latex.services.format_cache import PreambleFormatCache
+from api.latex.services.pdf_service import PDFService
+
+SOURCE = "\n".join([
+    r"\documentclass{article}",
+    r"\usepackage{amsmath}",
+    "",
+    r"\begin{document}",
+    "本文",
+    r"\undefinedmacro",
+    r"\end{document}",
+])
+
+
+class SplitPreambleTest(SimpleTestCase):
+    def test_body_keeps_source_line_numbers(self):
+        preamble, body = PreambleFormatCache.split_preamble(SOURCE)
+        self.assertEqual(preamble, "\n".join(SOURCE.split("\n")[:3]) + "\n")
+        self.assertEqual(body.split("\n")[3:], SOURCE.split("\n")[3:])
+        self.assertEqual(body.split("\n")[:3], ["", "", ""])
+
+
+@unittest.skipUnless(shutil.which("pdflatex"), "pdflatexがインストールされていません")
+class FormatCacheLineNumberTest(SimpleTestCase):
+    def _error_lines(self, format_cache_enabled):
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                tempfile.TemporaryDirectory() as work_dir, \
+                override_settings(
+                    LATEX_FORMAT_CACHE_ENABLED=format_cache_enabled,
+                    LATEX_FORMAT_CACHE_DIR=cache_dir,
+                ):
+            pdf_service = PDFService()
+            pdf_service.latex_command = "pdflatex"
+            with self.assertRaises(LatexCompileError) as context:
+                pdf_service._compile(SOURCE, work_dir)
+            if format_cache_enabled:
+                self.assertIsNotNone(pdf_service.last_compile_metrics["format"])
+        return [diagnostic["line"] for diagnostic in context.exception.diagnostics]
+
+    def test_error_lines_match_with_and_without_format_cache(self):
+        lines_without_cache = self._error_lines(False)
+        self.assertIn(6, lines_without_cache)
+        self.assertEqual(self._error_lines(True), lines_without_cache)
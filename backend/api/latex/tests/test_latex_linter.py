@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+from api.latex.services.latex_linter import lint_latex
+
+
+def document(body):
+    return "\\documentclass{article}\n\\begin{document}\n" + body + "\n\\end{document}\n"
+
+
+class LatexLinterVerbatimArgumentTest(SimpleTestCase):
+    def test_backslash_before_closing_brace_in_url(self):
+        self.assertEqual(lint_latex(document(r"\url{C:\\dir\\} と \path{C:\dir\}")), [])
+
+    def test_percent_and_braces_in_url(self):
+        self.assertEqual(lint_latex(document(r"\href{http://example.com/%7E{a}}{リンク}")), [])
+
+    def test_delimited_url_argument(self):
+        self.assertEqual(lint_latex(document(r"\url|a{b| と \verb|}|")), [])
+
+    def test_unclosed_url_is_reported(self):
+        errors = lint_latex(document(r"\url{http://example.com" + "\n\n本文"))
+        self.assertEqual([error["line"] for error in errors], [3])
@@ -0,0 +1,46 @@
+import os
+import signal
+import subprocess
+import sys
+import unittest
+from django.test import SimpleTestCase, override_settings
+from api.latex.services.process_limits import (
+    limited_command,
+    limit_for_returncode,
+    wait_with_rusage,
+)
+
+# SIGXCPUを無視してCPU時間を使い続けるプロセス
+CPU_LOOP = "import signal\nsignal.signal(signal.SIGXCPU, signal.SIG_IGN)\nwhile True: pass"
+
+
+@unittest.skipUnless(os.name == "posix", "リソース制限はPOSIXでのみ適用されます")
+@override_settings(
+    LATEX_LIMIT_CPU_SECONDS=1,
+    LATEX_LIMIT_MEMORY_BYTES=0,
+    LATEX_LIMIT_FILE_BYTES=0,
+    LATEX_LIMIT_OPEN_FILES=0,
+)
+class ProcessLimitsTest(SimpleTestCase):
+    def _run(self, code, kill=False):
+        process = subprocess.Popen(limited_command([sys.executable, "-c", code]))
+        if kill:
+            process.kill()
+        rusage = None
+        while process.returncode is None:
+            try:
+                rusage = wait_with_rusage(process, 10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        return process.returncode, rusage
+
+    def test_cpu_hard_limit_is_reported_as_cpu_time(self):
+        returncode, rusage = self._run(CPU_LOOP)
+        self.assertEqual(returncode, -signal.SIGKILL)
+        self.assertEqual(limit_for_returncode(returncode, rusage), "cpu_time")
+
+    def test_external_sigkill_is_not_reported_as_cpu_time(self):
+        returncode, rusage = self._run("import time\ntime.sleep(10)", kill=True)
+        self.assertEqual(returncode, -signal.SIGKILL)
+        self.assertIsNone(limit_for_returncode(returncode, rusage))
+        self.assertIsNone(limit_for_returncode(returncode))
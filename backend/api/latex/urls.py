@@ -1,8 +1,32 @@
 from django.urls import path
 from api.latex.views.latex_render_view import LatexRenderView
+from api.latex.views.latex_ephemeral_render_view import LatexEphemeralRenderView, LatexRenderCommitView
 from api.latex.views.pdf_view import PDFView
+from api.latex.views.compile_stats_view import LatexCompileStatsView
+from api.latex.views.compile_job_view import CompileJobStatusView
+from api.latex.views.preview_view import PreviewImageView
+from api.latex.views.latex_draft_view import LatexDraftView, LatexDraftCommitView, LatexDocumentPDFView
+from api.latex.views.compile_batch_view import CompileBatchView, CompileBatchStatusView
 
 urlpatterns = [
     path("render/", LatexRenderView.as_view(), name="latex-render"),
+    path("render/preview/", LatexEphemeralRenderView.as_view(), name="latex-render-preview"),
+    path("render/commit/", LatexRenderCommitView.as_view(), name="latex-render-commit"),
+    path("drafts/<uuid:problem_id>/<str:document_type>/", LatexDraftView.as_view(), name="latex-draft"),
+    path(
+        "drafts/<uuid:problem_id>/<str:document_type>/commit/",
+        LatexDraftCommitView.as_view(),
+        name="latex-draft-commit",
+    ),
+    path(
+        "documents/<str:document_type>/<uuid:document_id>/pdf/",
+        LatexDocumentPDFView.as_view(),
+        name="latex-document-pdf",
+    ),
+    path("jobs/<uuid:pk>/", CompileJobStatusView.as_view(), name="latex-compile-job"),
+    path("batches/", CompileBatchView.as_view(), name="latex-compile-batch"),
+    path("batches/<uuid:batch_id>/", CompileBatchStatusView.as_view(), name="latex-compile-batch-status"),
+    path("stats/", LatexCompileStatsView.as_view(), name="latex-compile-stats"),
     path("pdf/<path:file_path>", PDFView.as_view(), name="pdf-view"),
+    path("preview/<str:file_name>", PreviewImageView.as_view(), name="latex-preview"),
 ]
@@ -0,0 +1,109 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from django.conf import settings
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.serializers.latex_serializer import (
+    CompileBatchRequestSerializer,
+    CompileBatchSerializer,
+)
+from app.models.compile_job import CompileJob
+from app.utils.file_storage import FileStorage
+from api.latex.services.compile_batch_service import (
+    select_batch_documents,
+    create_compile_batch,
+    compile_batch_status,
+)
+
+
+class CompileBatchView(BaseAPIView):
+    """
+    一括コンパイルの登録用ビュー
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="一括コンパイルの登録",
+        description=(
+            "指定したドキュメント（またはプロジェクトごとの最新バージョン）をまとめてコンパイルするジョブを登録します。"
+            "新しいバージョンは作成せず、各ドキュメントのPDFを更新します"
+        ),
+        request=CompileBatchRequestSerializer,
+        responses={202: CompileBatchSerializer},
+    )
+    def post(self, request):
+        try:
+            serializer = CompileBatchRequestSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            document_type = serializer.validated_data["document_type"]
+            documents = list(select_batch_documents(
+                document_type,
+                document_ids=serializer.validated_data.get("document_ids"),
+                problem_ids=serializer.validated_data.get("problem_ids"),
+                user=request.user,
+            ))
+            if not documents:
+                return Response(
+                    {"error": "コンパイル対象のドキュメントが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            if len(documents) > settings.LATEX_BATCH_MAX_DOCUMENTS:
+                return Response(
+                    {"error": f"一度にコンパイルできるドキュメントは{settings.LATEX_BATCH_MAX_DOCUMENTS}件までです"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            batch_id = create_compile_batch(documents, document_type)
+            self.log_info(f"一括コンパイル登録: バッチ {batch_id}（{len(documents)}件）")
+            return Response(
+                CompileBatchSerializer(compile_batch_status(batch_id)).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+        except Exception as e:
+            self.log_error(f"一括コンパイル登録エラー: {str(e)}")
+            return Response(
+                {"error": f"一括コンパイルの登録中にエラーが発生しました: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class CompileBatchStatusView(BaseAPIView):
+    """
+    一括コンパイルの進捗・結果取得用ビュー
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="一括コンパイルの状態取得",
+        description="バッチ全体の進捗と、ドキュメントごとのコンパイル結果を取得します",
+        responses={200: CompileBatchSerializer},
+    )
+    def get(self, request, batch_id):
+        """
+        一括コンパイルの状態を取得
+        """
+        jobs = list(CompileJob.objects.filter(batch_id=batch_id, user=request.user))
+        if not jobs:
+            return Response(
+                {"error": "バッチが見つかりません"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        result = compile_batch_status(batch_id)
+        result["items"] = [
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "document_type": job.document_type,
+                "document_id": job.document_id,
+                "pdf_url": FileStorage.get_file_url(job.pdf_path) if job.pdf_path else None,
+                "error": job.error,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+            for job in jobs
+        ]
+        return Response(CompileBatchSerializer(result).data, status=status.HTTP_200_OK)
@@ -0,0 +1,60 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from api.latex.services.exceptions import (
+    CompileQueueFullError,
+    LatexValidationError,
+    CompileCancelledError,
+    LatexCompileError,
+    LatexPatchError,
+    LatexSourceConflictError,
+)
+
+
+def compile_error_response(view, e, action, error_message="PDF生成中にエラーが発生しました"):
+    """
+    LaTeXのレンダリング・プレビュー・確定で発生した例外をレスポンスに変換する
+    DRFの例外（シリアライザのValidationErrorなど）はDRFのレスポンスに任せるため、そのまま送出する
+    """
+    if isinstance(e, APIException):
+        raise e
+    if isinstance(e, LatexSourceConflictError):
+        return Response(
+            {"error": str(e), "checksum": e.current_checksum},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if isinstance(e, LatexPatchError):
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if isinstance(e, CompileCancelledError):
+        view.log_info(f"{action}取り消し: {str(e)}")
+        return Response(
+            {"error": str(e), "superseded": True},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if isinstance(e, LatexValidationError):
+        view.log_warning(f"LaTeX構文エラー: {str(e)}")
+        return Response(
+            {"error": str(e), "errors": e.errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if isinstance(e, LatexCompileError):
+        view.log_warning(f"LaTeXコンパイルエラー: {str(e)}")
+        return Response(
+            {"error": str(e), "diagnostics": e.diagnostics, "cached": e.cached},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if isinstance(e, CompileQueueFullError):
+        view.log_warning(f"{action}: {str(e)}")
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    view.log_error(f"{action}エラー: {str(e)}")
+    return Response(
+        {"error": f"{error_message}: {str(e)}"},
+        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
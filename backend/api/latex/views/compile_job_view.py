@@ -0,0 +1,49 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.serializers.latex_serializer import CompileJobSerializer
+from app.models.compile_job import CompileJob
+from app.utils.file_storage import FileStorage
+
+
+class CompileJobStatusView(BaseAPIView):
+    """
+    非同期コンパイルジョブの状態取得用ビュー
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="コンパイルジョブの状態取得",
+        description="非同期で登録したLaTeXコンパイルジョブの状態と、完了時は生成されたPDFのURLを取得します",
+        responses={200: CompileJobSerializer},
+    )
+    def get(self, request, pk):
+        """
+        コンパイルジョブの状態を取得
+        """
+        try:
+            job = CompileJob.objects.get(id=pk, user=request.user)
+        except CompileJob.DoesNotExist:
+            return Response(
+                {"error": "コンパイルジョブが見つかりません"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        pdf_url = None
+        if job.pdf_path:
+            pdf_url = FileStorage.get_file_url(job.pdf_path)
+
+        serializer = CompileJobSerializer({
+            "job_id": job.id,
+            "status": job.status,
+            "document_type": job.document_type,
+            "document_id": job.document_id,
+            "pdf_url": pdf_url,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        })
+        return Response(serializer.data, status=status.HTTP_200_OK)
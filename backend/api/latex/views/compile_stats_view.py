@@ -0,0 +1,41 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from drf_spectacular.utils import extend_schema
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.services.compile_cache import PDFCompileCache
+from api.latex.services.compile_metrics import CompileMetrics
+from api.latex.services.compile_scheduler import CompileScheduler
+from api.latex.services.compile_job_service import compile_job_stats
+from api.latex.services.preview_service import PDFPreviewCache
+from api.latex.services.failure_cache import CompileFailureCache
+from api.latex.services.ephemeral_preview_service import EphemeralPreviewStore
+
+
+class LatexCompileStatsView(BaseAPIView):
+    """
+    LaTeXコンパイルの統計情報取得用ビュー（管理者のみ）
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        summary="LaTeXコンパイル統計取得",
+        description="PDFキャッシュのヒット率などコンパイル関連の統計情報を取得します",
+        responses={200: None},
+    )
+    def get(self, request):
+        """
+        コンパイル統計を取得
+        """
+        return Response(
+            {
+                "compile": CompileMetrics.stats(),
+                "cache": PDFCompileCache().stats(),
+                "preview_cache": PDFPreviewCache().stats(),
+                "failure_cache": CompileFailureCache().stats(),
+                "ephemeral_previews": EphemeralPreviewStore().stats(),
+                "scheduler": CompileScheduler.get().stats(),
+                "jobs": compile_job_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
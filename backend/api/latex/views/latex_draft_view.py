@@ -0,0 +1,298 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from django.db import transaction
+from django.shortcuts import redirect
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.serializers.latex_serializer import (
+    LatexDraftSerializer,
+    LatexDraftUpdateRequestSerializer,
+    LatexDraftPatchRequestSerializer,
+    LatexDraftCommitRequestSerializer,
+    LatexRenderResponseSerializer,
+)
+from app.models.problem import Problem
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+from app.models.latex_draft import LatexDraft
+from api.latex.services.draft_service import (
+    get_draft,
+    save_draft,
+    discard_draft,
+    get_base_document,
+    text_checksum,
+)
+from api.latex.services.document_version_service import (
+    create_document_version,
+    compile_document,
+    get_document,
+    get_document_pdf_url,
+)
+from api.latex.services.exceptions import (
+    LatexPatchError,
+    DraftConflictError,
+    LatexSourceConflictError,
+    LatexCompileError,
+    CompileQueueFullError,
+)
+
+DOCUMENT_TYPES = ["problem", "explanation"]
+
+
+def _get_problem(request, problem_id, document_type):
+    """
+    下書きの対象となるプロジェクトを取得し、取得できない場合はエラーレスポンスを返す
+    """
+    if document_type not in DOCUMENT_TYPES:
+        return None, Response(
+            {"error": "ドキュメントタイプが不正です"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    try:
+        problem = Problem.objects.select_related('user').get(id=problem_id, deleted_at__isnull=True)
+    except Problem.DoesNotExist:
+        return None, Response(
+            {"error": "プロジェクトが見つかりません"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if problem.user != request.user:
+        return None, Response(
+            {"error": "このプロジェクトへのアクセス権限がありません"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return problem, None
+
+
+def _draft_response(draft, status_code=status.HTTP_200_OK):
+    serializer = LatexDraftSerializer({
+        "problem_id": draft.problem_id,
+        "document_type": draft.document_type,
+        "latex_code": draft.latex_code,
+        "revision": draft.revision,
+        "checksum": text_checksum(draft.latex_code),
+        "updated_at": draft.updated_at,
+    })
+    return Response(serializer.data, status=status_code)
+
+
+class LatexDraftView(BaseAPIView):
+    """
+    編集中のLaTeXコードの下書きを保存・取得するビュー
+    保存時にはコンパイルせず、コンパイルはレンダリング・確定・PDFの初回表示時に行う
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="下書きの取得",
+        description="編集中のLaTeXコードを取得します。下書きがない場合は最新バージョンのLaTeXコードを返します",
+        responses={200: LatexDraftSerializer},
+    )
+    def get(self, request, problem_id, document_type):
+        problem, error_response = _get_problem(request, problem_id, document_type)
+        if error_response:
+            return error_response
+
+        return _draft_response(get_draft(problem, document_type))
+
+    @extend_schema(
+        summary="下書きの保存（全文）",
+        description="編集中のLaTeXコードを全文で保存します。TeXは実行しません",
+        request=LatexDraftUpdateRequestSerializer,
+        responses={200: LatexDraftSerializer},
+    )
+    def put(self, request, problem_id, document_type):
+        problem, error_response = _get_problem(request, problem_id, document_type)
+        if error_response:
+            return error_response
+
+        serializer = LatexDraftUpdateRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return self._save(
+            problem,
+            document_type,
+            latex_code=serializer.validated_data["latex_code"],
+            base_revision=serializer.validated_data.get("base_revision"),
+        )
+
+    @extend_schema(
+        summary="下書きの保存（差分）",
+        description="編集中のLaTeXコードに差分を適用して保存します。TeXは実行しません",
+        request=LatexDraftPatchRequestSerializer,
+        responses={200: LatexDraftSerializer},
+    )
+    def patch(self, request, problem_id, document_type):
+        problem, error_response = _get_problem(request, problem_id, document_type)
+        if error_response:
+            return error_response
+
+        serializer = LatexDraftPatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        base_document = None
+        base_document_id = serializer.validated_data.get("base_document_id")
+        if base_document_id:
+            try:
+                base_document = get_base_document(problem, document_type, base_document_id)
+            except (ProblemLatexDocument.DoesNotExist, Explanation.DoesNotExist):
+                return Response(
+                    {"error": "差分の元になるドキュメントが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        return self._save(
+            problem,
+            document_type,
+            patches=serializer.validated_data["patches"],
+            base_revision=serializer.validated_data.get("base_revision"),
+            base_checksum=serializer.validated_data.get("base_checksum"),
+            base_document=base_document,
+        )
+
+    def _save(self, problem, document_type, latex_code=None, patches=None, base_revision=None,
+              base_checksum=None, base_document=None):
+        try:
+            draft = save_draft(
+                problem,
+                document_type,
+                latex_code=latex_code,
+                patches=patches,
+                base_revision=base_revision,
+                base_checksum=base_checksum,
+                base_document=base_document,
+            )
+        except DraftConflictError as e:
+            return Response(
+                {"error": str(e), "revision": e.current_revision},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except LatexSourceConflictError as e:
+            return Response(
+                {"error": str(e), "checksum": e.current_checksum},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except LatexPatchError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return _draft_response(draft)
+
+
+class LatexDraftCommitView(BaseAPIView):
+    """
+    下書きを新しいバージョンとして保存するビュー
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="下書きの確定",
+        description=(
+            "下書きを新しいバージョンとして保存します。確認済みにする場合を除きコンパイルせず、"
+            "PDFは初回表示時に生成します"
+        ),
+        request=LatexDraftCommitRequestSerializer,
+        responses={201: LatexRenderResponseSerializer},
+    )
+    def post(self, request, problem_id, document_type):
+        problem, error_response = _get_problem(request, problem_id, document_type)
+        if error_response:
+            return error_response
+
+        serializer = LatexDraftCommitRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        confirm = serializer.validated_data.get("confirm", False)
+
+        draft = LatexDraft.objects.filter(problem=problem, document_type=document_type).first()
+        if draft is None:
+            return Response(
+                {"error": "保存されている下書きがありません"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        with transaction.atomic():
+            new_doc = create_document_version(problem, document_type, draft.latex_code)
+            if confirm:
+                new_doc.is_confirmed = True
+                new_doc.save(update_fields=["is_confirmed"])
+            discard_draft(problem, document_type)
+
+        if confirm:
+            # 確認済みのバージョンはすぐに参照されるため、確定時にコンパイルする
+            try:
+                compile_document(new_doc, document_type, request.user)
+            except Exception as e:
+                self.log_warning(f"確定時のコンパイルに失敗しました: {str(e)}")
+
+        response_serializer = LatexRenderResponseSerializer({
+            "latex_document_id": new_doc.id,
+            "pdf_url": get_document_pdf_url(document_type, new_doc),
+            "version": new_doc.version,
+            "updated_at": new_doc.updated_at,
+            "job_id": None,
+        })
+
+        self.log_info(f"下書き確定: {document_type} {new_doc.id}")
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class LatexDocumentPDFView(BaseAPIView):
+    """
+    ドキュメントのPDFを表示するビュー
+    まだコンパイルしていないドキュメントは、初回の表示時にコンパイルする
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="ドキュメントのPDFの表示",
+        description="ドキュメントのPDFにリダイレクトします。PDFがまだない場合はコンパイルしてから返します",
+        responses={302: None},
+    )
+    def get(self, request, document_type, document_id):
+        if document_type not in DOCUMENT_TYPES:
+            return Response(
+                {"error": "ドキュメントタイプが不正です"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        try:
+            document = get_document(document_type, document_id)
+        except (ProblemLatexDocument.DoesNotExist, Explanation.DoesNotExist):
+            return Response(
+                {"error": "ドキュメントが見つかりません"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if document.problem.user_id != request.user.id:
+            return Response(
+                {"error": "このプロジェクトへのアクセス権限がありません"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if not document.pdf_exists():
+            try:
+                compile_document(document, document_type, request.user)
+            except LatexCompileError as e:
+                return Response(
+                    {"error": str(e), "diagnostics": e.diagnostics, "cached": e.cached},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except CompileQueueFullError as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(e.retry_after)},
+                )
+            except Exception as e:
+                self.log_error(f"PDF生成エラー: {document_type} {document.id}: {str(e)}")
+                return Response(
+                    {"error": f"PDF生成中にエラーが発生しました: {str(e)}"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            self.log_info(f"PDFを初回表示時に生成: {document_type} {document.id}")
+
+        return redirect(get_document_pdf_url(document_type, document))
@@ -0,0 +1,205 @@
+import os
+import subprocess
+import uuid
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from django.conf import settings
+from django.db import transaction
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.serializers.latex_serializer import (
+    LatexEphemeralRenderRequestSerializer,
+    LatexEphemeralRenderResponseSerializer,
+    LatexRenderCommitRequestSerializer,
+    LatexRenderResponseSerializer,
+)
+from app.models.problem import Problem
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+from app.utils.file_storage import FileStorage
+from api.latex.services.pdf_service import PDFService
+from api.latex.services.compile_job_service import check_compile_admission
+from api.latex.services.compile_coalescer import CompileCoalescer
+from api.latex.services.document_version_service import (
+    create_document_version,
+    get_document_template,
+)
+from api.latex.services.ephemeral_preview_service import EphemeralPreviewStore
+from api.latex.services.draft_service import discard_draft, resolve_request_source
+from api.latex.services.compile_cache import PDFCompileCache
+from api.latex.services.preview_service import PDFPreviewCache
+from api.latex.views.compile_error_response import compile_error_response
+from api.template.services.template_service import get_template_engine
+
+
+class LatexEphemeralRenderView(BaseAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="LaTeXコードのプレビュー",
+        description="バージョンを作成せずにLaTeXコードをコンパイルし、有効期限付きのPDFのURLを返します",
+        request=LatexEphemeralRenderRequestSerializer,
+        responses={200: LatexEphemeralRenderResponseSerializer},
+    )
+    def post(self, request):
+        try:
+            serializer = LatexEphemeralRenderRequestSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            problem_id = serializer.validated_data["problem_id"]
+            document_type_str = serializer.validated_data["document_type"]
+            skip_validation = serializer.validated_data.get(
+                "skip_validation", False)
+            preview_pages = serializer.validated_data.get("preview_pages") or []
+            preview_dpi = serializer.validated_data.get(
+                "preview_dpi") or settings.LATEX_PREVIEW_DPI
+
+            try:
+                problem = Problem.objects.select_related(
+                    'user').get(id=problem_id)
+            except Problem.DoesNotExist:
+                return Response(
+                    {"error": "プロジェクトが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            if problem.user != request.user:
+                return Response(
+                    {"error": "このプロジェクトへのアクセス権限がありません"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+            try:
+                latex_code = resolve_request_source(
+                    problem, document_type_str, serializer.validated_data)
+            except (ProblemLatexDocument.DoesNotExist, Explanation.DoesNotExist):
+                return Response(
+                    {"error": "差分の元になるドキュメントが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            check_compile_admission(request.user, "sync")
+
+            store = EphemeralPreviewStore()
+            # レンダリングと同じキーで、同じドキュメントに対する古いコンパイルを取り消す
+            coalesce_key = (problem.id, document_type_str)
+            cancel_token = CompileCoalescer.begin(coalesce_key)
+            try:
+                pdf_service = PDFService()
+                pdf_path = pdf_service.latex_to_pdf(
+                    latex_code,
+                    output_filename="preview",
+                    use_template=False,
+                    user_id=request.user.id,
+                    skip_validation=skip_validation,
+                    cancel_token=cancel_token,
+                    build_key=f"{problem.id}_{document_type_str}",
+                    engine=get_template_engine(
+                        get_document_template(problem, document_type_str)) or None,
+                    folder_name=store.folder_name,
+                )
+            finally:
+                CompileCoalescer.finish(coalesce_key, cancel_token)
+
+            # DBには書き込まず、確定に必要な情報は一時保存領域に置く
+            preview_id, expires_at = store.save(
+                request.user.id,
+                problem.id,
+                document_type_str,
+                latex_code,
+                pdf_path,
+                pdf_service.latex_command,
+            )
+
+            response_data = {
+                "preview_id": uuid.UUID(preview_id),
+                "pdf_url": FileStorage.get_file_url(pdf_path),
+                "expires_at": expires_at,
+            }
+            if preview_pages:
+                source_key = PDFCompileCache.make_key(
+                    latex_code, pdf_service.latex_command)
+                try:
+                    response_data["preview_urls"] = PDFPreviewCache().render_pages(
+                        source_key, pdf_path, preview_pages, preview_dpi, request.user.id)
+                except (OSError, subprocess.SubprocessError) as e:
+                    self.log_warning(f"プレビュー画像の生成に失敗しました: {str(e)}")
+                    response_data["preview_urls"] = []
+
+            response_serializer = LatexEphemeralRenderResponseSerializer(response_data)
+            return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return compile_error_response(self, e, "LaTeXプレビュー")
+
+
+class LatexRenderCommitView(BaseAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="プレビューの確定",
+        description="プレビューしたLaTeXコードを新しいバージョンとして保存します。プレビューのPDFを再利用するため再コンパイルしません",
+        request=LatexRenderCommitRequestSerializer,
+        responses={201: LatexRenderResponseSerializer},
+    )
+    def post(self, request):
+        try:
+            serializer = LatexRenderCommitRequestSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            preview_id = serializer.validated_data["preview_id"].hex
+            store = EphemeralPreviewStore()
+            entry = store.get(preview_id, request.user.id)
+            if not entry:
+                return Response(
+                    {"error": "プレビューが見つからないか、有効期限が切れています"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            try:
+                problem = Problem.objects.select_related(
+                    'user').get(id=entry["problem_id"])
+            except Problem.DoesNotExist:
+                return Response(
+                    {"error": "プロジェクトが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            if problem.user != request.user:
+                return Response(
+                    {"error": "このプロジェクトへのアクセス権限がありません"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+            with transaction.atomic():
+                new_doc = create_document_version(
+                    problem, entry["document_type"], entry["latex_code"])
+                # プレビューのPDFをメモリに読み込まずにコピーして保存する
+                new_doc.pdf_path = FileStorage.save_pdf_file(
+                    os.path.join(settings.MEDIA_ROOT, entry["pdf_path"]),
+                    folder_name="pdfs",
+                    prefix=f"latex_{new_doc.id}",
+                )
+                new_doc.engine = entry["engine"]
+                new_doc.save()
+                # 同じ内容の下書きはバージョンとして保存されたため削除する
+                discard_draft(problem, entry["document_type"], entry["latex_code"])
+            store.discard(preview_id)
+
+            response_serializer = LatexRenderResponseSerializer(
+                {
+                    "latex_document_id": new_doc.id,
+                    "pdf_url": FileStorage.get_file_url(new_doc.pdf_path),
+                    "version": new_doc.version,
+                    "updated_at": new_doc.updated_at,
+                    "job_id": None,
+                }
+            )
+
+            self.log_info(f"LaTeXプレビュー確定: {entry['document_type']} {new_doc.id}")
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return compile_error_response(
+                self, e, "LaTeXプレビュー確定", "プレビューの確定中にエラーが発生しました")
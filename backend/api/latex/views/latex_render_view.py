@@ -1,8 +1,10 @@
+import subprocess
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
-from django.db.models import Max
+from django.conf import settings
+from django.db import transaction
 from api.shared.views.base_api_view import BaseAPIView
 from api.latex.serializers.latex_serializer import (
     LatexRenderRequestSerializer,
@@ -13,6 +15,22 @@ from app.models.explanation import Explanation
 from app.models.problem import Problem
 from app.utils.file_storage import FileStorage
 from api.latex.services.pdf_service import PDFService
+from api.latex.services.compile_job_service import (
+    enqueue_compile_job,
+    check_compile_admission,
+)
+from api.latex.services.exceptions import LatexValidationError
+from api.latex.services.compile_coalescer import CompileCoalescer
+from api.latex.services.document_version_service import (
+    create_document_version,
+    get_document_template,
+)
+from api.latex.services.draft_service import discard_draft, resolve_request_source, text_checksum
+from api.latex.services.latex_linter import lint_latex
+from api.latex.services.compile_cache import PDFCompileCache
+from api.latex.services.preview_service import PDFPreviewCache
+from api.latex.views.compile_error_response import compile_error_response
+from api.template.services.template_service import get_template_engine
 
 
 class LatexRenderView(BaseAPIView):
@@ -22,7 +40,7 @@ class LatexRenderView(BaseAPIView):
         summary="LaTeXコードをPDFに変換",
         description="編集されたLaTeXコードをPDFに変換します",
         request=LatexRenderRequestSerializer,
-        responses={200: LatexRenderResponseSerializer},
+        responses={200: LatexRenderResponseSerializer, 202: LatexRenderResponseSerializer},
     )
     def post(self, request):
         try:
@@ -33,7 +51,13 @@ class LatexRenderView(BaseAPIView):
             document_type_str = serializer.validated_data["document_type"]
             latex_document_id = serializer.validated_data.get(
                 "latex_document_id")
-            latex_code = serializer.validated_data["latex_code"]
+            mode = serializer.validated_data.get(
+                "mode") or settings.LATEX_COMPILE_MODE
+            skip_validation = serializer.validated_data.get(
+                "skip_validation", False)
+            preview_pages = serializer.validated_data.get("preview_pages") or []
+            preview_dpi = serializer.validated_data.get(
+                "preview_dpi") or settings.LATEX_PREVIEW_DPI
 
             try:
                 problem = Problem.objects.select_related(
@@ -50,6 +74,23 @@ class LatexRenderView(BaseAPIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
+            try:
+                latex_code = resolve_request_source(
+                    problem, document_type_str, serializer.validated_data)
+            except (ProblemLatexDocument.DoesNotExist, Explanation.DoesNotExist):
+                return Response(
+                    {"error": "差分の元になるドキュメントが見つかりません"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            check_compile_admission(request.user, mode)
+
+            if settings.LATEX_PREFLIGHT_ENABLED and not skip_validation:
+                # バージョンを作成する前に構文エラーを返す
+                lint_errors = lint_latex(latex_code)
+                if lint_errors:
+                    raise LatexValidationError(lint_errors)
+
             if document_type_str == 'problem':
                 if latex_document_id:
                     try:
@@ -66,17 +107,6 @@ class LatexRenderView(BaseAPIView):
                             status=status.HTTP_404_NOT_FOUND,
                         )
 
-                max_version = ProblemLatexDocument.objects.filter(
-                    problem=problem
-                ).aggregate(max_version=Max('version'))['max_version'] or 0
-                new_version = max_version + 1
-
-                new_doc = ProblemLatexDocument.objects.create(
-                    problem=problem,
-                    latex_code=latex_code,
-                    version=new_version,
-                )
-                doc_id = new_doc.id
                 doc_type_name = "ProblemLatexDocument"
             else:
                 if latex_document_id:
@@ -94,56 +124,88 @@ class LatexRenderView(BaseAPIView):
                             status=status.HTTP_404_NOT_FOUND,
                         )
 
-                max_version = Explanation.objects.filter(
-                    problem=problem
-                ).aggregate(max_version=Max('version'))['max_version'] or 0
-                new_version = max_version + 1
-
-                source_problem_latex = ProblemLatexDocument.objects.filter(
-                    problem=problem,
-                    is_confirmed=True
-                ).order_by('-version').first()
-
-                if not source_problem_latex:
-                    source_problem_latex = ProblemLatexDocument.objects.filter(
-                        problem=problem
-                    ).order_by('-version').first()
-
-                new_doc = Explanation.objects.create(
-                    problem=problem,
-                    source_problem_latex=source_problem_latex,
-                    latex_code=latex_code,
-                    version=new_version,
-                )
-                doc_id = new_doc.id
                 doc_type_name = "Explanation"
 
-            pdf_service = PDFService()
-            pdf_path = pdf_service.latex_to_pdf(
-                latex_code,
-                output_filename=f"latex_{new_doc.id}",
-                use_template=False
-            )
-            pdf_url = FileStorage.get_file_url(pdf_path)
+            if mode == "async":
+                new_doc = create_document_version(problem, document_type_str, latex_code)
+                # 同じ内容の下書きはバージョンとして保存されたため削除する
+                discard_draft(problem, document_type_str, latex_code)
+
+                # コンパイルはワーカーに任せ、ジョブIDをすぐに返す
+                job = enqueue_compile_job(
+                    request.user,
+                    problem,
+                    document_type_str,
+                    new_doc,
+                    output_filename=f"latex_{new_doc.id}",
+                )
+                response_serializer = LatexRenderResponseSerializer(
+                    {
+                        "latex_document_id": new_doc.id,  # 後方互換性のため
+                        "pdf_url": None,
+                        "version": new_doc.version,
+                        "updated_at": new_doc.updated_at,
+                        "job_id": job.id,
+                        "checksum": text_checksum(latex_code),
+                    }
+                )
 
-            new_doc.pdf_path = pdf_path
-            new_doc.save()
+                self.log_info(
+                    f"LaTeXレンダリングジョブ登録: {doc_type_name} {new_doc.id} (CompileJob {job.id})")
+                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
 
-            response_serializer = LatexRenderResponseSerializer(
-                {
-                    "latex_document_id": doc_id,  # 後方互換性のため
-                    "pdf_url": pdf_url,
-                    "version": new_version,
-                    "updated_at": new_doc.updated_at,
-                }
-            )
+            # 同じドキュメントに対する古いレンダリングは取り消し、最新の結果のみを保存する
+            # 取り消し・失敗したコンパイルのバージョンを残さないよう、バージョンはコンパイルの成功後に作成する
+            coalesce_key = (problem.id, document_type_str)
+            cancel_token = CompileCoalescer.begin(coalesce_key)
+            try:
+                pdf_service = PDFService()
+                pdf_path = pdf_service.latex_to_pdf(
+                    latex_code,
+                    output_filename=f"latex_{problem.id}_{document_type_str}",
+                    use_template=False,
+                    user_id=request.user.id,
+                    skip_validation=True,
+                    cancel_token=cancel_token,
+                    build_key=f"{problem.id}_{document_type_str}",
+                    engine=get_template_engine(
+                        get_document_template(problem, document_type_str)) or None,
+                )
+            finally:
+                CompileCoalescer.finish(coalesce_key, cancel_token)
+            pdf_url = FileStorage.get_file_url(pdf_path)
 
-            self.log_info(f"LaTeXレンダリング成功: {doc_type_name} {doc_id}")
+            with transaction.atomic():
+                new_doc = create_document_version(problem, document_type_str, latex_code)
+                new_doc.pdf_path = pdf_path
+                new_doc.engine = pdf_service.latex_command
+                new_doc.save()
+                # 同じ内容の下書きはバージョンとして保存されたため削除する
+                discard_draft(problem, document_type_str, latex_code)
+
+            response_data = {
+                "latex_document_id": new_doc.id,  # 後方互換性のため
+                "pdf_url": pdf_url,
+                "version": new_doc.version,
+                "updated_at": new_doc.updated_at,
+                "job_id": None,
+                "checksum": text_checksum(latex_code),
+            }
+            if preview_pages:
+                # エディタのライブプレビュー用に指定ページを画像化する
+                source_key = PDFCompileCache.make_key(
+                    latex_code, pdf_service.latex_command)
+                try:
+                    response_data["preview_urls"] = PDFPreviewCache().render_pages(
+                        source_key, pdf_path, preview_pages, preview_dpi, request.user.id)
+                except (OSError, subprocess.SubprocessError) as e:
+                    self.log_warning(f"プレビュー画像の生成に失敗しました: {str(e)}")
+                    response_data["preview_urls"] = []
+
+            response_serializer = LatexRenderResponseSerializer(response_data)
+
+            self.log_info(f"LaTeXレンダリング成功: {doc_type_name} {new_doc.id}")
             return Response(response_serializer.data, status=status.HTTP_200_OK)
 
         except Exception as e:
-            self.log_error(f"LaTeXレンダリングエラー: {str(e)}")
-            return Response(
-                {"error": f"PDF生成中にエラーが発生しました: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return compile_error_response(self, e, "LaTeXレンダリング")
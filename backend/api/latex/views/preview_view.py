@@ -0,0 +1,40 @@
+from django.http import FileResponse
+from django.views.decorators.cache import cache_control
+from django.utils.decorators import method_decorator
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from api.shared.views.base_api_view import BaseAPIView
+from api.latex.services.preview_service import PDFPreviewCache
+
+
+@method_decorator(cache_control(private=True, max_age=31536000, immutable=True), name='dispatch')
+class PreviewImageView(BaseAPIView):
+    """
+    PDFのプレビュー画像配信用ビュー
+    ファイル名にソースのハッシュを含むため長期間キャッシュさせるが、
+    非公開のドキュメントの画像のため共有キャッシュには保存させず、プレビューを作成したユーザーにだけ返す
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="プレビュー画像の取得",
+        description="レンダリング時に作成したPDFのプレビュー画像（PNG）を返します",
+        responses={200: None},
+    )
+    def get(self, request, file_name):
+        preview_cache = PDFPreviewCache()
+        entry_path = preview_cache.entry_path(file_name)
+        # 他のユーザーの画像は存在を知られないよう、見つからない場合と同じ応答にする
+        if (
+            entry_path is None
+            or not preview_cache.is_owner(file_name, request.user.id)
+            or not entry_path.is_file()
+        ):
+            return Response(
+                {"error": "プレビュー画像が見つかりません"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return FileResponse(open(entry_path, 'rb'), content_type='image/png')
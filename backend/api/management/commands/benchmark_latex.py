@@ -0,0 +1,102 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.latex.services.compile_benchmark import (
+    ENGINES,
+    load_corpus,
+    run_benchmark,
+    compare_with_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = "ベンチマーク用のLaTeXドキュメントでlatex_to_pdfの所要時間を計測し、結果をJSONで出力します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engine",
+            action="append",
+            dest="engines",
+            choices=ENGINES,
+            help="計測するエンジン（複数指定可。省略時はすべて）",
+        )
+        parser.add_argument(
+            "--document",
+            action="append",
+            dest="documents",
+            help="計測するドキュメント名（benchmark_corpus内のファイル名から拡張子を除いたもの。複数指定可）",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="ドキュメントごとの計測回数",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            dest="modes",
+            choices=["cold", "warm", "warm_hit"],
+            help="キャッシュの状態（複数指定可。省略時はcoldとwarm）",
+        )
+        parser.add_argument(
+            "--output",
+            help="結果のJSONを保存するファイル（省略時は標準出力）",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="比較するベースラインのJSONファイル",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="ベースラインより悪化したとみなす変化率（所要時間・メモリ使用量）（0.1 = 10%%）",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="ベースラインより悪化した項目がある場合は終了コード1で終了する",
+        )
+
+    def handle(self, *args, **options):
+        documents = load_corpus(options["documents"])
+        if not documents:
+            raise CommandError("計測対象のドキュメントがありません")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"], "r", encoding="utf-8") as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"ベースラインを読み込めません: {str(e)}")
+
+        result = run_benchmark(
+            engines=options["engines"],
+            documents=documents,
+            runs=options["runs"],
+            modes=options["modes"] or ["cold", "warm"],
+        )
+
+        regressions = []
+        if baseline is not None:
+            result["comparison"] = compare_with_baseline(
+                result, baseline, threshold=options["threshold"])
+            regressions = [item for item in result["comparison"] if item["regression"]]
+
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output)
+            self.stdout.write(f"結果を保存しました: {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        for item in regressions:
+            self.stderr.write(
+                f"悪化しました: {item['engine']} {item['document']} {item['mode']} "
+                f"{item['metric']} {item['baseline']:.3f} -> {item['current']:.3f} "
+                f"({item['change']:+.1%})"
+            )
+        if regressions and options["fail_on_regression"]:
+            raise SystemExit(1)
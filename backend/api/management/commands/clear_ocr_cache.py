@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.ocr.services.ocr_cache import OCRResultCache
+
+
+class Command(BaseCommand):
+    help = "OCR結果とAI校正後のLaTeXコードのキャッシュを削除します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--expired",
+            action="store_true",
+            help="有効期限切れと上限を超えた分のエントリだけを削除する",
+        )
+
+    def handle(self, *args, **options):
+        cache = OCRResultCache()
+        if options["expired"]:
+            removed = cache.evict()
+        else:
+            removed = cache.clear()
+        self.stdout.write(f"OCRキャッシュのエントリを{removed}件削除しました")
@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from app.models.latex_document import DocumentType
+from api.latex.services.compile_batch_service import (
+    select_batch_documents,
+    create_compile_batch,
+    requeue_running_jobs,
+    run_compile_batch,
+)
+
+
+class Command(BaseCommand):
+    help = "複数のLaTeXドキュメントをプロセスプールで並列にコンパイルし、pdf_pathを一括更新します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch",
+            help="既存のバッチIDを指定して処理を再開する（APIから登録したバッチの実行にも使用）",
+        )
+        parser.add_argument(
+            "--document-type",
+            choices=[DocumentType.PROBLEM, DocumentType.EXPLANATION],
+            default=DocumentType.PROBLEM,
+            help="新しいバッチを作成する場合のドキュメントタイプ",
+        )
+        parser.add_argument(
+            "--document-id",
+            action="append",
+            dest="document_ids",
+            help="対象のドキュメントID（複数指定可）",
+        )
+        parser.add_argument(
+            "--problem-id",
+            action="append",
+            dest="problem_ids",
+            help="対象のプロジェクトID（複数指定可。各プロジェクトの最新バージョンを対象にする）",
+        )
+        parser.add_argument(
+            "--user",
+            help="対象を指定したユーザー名のプロジェクトに限定する",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="並列に実行するプロセス数（省略時はLATEX_BATCH_WORKERS）",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="失敗したジョブも再実行する",
+        )
+
+    def handle(self, *args, **options):
+        batch_id = options["batch"]
+        if batch_id:
+            # 中断時に実行中のまま残ったジョブから再開する
+            requeued = requeue_running_jobs(batch_id)
+            if requeued:
+                self.stdout.write(f"実行中のまま残っていた{requeued}件のジョブを再実行します")
+        else:
+            user = None
+            if options["user"]:
+                try:
+                    user = User.objects.get(username=options["user"])
+                except User.DoesNotExist:
+                    raise CommandError(f"ユーザーが見つかりません: {options['user']}")
+
+            documents = list(select_batch_documents(
+                options["document_type"],
+                document_ids=options["document_ids"],
+                problem_ids=options["problem_ids"],
+                user=user,
+            ))
+            if not documents:
+                self.stdout.write("コンパイル対象のドキュメントがありません")
+                return
+            batch_id = create_compile_batch(documents, options["document_type"])
+            self.stdout.write(f"バッチ {batch_id} を作成しました（{len(documents)}件）")
+
+        def on_result(job_id, pdf_path, error):
+            if error:
+                self.stdout.write(f"CompileJob {job_id}: failed: {error}")
+            else:
+                self.stdout.write(f"CompileJob {job_id}: succeeded")
+
+        try:
+            result = run_compile_batch(
+                batch_id,
+                workers=options["workers"],
+                retry_failed=options["retry_failed"],
+                on_result=on_result,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(f"中断しました。--batch {batch_id} を指定すると再開できます")
+            return
+
+        self.stdout.write(
+            f"バッチ {batch_id}: {result['total']}件中 "
+            f"成功 {result['status_counts'].get('succeeded', 0)}件 / "
+            f"失敗 {result['status_counts'].get('failed', 0)}件"
+        )
@@ -0,0 +1,56 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.latex.services.compile_job_service import (
+    claim_next_job,
+    run_compile_job,
+    requeue_stale_compile_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = "DBに登録された非同期LaTeXコンパイルジョブを順に実行します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="待機中のジョブをすべて処理したら終了する",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="ジョブがない場合の待機秒数",
+        )
+        parser.add_argument(
+            "--requeue-interval",
+            type=float,
+            default=60.0,
+            help="実行中のまま残ったジョブを待機中に戻す間隔（秒）",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("コンパイルワーカーを起動しました")
+        requeued_at = None
+        try:
+            while True:
+                close_old_connections()
+                if requeued_at is None or time.monotonic() - requeued_at >= options["requeue_interval"]:
+                    requeued = requeue_stale_compile_jobs()
+                    if requeued:
+                        self.stdout.write(f"実行中のまま残っていた{requeued}件のジョブを再実行します")
+                    requeued_at = time.monotonic()
+
+                job = claim_next_job()
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                job = run_compile_job(job)
+                self.stdout.write(f"CompileJob {job.id}: {job.status}")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("コンパイルワーカーを終了しました")
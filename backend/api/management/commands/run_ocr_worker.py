@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.ocr.services.model_registry import Pix2TextRegistry
+from api.ocr.services.ocr_worker import OCRWorkerServer
+
+
+class Command(BaseCommand):
+    help = "Pix2Textのモデルを読み込んだまま、ローカルのUnixソケットでOCRを受け付けます"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=None,
+            help="待ち受けるUnixソケットのパス（省略時はOCR_WORKER_SOCKET）",
+        )
+        parser.add_argument(
+            "--models",
+            type=int,
+            default=None,
+            help="読み込むモデル数（同時にOCRできる数。省略時はOCR_MODEL_POOL_SIZE）",
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"] or settings.OCR_WORKER_SOCKET
+        registry = Pix2TextRegistry.configure(options["models"] or settings.OCR_MODEL_POOL_SIZE)
+
+        # リクエストを受け付ける前にすべてのモデルを読み込んでおく
+        self.stdout.write(f"OCRモデルを読み込んでいます（{registry.pool_size}個）")
+        registry.preload(registry.pool_size)
+
+        server = OCRWorkerServer(socket_path)
+        self.stdout.write(f"OCRワーカーを起動しました: {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write("OCRワーカーを終了しました")
@@ -4,11 +4,35 @@ from rest_framework import serializers
 class OCRRequestSerializer(serializers.Serializer):
     image = serializers.ImageField(help_text="数学問題の画像ファイル")
     problem_id = serializers.UUIDField(help_text="プロジェクトID（必須）")
+    mode = serializers.ChoiceField(
+        choices=['sync', 'async'],
+        required=False,
+        help_text="PDFコンパイルの実行方式（sync: 同期 / async: ジョブとして非同期実行）"
+    )
+    reuse_cache = serializers.BooleanField(
+        required=False,
+        default=True,
+        help_text="同じ画像・よく似た画像の過去の結果を再利用するかどうか（falseの場合はOCRとAI校正をやり直す）"
+    )
 
 
 class OCRResponseSerializer(serializers.Serializer):
     problem_id = serializers.UUIDField(help_text="問題ID")
     latex_document_id = serializers.UUIDField(help_text="LaTeXドキュメントID")
     latex_code = serializers.CharField(help_text="生成されたLaTeXコード")
-    pdf_url = serializers.URLField(help_text="生成されたPDFのURL")
+    pdf_url = serializers.URLField(
+        allow_null=True, help_text="生成されたPDFのURL（非同期実行の場合はnull）")
+    job_id = serializers.UUIDField(
+        allow_null=True, help_text="コンパイルジョブID（非同期実行の場合のみ）")
+    ocr_cache_status = serializers.ChoiceField(
+        choices=["disabled", "bypassed", "hit", "near_duplicate", "miss"],
+        help_text=(
+            "OCR結果のキャッシュの利用状況（hit: 同じ画像の結果を再利用 / "
+            "near_duplicate: よく似た画像の結果を再利用 / miss: OCRとAI校正を実行）"
+        ),
+    )
+    ocr_cache_distance = serializers.IntegerField(
+        allow_null=True,
+        help_text="よく似た画像の結果を再利用した場合の知覚ハッシュのハミング距離",
+    )
     created_at = serializers.DateTimeField(help_text="作成日時")
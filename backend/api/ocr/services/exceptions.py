@@ -0,0 +1,4 @@
+class OCRWorkerError(RuntimeError):
+    """
+    OCRワーカーに接続できない、またはワーカーでの処理が失敗した場合の例外
+    """
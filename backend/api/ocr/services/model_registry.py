@@ -0,0 +1,156 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, ExitStack
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windowsでは最大常駐メモリ量を取得できない
+    resource = None
+
+logger = logging.getLogger("app")
+
+# 統計に使用する直近の計測数
+SAMPLE_SIZE = 1000
+
+
+def current_rss_bytes():
+    """
+    プロセスの現在の常駐メモリ量を返す（/procがない環境では最大常駐メモリ量で代用する）
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Pix2TextRegistry:
+    """
+    プロセス内で共有するPix2Textモデルのプール
+    モデルの読み込みはプロセスごとに一度だけ行い、各インスタンスは同時に1スレッドだけが使用する
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, pool_size=None):
+        self.pool_size = max(1, pool_size or settings.OCR_MODEL_POOL_SIZE)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        # 読み込み中のメモリ増加量を正しく計測できるよう、モデルは1つずつ読み込む
+        self._load_lock = threading.Lock()
+        self._loaded = 0
+        self._loading = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._load_seconds = []
+        self._load_memory_bytes = []
+        self._wait_samples = deque(maxlen=SAMPLE_SIZE)
+
+    @classmethod
+    def get(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, pool_size):
+        # OCRワーカーの起動時など、プロセス内のモデル数を設定と別に指定する
+        with cls._instance_lock:
+            cls._instance = cls(pool_size=pool_size)
+            return cls._instance
+
+    def _load(self):
+        # pix2textの読み込み自体が重いため、モデルを使用するときに初めてimportする
+        from pix2text import Pix2Text
+
+        with self._load_lock:
+            rss_before = current_rss_bytes()
+            started = time.monotonic()
+            model = Pix2Text()
+            load_seconds = time.monotonic() - started
+            memory_bytes = max(0, current_rss_bytes() - rss_before)
+
+        with self._lock:
+            self._load_seconds.append(load_seconds)
+            self._load_memory_bytes.append(memory_bytes)
+        logger.info(
+            f"Pix2Textモデルを読み込みました: {load_seconds:.2f}秒, {memory_bytes / 1024 / 1024:.1f}MB"
+        )
+        return model
+
+    def preload(self, count=1):
+        """
+        最初のリクエストを待たせないよう、起動時にモデルを読み込んでおく
+        """
+        with ExitStack() as stack:
+            for _ in range(min(count, self.pool_size)):
+                stack.enter_context(self.acquire())
+
+    @contextmanager
+    def acquire(self):
+        started = time.monotonic()
+        model = self._take()
+        with self._lock:
+            self._in_use += 1
+            self._acquisitions += 1
+            self._wait_samples.append(time.monotonic() - started)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(model)
+
+    def _take(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_load = self._loaded + self._loading < self.pool_size
+            if can_load:
+                self._loading += 1
+
+        if not can_load:
+            # プールの上限まで読み込み済みの場合は、他のスレッドが使い終わるのを待つ
+            return self._idle.get()
+
+        try:
+            model = self._load()
+        except BaseException:
+            with self._lock:
+                self._loading -= 1
+            raise
+        with self._lock:
+            self._loading -= 1
+            self._loaded += 1
+        return model
+
+    def stats(self):
+        with self._lock:
+            load_seconds = list(self._load_seconds)
+            memory_bytes = list(self._load_memory_bytes)
+            wait_samples = list(self._wait_samples)
+            return {
+                "pool_size": self.pool_size,
+                "loaded": self._loaded,
+                "in_use": self._in_use,
+                "acquisitions": self._acquisitions,
+                "load_seconds": load_seconds,
+                "load_memory_bytes": memory_bytes,
+                "total_load_memory_bytes": sum(memory_bytes),
+                "avg_wait_seconds": (
+                    sum(wait_samples) / len(wait_samples) if wait_samples else 0.0
+                ),
+                "rss_bytes": current_rss_bytes(),
+            }
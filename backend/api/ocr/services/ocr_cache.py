@@ -0,0 +1,291 @@
+import hashlib
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.models.ocr_cache_entry import OCRCacheEntry
+from api.ocr.services.perceptual_hash import BKTree, dhash, hash_to_hex
+from api.ocr.prompts.ocr_correction_prompt import (
+    ocr_correction_system_prompt,
+    ocr_correction_user_prompt,
+)
+
+
+def prompt_version():
+    """
+    AI校正のプロンプトのバージョン（プロンプトを変更するとキャッシュのキーが変わる）
+    """
+    prompt = f"{ocr_correction_system_prompt}\0{ocr_correction_user_prompt}"
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def image_hashes(full_image_path):
+    """
+    画像の内容のハッシュと知覚ハッシュを返す
+    内容のハッシュは、画像をデコードして向きを補正したピクセルデータのSHA-256で、
+    同じ画像であればメタデータや圧縮の違いがあっても同じ値になる
+    画像として読み込めない場合はファイルの内容のハッシュを使い、知覚ハッシュはNoneになる
+    """
+    try:
+        with Image.open(full_image_path) as image:
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            digest = hashlib.sha256(f"{image.width}x{image.height}\0".encode("ascii"))
+            digest.update(image.tobytes())
+            return digest.hexdigest(), hash_to_hex(dhash(image))
+    except (UnidentifiedImageError, OSError):
+        digest = hashlib.sha256()
+        with open(full_image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest(), None
+
+
+class PerceptualHashIndex:
+    """
+    キャッシュのエントリを知覚ハッシュで検索するためのプロセス内のBK木
+    ユーザー・プロンプトのバージョン・モデルごとに持ち、他のプロセスが保存・更新したエントリは検索のたびにDBから反映する
+    削除されたエントリは検索で見つかった時点で取り除く
+    """
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, prompt_version, model, user_id):
+        self.prompt_version = prompt_version
+        self.model = model
+        self.user_id = user_id
+        self._lock = threading.Lock()
+        self._tree = BKTree()
+        self._hashes = {}
+        self._synced_at = None
+
+    @classmethod
+    def get(cls, prompt_version, model, user_id):
+        key = (prompt_version, model, user_id)
+        with cls._indexes_lock:
+            if key not in cls._indexes:
+                cls._indexes[key] = cls(prompt_version, model, user_id)
+            return cls._indexes[key]
+
+    @classmethod
+    def total_size(cls):
+        with cls._indexes_lock:
+            indexes = list(cls._indexes.values())
+        return sum(len(index) for index in indexes)
+
+    def add(self, entry_id, perceptual_hash):
+        with self._lock:
+            self._add(entry_id, perceptual_hash)
+
+    def _add(self, entry_id, perceptual_hash):
+        value_hash = int(perceptual_hash, 16)
+        old_hash = self._hashes.get(entry_id)
+        if old_hash == value_hash:
+            return
+        if old_hash is not None:
+            # 同じエントリが別の画像で更新された場合は古いハッシュを取り除く
+            self._tree.discard(old_hash, entry_id)
+        self._hashes[entry_id] = value_hash
+        self._tree.add(value_hash, entry_id)
+
+    def discard(self, entry_id):
+        with self._lock:
+            self._discard(entry_id)
+
+    def _discard(self, entry_id):
+        value_hash = self._hashes.pop(entry_id, None)
+        if value_hash is not None:
+            self._tree.discard(value_hash, entry_id)
+
+    def sync(self):
+        # 前回から追加・更新されたエントリを反映する（更新日時が同じエントリを取りこぼさないよう境界を含める）
+        entries = OCRCacheEntry.objects.filter(
+            user_id=self.user_id,
+            prompt_version=self.prompt_version,
+            model=self.model,
+        )
+        with self._lock:
+            if self._synced_at is None:
+                entries = entries.filter(perceptual_hash__isnull=False)
+            else:
+                entries = entries.filter(updated_at__gte=self._synced_at)
+            for entry_id, perceptual_hash, updated_at in entries.values_list(
+                    "id", "perceptual_hash", "updated_at"):
+                if perceptual_hash:
+                    self._add(entry_id, perceptual_hash)
+                else:
+                    self._discard(entry_id)
+                if self._synced_at is None or updated_at > self._synced_at:
+                    self._synced_at = updated_at
+
+    def search(self, perceptual_hash, max_distance):
+        self.sync()
+        with self._lock:
+            return self._tree.search(int(perceptual_hash, 16), max_distance)
+
+    def __len__(self):
+        return len(self._tree)
+
+
+class OCRResultCache:
+    """
+    OCR結果とAI校正後のLaTeXコードのキャッシュ
+    同じ画像が再アップロードされた場合は、Pix2TextとOpenAIのどちらも呼び出さずに前回の結果を返す
+    キーはユーザー・画像の内容のハッシュ・プロンプトのバージョン・モデルで、どれかが変わると別のエントリになる
+    （他のユーザーがアップロードした画像の結果は返さない）
+    内容が一致しなくても、同じユーザーの知覚ハッシュが近い画像（同じページの再圧縮など）の結果を再利用できる
+    """
+    _lock = threading.Lock()
+    _hits = 0
+    _near_duplicate_hits = 0
+    _misses = 0
+
+    def __init__(self, model=None, max_entries=None, ttl_days=None, max_distance=None, user=None):
+        self.model = model or settings.OPENAI_MODEL
+        self.user = user
+        self.prompt_version = prompt_version()
+        self.max_entries = (
+            max_entries if max_entries is not None else settings.OCR_CACHE_MAX_ENTRIES
+        )
+        self.ttl_days = ttl_days if ttl_days is not None else settings.OCR_CACHE_TTL_DAYS
+        self.max_distance = (
+            max_distance if max_distance is not None
+            else settings.OCR_CACHE_NEAR_DUPLICATE_MAX_DISTANCE
+        )
+        self.index = (
+            PerceptualHashIndex.get(self.prompt_version, self.model, user.id)
+            if user is not None else None
+        )
+
+    def _entries(self):
+        return OCRCacheEntry.objects.filter(
+            user=self.user, prompt_version=self.prompt_version, model=self.model)
+
+    def _expires_before(self):
+        return timezone.now() - timedelta(days=self.ttl_days)
+
+    def get(self, content_hash):
+        """
+        キャッシュされたエントリがあれば再利用した回数を記録して返す
+        """
+        entry = self._entries().filter(
+            content_hash=content_hash,
+            last_used_at__gte=self._expires_before(),
+        ).first()
+        if entry is None:
+            return None
+
+        self._touch(entry)
+        self._count("hit")
+        return entry
+
+    def find_similar(self, perceptual_hash):
+        """
+        知覚ハッシュのハミング距離がmax_distance以下で最も近いエントリを (エントリ, 距離) で返す
+        """
+        if not perceptual_hash or self.max_distance <= 0 or self.index is None:
+            return None, None
+
+        expires_before = self._expires_before()
+        for distance, entry_id in self.index.search(perceptual_hash, self.max_distance):
+            entry = OCRCacheEntry.objects.filter(id=entry_id).first()
+            if entry is None:
+                # 削除済みのエントリは索引からも取り除く
+                self.index.discard(entry_id)
+                continue
+            if entry.last_used_at < expires_before:
+                continue
+            self._touch(entry)
+            self._count("near_duplicate")
+            return entry, distance
+        return None, None
+
+    def record_miss(self):
+        self._count("miss")
+
+    @staticmethod
+    def _touch(entry):
+        OCRCacheEntry.objects.filter(id=entry.id).update(
+            hit_count=F("hit_count") + 1, last_used_at=timezone.now())
+
+    def put(self, content_hash, ocr_text, latex_code, perceptual_hash=None):
+        try:
+            entry, _ = OCRCacheEntry.objects.update_or_create(
+                user=self.user,
+                content_hash=content_hash,
+                prompt_version=self.prompt_version,
+                model=self.model,
+                defaults={
+                    "ocr_text": ocr_text,
+                    "latex_code": latex_code,
+                    "perceptual_hash": perceptual_hash,
+                    "last_used_at": timezone.now(),
+                },
+            )
+        except IntegrityError:
+            # 同じ画像を同時に処理した別のリクエストが先に保存した
+            pass
+        else:
+            if self.index is not None:
+                if perceptual_hash:
+                    self.index.add(entry.id, perceptual_hash)
+                else:
+                    self.index.discard(entry.id)
+
+        self.evict()
+
+    def evict(self):
+        """
+        有効期限を過ぎたエントリと、上限を超えた分の最近使われていないエントリを削除する
+        """
+        removed, _ = OCRCacheEntry.objects.filter(
+            last_used_at__lt=self._expires_before()).delete()
+
+        excess = OCRCacheEntry.objects.count() - self.max_entries
+        if excess > 0:
+            stale_ids = list(
+                OCRCacheEntry.objects.order_by("last_used_at").values_list("id", flat=True)[:excess]
+            )
+            deleted, _ = OCRCacheEntry.objects.filter(id__in=stale_ids).delete()
+            removed += deleted
+        return removed
+
+    def clear(self):
+        deleted, _ = OCRCacheEntry.objects.all().delete()
+        return deleted
+
+    @classmethod
+    def _count(cls, result):
+        with cls._lock:
+            if result == "hit":
+                cls._hits += 1
+            elif result == "near_duplicate":
+                cls._near_duplicate_hits += 1
+            else:
+                cls._misses += 1
+
+    def stats(self):
+        with self._lock:
+            hits = self._hits
+            near_duplicate_hits = self._near_duplicate_hits
+            misses = self._misses
+
+        lookups = hits + near_duplicate_hits + misses
+        return {
+            "hits": hits,
+            "near_duplicate_hits": near_duplicate_hits,
+            "misses": misses,
+            "hit_rate": (hits + near_duplicate_hits) / lookups if lookups else 0.0,
+            "entries": OCRCacheEntry.objects.count(),
+            # このプロセスで読み込んだ索引に含まれるエントリの数
+            "indexed_entries": PerceptualHashIndex.total_size(),
+            "near_duplicate_max_distance": self.max_distance,
+            "total_hit_count": OCRCacheEntry.objects.aggregate(
+                total=Sum("hit_count"))["total"] or 0,
+            "prompt_version": self.prompt_version,
+            "model": self.model,
+            "max_entries": self.max_entries,
+            "ttl_days": self.ttl_days,
+        }
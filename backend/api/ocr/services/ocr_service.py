@@ -1,14 +1,18 @@
 import os
-from pix2text import Pix2Text
 from app.utils.ai_client import OpenAIClient
+from api.ocr.services.ocr_worker import OCRWorkerClient, recognize_image
+from api.ocr.services.ocr_cache import OCRResultCache, image_hashes
 
 
 class OCRService:
     def __init__(self):
-        self.p2t = Pix2Text()
         self.ai_client = OpenAIClient()
+        # 直前の処理でキャッシュを使ったかどうか
+        # （disabled / bypassed / hit / near_duplicate / miss）と、似た画像を再利用した場合のハミング距離
+        self.cache_status = "disabled"
+        self.cache_distance = None
 
-    def process_image_to_latex(self, image_path):
+    def process_image_to_latex(self, image_path, use_cache=True, user=None):
         from django.conf import settings
 
         if os.path.isabs(image_path):
@@ -21,16 +25,44 @@ class OCRService:
                 f"画像ファイルが見つかりません: {full_image_path} (相対パス: {image_path})"
             )
 
-        self.p2t = Pix2Text()
-        ocr_result = self.p2t.recognize(full_image_path)
+        self.cache_status = "disabled"
+        self.cache_distance = None
+        cache = None
+        # キャッシュはユーザーごとに持つため、ユーザーが分からない場合は使わない
+        if settings.OCR_CACHE_ENABLED and user is not None:
+            cache = OCRResultCache(model=self.ai_client.model, user=user)
+            content_hash, perceptual_hash = image_hashes(full_image_path)
+            if not use_cache:
+                # キャッシュを使わずに処理し直し、結果でキャッシュを更新する
+                self.cache_status = "bypassed"
+            else:
+                # 同じ画像の再アップロードではOCRもAI校正も行わずに前回の結果を返す
+                entry = cache.get(content_hash)
+                if entry is not None:
+                    self.cache_status = "hit"
+                    return entry.latex_code
 
-        ocr_text = ""
-        if isinstance(ocr_result, list):
-            ocr_text = "\n".join([str(item) for item in ocr_result])
+                # 同じページの撮り直しなど、よく似た画像の結果も再利用する
+                entry, distance = cache.find_similar(perceptual_hash)
+                if entry is not None:
+                    self.cache_status = "near_duplicate"
+                    self.cache_distance = distance
+                    return entry.latex_code
+
+                cache.record_miss()
+                self.cache_status = "miss"
+
+        if settings.OCR_BACKEND == "worker":
+            # モデルを読み込んだ専用のOCRワーカーに認識を任せる
+            ocr_text = OCRWorkerClient().recognize(full_image_path)
         else:
-            ocr_text = str(ocr_result)
+            # Pix2Textのモデルはリクエストごとに作らず、プロセス内で共有する
+            ocr_text = recognize_image(full_image_path)
 
         latex_code = self.ai_client.correct_latex_from_ocr(
             ocr_text, full_image_path)
 
+        if cache is not None:
+            cache.put(content_hash, ocr_text, latex_code, perceptual_hash)
+
         return latex_code
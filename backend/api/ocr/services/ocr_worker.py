@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+from django.conf import settings
+from api.ocr.services.model_registry import Pix2TextRegistry
+from api.ocr.services.exceptions import OCRWorkerError
+
+logger = logging.getLogger("app")
+
+# 1リクエスト・1レスポンスの最大サイズ
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def ocr_result_to_text(ocr_result):
+    if isinstance(ocr_result, list):
+        return "\n".join([str(item) for item in ocr_result])
+    return str(ocr_result)
+
+
+def recognize_image(full_image_path):
+    """
+    プロセス内で共有しているPix2Textのモデルで画像を認識し、OCRの生テキストを返す
+    """
+    with Pix2TextRegistry.get().acquire() as p2t:
+        ocr_result = p2t.recognize(full_image_path)
+    return ocr_result_to_text(ocr_result)
+
+
+def _is_media_file(full_image_path):
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    real_path = os.path.realpath(full_image_path)
+    return os.path.commonpath([media_root, real_path]) == media_root and os.path.isfile(real_path)
+
+
+class _OCRRequestHandler(socketserver.StreamRequestHandler):
+    """
+    1行のJSONでリクエストを受け取り、1行のJSONで結果を返す
+    リクエスト: {"image_path": "..."} または {"command": "stats"}
+    """
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_MESSAGE_BYTES)
+            if not line:
+                return
+            self._send(self._process(line))
+
+    def _process(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "リクエストの形式が不正です"}
+
+        if request.get("command") == "stats":
+            return {"stats": Pix2TextRegistry.get().stats()}
+
+        full_image_path = request.get("image_path") or ""
+        # ワーカーはMEDIA_ROOT配下の画像のみを読み込む
+        if not _is_media_file(full_image_path):
+            return {"error": f"画像ファイルが見つかりません: {full_image_path}"}
+        try:
+            return {"text": recognize_image(full_image_path)}
+        except Exception as e:
+            logger.error(f"OCRワーカーでの認識に失敗しました: {str(e)}")
+            return {"error": str(e)}
+
+    def _send(self, response):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class OCRWorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Pix2Textのモデルを読み込んだまま、ローカルのUnixソケットでOCRを受け付けるサーバー
+    Webのワーカーごとにモデルを持たず、OCRの処理能力とメモリをWebとは別に増減できる
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.socket_path = str(socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        # 前回異常終了した場合に残ったソケットファイルを削除する
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        super().__init__(self.socket_path, _OCRRequestHandler)
+        os.chmod(self.socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class OCRWorkerClient:
+    """
+    OCRワーカーにリクエストを送るクライアント
+    """
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = str(socket_path or settings.OCR_WORKER_SOCKET)
+        self.timeout = timeout or settings.OCR_WORKER_TIMEOUT
+
+    def _request(self, payload):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as reader:
+                    line = reader.readline(MAX_MESSAGE_BYTES)
+        except (OSError, socket.timeout) as e:
+            raise OCRWorkerError(f"OCRワーカーに接続できません: {str(e)}")
+
+        if not line:
+            raise OCRWorkerError("OCRワーカーから応答がありません")
+        try:
+            response = json.loads(line)
+        except ValueError:
+            # 応答が途中で切れた場合（上限を超えた場合やワーカーが終了した場合）もここで扱う
+            raise OCRWorkerError("OCRワーカーの応答の形式が不正です")
+        if not isinstance(response, dict):
+            raise OCRWorkerError("OCRワーカーの応答の形式が不正です")
+        if "error" in response:
+            raise OCRWorkerError(f"OCRワーカーでエラーが発生しました: {response['error']}")
+        return response
+
+    def recognize(self, full_image_path):
+        text = self._request({"image_path": str(full_image_path)}).get("text")
+        if not isinstance(text, str):
+            raise OCRWorkerError("OCRワーカーの応答に認識結果が含まれていません")
+        return text
+
+    def stats(self):
+        stats = self._request({"command": "stats"}).get("stats")
+        if not isinstance(stats, dict):
+            raise OCRWorkerError("OCRワーカーの応答に統計情報が含まれていません")
+        return stats
@@ -0,0 +1,93 @@
+from PIL import Image
+
+# dHashの一辺のサイズ（HASH_SIZE * HASH_SIZEビットのハッシュになる）
+HASH_SIZE = 16
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """
+    画像の差分ハッシュ（dHash）を整数で返す
+    縮小したグレースケール画像で隣り合う画素の明暗を比べるため、撮り直しや多少のトリミング・拡大縮小では値がほとんど変わらない
+    """
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_to_hex(value, hash_size=HASH_SIZE):
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    ハミング距離で近いハッシュを検索するためのBK木
+    同じハッシュに複数の値（キャッシュのエントリID）を持てる
+    """
+
+    def __init__(self):
+        # ノードは [ハッシュ, 値の集合, {距離: 子ノード}]
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value_hash, value):
+        if self._root is None:
+            self._root = [value_hash, {value}, {}]
+            self._size += 1
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value_hash, node[0])
+            if distance == 0:
+                if value not in node[1]:
+                    node[1].add(value)
+                    self._size += 1
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value_hash, {value}, {}]
+                self._size += 1
+                return
+            node = child
+
+    def discard(self, value_hash, value):
+        # 木の構造は変えず、値だけを取り除く（ノードは検索の経路として残す）
+        node = self._root
+        while node is not None:
+            distance = hamming_distance(value_hash, node[0])
+            if distance == 0:
+                if value in node[1]:
+                    node[1].discard(value)
+                    self._size -= 1
+                return
+            node = node[2].get(distance)
+
+    def search(self, value_hash, max_distance):
+        """
+        ハミング距離がmax_distance以下の値を、距離の近い順に (距離, 値) のリストで返す
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value_hash, node[0])
+            if distance <= max_distance:
+                results.extend((distance, value) for value in node[1])
+            # 三角不等式により、この範囲の子ノードだけを調べればよい
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda result: result[0])
+        return results
@@ -0,0 +1,19 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from api.ocr.services.exceptions import OCRWorkerError
+from api.ocr.services.ocr_worker import OCRWorkerClient
+
+
+class OCRWorkerClientTest(SimpleTestCase):
+    def _recognize(self, response):
+        client = OCRWorkerClient(socket_path="/nonexistent.sock", timeout=1)
+        with mock.patch.object(OCRWorkerClient, "_request", return_value=response):
+            return client.recognize("image.png")
+
+    def test_returns_text(self):
+        self.assertEqual(self._recognize({"text": "x^2"}), "x^2")
+
+    def test_missing_or_invalid_text_raises_worker_error(self):
+        for response in ({}, {"text": None}, {"text": ["x"]}):
+            with self.subTest(response=response), self.assertRaises(OCRWorkerError):
+                self._recognize(response)
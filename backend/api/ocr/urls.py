@@ -1,6 +1,8 @@
 from django.urls import path
 from api.ocr.views.ocr_view import OCRView
+from api.ocr.views.ocr_stats_view import OCRStatsView
 
 urlpatterns = [
     path("", OCRView.as_view(), name="ocr"),
+    path("stats/", OCRStatsView.as_view(), name="ocr-stats"),
 ]
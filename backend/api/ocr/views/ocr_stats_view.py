@@ -0,0 +1,43 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from drf_spectacular.utils import extend_schema
+from django.conf import settings
+from api.shared.views.base_api_view import BaseAPIView
+from api.ocr.services.model_registry import Pix2TextRegistry
+from api.ocr.services.ocr_worker import OCRWorkerClient
+from api.ocr.services.ocr_cache import OCRResultCache
+from api.ocr.services.exceptions import OCRWorkerError
+
+
+class OCRStatsView(BaseAPIView):
+    """
+    OCRの統計情報取得用ビュー（管理者のみ）
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        summary="OCR統計取得",
+        description="OCRモデルの読み込み時間・メモリ使用量やOCR結果のキャッシュのヒット率などの統計情報を取得します",
+        responses={200: None},
+    )
+    def get(self, request):
+        """
+        OCR統計を取得
+        """
+        if settings.OCR_BACKEND == "worker":
+            try:
+                model_stats = OCRWorkerClient().stats()
+            except OCRWorkerError as e:
+                model_stats = {"error": str(e)}
+        else:
+            model_stats = Pix2TextRegistry.get().stats()
+
+        return Response(
+            {
+                "backend": settings.OCR_BACKEND,
+                "models": model_stats,
+                "cache": OCRResultCache().stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
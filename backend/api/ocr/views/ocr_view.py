@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.types import OpenApiTypes
+from django.conf import settings
 from api.shared.views.base_api_view import BaseAPIView
 from api.ocr.serializers.ocr_serializer import (
     OCRRequestSerializer,
@@ -13,6 +14,11 @@ from app.utils.file_storage import FileStorage
 from app.models.problem import Problem
 from app.models.problem_latex_document import ProblemLatexDocument
 from api.latex.services.pdf_service import PDFService
+from api.latex.services.compile_job_service import (
+    enqueue_compile_job,
+    check_compile_admission,
+)
+from api.latex.services.exceptions import CompileQueueFullError
 from api.template.services.template_service import (
     get_user_template,
     get_system_default_template,
@@ -38,6 +44,13 @@ class OCRView(BaseAPIView):
                         'type': 'string',
                         'format': 'uuid',
                     },
+                    'mode': {
+                        'type': 'string',
+                        'enum': ['sync', 'async'],
+                    },
+                    'reuse_cache': {
+                        'type': 'boolean',
+                    },
                 },
                 'required': ['image', 'problem_id'],
             }
@@ -51,6 +64,8 @@ class OCRView(BaseAPIView):
 
             image_file = serializer.validated_data["image"]
             problem_id = serializer.validated_data["problem_id"]
+            mode = serializer.validated_data.get(
+                "mode") or settings.LATEX_COMPILE_MODE
             user = request.user
 
             try:
@@ -68,6 +83,8 @@ class OCRView(BaseAPIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
+            check_compile_admission(request.user, mode)
+
             image_path = FileStorage.save_image(
                 image_file, folder_name="images", prefix=f"user_{user.id}"
             )
@@ -76,7 +93,11 @@ class OCRView(BaseAPIView):
             problem.save()
 
             ocr_service = OCRService()
-            raw_latex_code = ocr_service.process_image_to_latex(image_path)
+            raw_latex_code = ocr_service.process_image_to_latex(
+                image_path,
+                use_cache=serializer.validated_data.get("reuse_cache", True),
+                user=user,
+            )
 
             user_template = get_user_template(user)
             if user_template:
@@ -96,19 +117,36 @@ class OCRView(BaseAPIView):
             latex_doc = ProblemLatexDocument.objects.create(
                 problem=problem,
                 latex_code=wrapped_latex_code,
-                version=new_version
+                version=new_version,
+                template=template,
             )
 
-            pdf_service = PDFService()
-            pdf_path = pdf_service.latex_to_pdf(
-                wrapped_latex_code,
-                output_filename=f"problem_{problem.id}",
-                use_template=False
-            )
-            pdf_url = FileStorage.get_file_url(pdf_path)
+            job_id = None
+            if mode == "async":
+                job = enqueue_compile_job(
+                    user,
+                    problem,
+                    "problem",
+                    latex_doc,
+                    output_filename=f"problem_{problem.id}",
+                )
+                job_id = job.id
+                pdf_url = None
+            else:
+                pdf_service = PDFService()
+                pdf_path = pdf_service.latex_to_pdf(
+                    wrapped_latex_code,
+                    output_filename=f"problem_{problem.id}",
+                    use_template=False,
+                    user_id=user.id,
+                    build_key=f"{problem.id}_problem",
+                    engine=template.engine or None,
+                )
+                pdf_url = FileStorage.get_file_url(pdf_path)
 
-            latex_doc.pdf_path = pdf_path
-            latex_doc.save()
+                latex_doc.pdf_path = pdf_path
+                latex_doc.engine = pdf_service.latex_command
+                latex_doc.save()
 
             response_serializer = OCRResponseSerializer(
                 {
@@ -116,13 +154,23 @@ class OCRView(BaseAPIView):
                     "latex_document_id": latex_doc.id,  # 後方互換性のため
                     "latex_code": wrapped_latex_code,  # ラップされたLaTeXコードを返す
                     "pdf_url": pdf_url,
+                    "job_id": job_id,
+                    "ocr_cache_status": ocr_service.cache_status,
+                    "ocr_cache_distance": ocr_service.cache_distance,
                     "created_at": problem.created_at,
                 }
             )
 
-            self.log_info(f"OCR成功: Problem {problem.id}")
+            self.log_info(f"OCR成功: Problem {problem.id} (キャッシュ: {ocr_service.cache_status})")
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+        except CompileQueueFullError as e:
+            self.log_warning(f"OCR: {str(e)}")
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(e.retry_after)},
+            )
         except Exception as e:
             self.log_error(f"OCRエラー: {str(e)}")
             return Response(
@@ -16,6 +16,7 @@ from app.models.problem import Problem
 from app.models.problem_latex_document import ProblemLatexDocument
 from app.models.explanation import Explanation
 from app.utils.file_storage import FileStorage
+from api.latex.services.document_version_service import get_document_pdf_url
 
 
 class ProjectListView(BaseAPIView):
@@ -136,9 +137,7 @@ class ProjectRetrieveView(BaseAPIView):
 
         latest_latex_document_data = None
         if latest_latex_doc:
-            pdf_url = None
-            if latest_latex_doc.pdf_path:
-                pdf_url = FileStorage.get_file_url(latest_latex_doc.pdf_path)
+            pdf_url = get_document_pdf_url("problem", latest_latex_doc)
 
             latest_latex_document_data = {
                 "id": latest_latex_doc.id,
@@ -156,10 +155,7 @@ class ProjectRetrieveView(BaseAPIView):
 
         latest_explanation_document_data = None
         if latest_explanation_doc:
-            pdf_url = None
-            if latest_explanation_doc.pdf_path:
-                pdf_url = FileStorage.get_file_url(
-                    latest_explanation_doc.pdf_path)
+            pdf_url = get_document_pdf_url("explanation", latest_explanation_doc)
 
             latest_explanation_document_data = {
                 "id": latest_explanation_doc.id,
@@ -248,9 +244,7 @@ class ProjectRetrieveView(BaseAPIView):
 
         latest_latex_document_data = None
         if latest_latex_doc:
-            pdf_url = None
-            if latest_latex_doc.pdf_path:
-                pdf_url = FileStorage.get_file_url(latest_latex_doc.pdf_path)
+            pdf_url = get_document_pdf_url("problem", latest_latex_doc)
 
             latest_latex_document_data = {
                 "id": latest_latex_doc.id,
@@ -268,10 +262,7 @@ class ProjectRetrieveView(BaseAPIView):
 
         latest_explanation_document_data = None
         if latest_explanation_doc:
-            pdf_url = None
-            if latest_explanation_doc.pdf_path:
-                pdf_url = FileStorage.get_file_url(
-                    latest_explanation_doc.pdf_path)
+            pdf_url = get_document_pdf_url("explanation", latest_explanation_doc)
 
             latest_explanation_document_data = {
                 "id": latest_explanation_doc.id,
@@ -9,7 +9,7 @@ from api.shared.views.base_api_view import BaseAPIView
 from app.models.problem import Problem
 from app.models.problem_latex_document import ProblemLatexDocument
 from app.models.explanation import Explanation
-from app.utils.file_storage import FileStorage
+from api.latex.services.document_version_service import get_document_pdf_url, compile_document
 from api.project.serializers.project_serializer import (
     ProblemLatexDocumentSerializer,
     ExplanationDocumentSerializer,
@@ -51,9 +51,7 @@ class ProblemLatexHistoryView(BaseAPIView):
 
         history_data = []
         for doc in latex_docs:
-            pdf_url = None
-            if doc.pdf_path:
-                pdf_url = FileStorage.get_file_url(doc.pdf_path)
+            pdf_url = get_document_pdf_url("problem", doc)
 
             history_data.append({
                 "id": doc.id,
@@ -103,9 +101,7 @@ class ExplanationHistoryView(BaseAPIView):
 
         history_data = []
         for exp in explanations:
-            pdf_url = None
-            if exp.pdf_path:
-                pdf_url = FileStorage.get_file_url(exp.pdf_path)
+            pdf_url = get_document_pdf_url("explanation", exp)
 
             history_data.append({
                 "id": exp.id,
@@ -163,9 +159,14 @@ class ProblemLatexConfirmView(BaseAPIView):
         latex_doc.is_confirmed = True
         latex_doc.save()
 
-        pdf_url = None
-        if latex_doc.pdf_path:
-            pdf_url = FileStorage.get_file_url(latex_doc.pdf_path)
+        if not latex_doc.pdf_exists():
+            # 下書きから保存したバージョンはPDFがないため、確認済みにする時点でコンパイルする
+            try:
+                compile_document(latex_doc, "problem", request.user)
+            except Exception as e:
+                self.log_warning(f"確認済み設定時のコンパイルに失敗しました: ProblemLatexDocument {latex_doc.id}: {str(e)}")
+
+        pdf_url = get_document_pdf_url("problem", latex_doc)
 
         serializer = ProblemLatexDocumentSerializer({
             "id": latex_doc.id,
@@ -223,9 +224,14 @@ class ExplanationConfirmView(BaseAPIView):
         explanation.is_confirmed = True
         explanation.save()
 
-        pdf_url = None
-        if explanation.pdf_path:
-            pdf_url = FileStorage.get_file_url(explanation.pdf_path)
+        if not explanation.pdf_exists():
+            # 下書きから保存したバージョンはPDFがないため、確認済みにする時点でコンパイルする
+            try:
+                compile_document(explanation, "explanation", request.user)
+            except Exception as e:
+                self.log_warning(f"確認済み設定時のコンパイルに失敗しました: Explanation {explanation.id}: {str(e)}")
+
+        pdf_url = get_document_pdf_url("explanation", explanation)
 
         serializer = ExplanationDocumentSerializer({
             "id": explanation.id,
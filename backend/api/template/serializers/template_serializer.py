@@ -14,6 +14,7 @@ class LatexTemplateRequestSerializer(serializers.ModelSerializer):
             "name",
             "content",
             "is_default",
+            "engine",
         ]
 
     def validate_content(self, value):
@@ -63,6 +64,7 @@ class LatexTemplateSerializer(serializers.ModelSerializer):
             "name",
             "content",
             "is_default",
+            "engine",
             "created_at",
             "updated_at",
         ]
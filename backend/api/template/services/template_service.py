@@ -13,5 +13,13 @@ def get_system_default_template() -> LatexTemplate:
     return LatexTemplate.objects.get(user=None, name="システムデフォルト")
 
 
+def get_template_engine(template: LatexTemplate | None) -> str:
+    """
+    テンプレートで指定されたエンジンを取得
+    テンプレートがない場合や指定がない場合は空文字列を返す
+    """
+    return template.engine if template else ""
+
+
 def wrap_latex_with_template(latex_code: str, template: LatexTemplate) -> str:
     return template.content.replace("{children}", latex_code)
@@ -0,0 +1,46 @@
+# Generated manually
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('app', '0012_remove_old_latex_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompileJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('problem', '問題'), ('explanation', '解説')], help_text='コンパイル対象のドキュメントタイプ', max_length=20)),
+                ('document_id', models.UUIDField(help_text='コンパイル対象のドキュメントID（ProblemLatexDocumentまたはExplanation）')),
+                ('output_filename', models.CharField(blank=True, help_text='生成PDFのファイル名プレフィックス', max_length=200)),
+                ('status', models.CharField(choices=[('queued', '待機中'), ('running', '実行中'), ('succeeded', '成功'), ('failed', '失敗'), ('cancelled', 'キャンセル')], default='queued', help_text='ジョブの状態', max_length=20)),
+                ('pdf_path', models.CharField(blank=True, help_text='生成PDFのパス（存在しない場合は空文字列）', max_length=500)),
+                ('error', models.TextField(blank=True, help_text='失敗時のエラー内容')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, help_text='実行開始日時', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='実行終了日時', null=True)),
+                ('problem', models.ForeignKey(help_text='紐づく問題（プロジェクト）', on_delete=django.db.models.deletion.CASCADE, related_name='compile_jobs', to='app.problem')),
+                ('user', models.ForeignKey(help_text='ジョブを作成したユーザー', on_delete=django.db.models.deletion.CASCADE, related_name='compile_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'compile_jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='compilejob',
+            index=models.Index(fields=['status', 'created_at'], name='compile_job_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compilejob',
+            index=models.Index(fields=['problem', 'document_type', '-created_at'], name='compile_job_problem_type_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_create_compile_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compilejob',
+            name='batch_id',
+            field=models.UUIDField(blank=True, help_text='一括コンパイルのバッチID（通常のレンダリングの場合はnull）', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='compilejob',
+            index=models.Index(fields=['batch_id', 'status'], name='compile_job_batch_status_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_add_compile_job_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='latextemplate',
+            name='engine',
+            field=models.CharField(blank=True, choices=[('pdflatex', 'pdfLaTeX'), ('platex', 'pLaTeX + dvipdfmx'), ('uplatex', 'upLaTeX + dvipdfmx')], help_text='コンパイルに使うエンジン（空文字列の場合はドキュメントの内容から自動選択）', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='problemlatexdocument',
+            name='engine',
+            field=models.CharField(blank=True, help_text='PDF生成に使用したエンジン（未生成の場合は空文字列）', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='explanation',
+            name='engine',
+            field=models.CharField(blank=True, help_text='PDF生成に使用したエンジン（未生成の場合は空文字列）', max_length=20),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_add_latex_engine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatexDraft',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('problem', '問題'), ('explanation', '解説')], help_text='ドキュメントタイプ（問題または解説）', max_length=20)),
+                ('latex_code', models.TextField(help_text='編集中のLaTeXコード')),
+                ('revision', models.IntegerField(default=0, help_text='下書きのリビジョン番号（保存するたびに1増える）')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('problem', models.ForeignKey(help_text='紐づく問題（プロジェクト）', on_delete=django.db.models.deletion.CASCADE, related_name='latex_drafts', to='app.problem')),
+            ],
+            options={
+                'db_table': 'latex_drafts',
+                'unique_together': {('problem', 'document_type')},
+            },
+        ),
+    ]
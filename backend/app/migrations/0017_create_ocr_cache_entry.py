@@ -0,0 +1,36 @@
+# Generated manually
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_create_latex_draft'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRCacheEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(help_text='正規化した画像データのSHA-256', max_length=64)),
+                ('prompt_version', models.CharField(help_text='AI校正に使用したプロンプトのバージョン', max_length=64)),
+                ('model', models.CharField(help_text='AI校正に使用したモデル', max_length=100)),
+                ('ocr_text', models.TextField(help_text='OCR（Pix2Text）の認識結果')),
+                ('latex_code', models.TextField(help_text='AI校正後のLaTeXコード')),
+                ('hit_count', models.IntegerField(default=0, help_text='キャッシュを再利用した回数')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, help_text='最後に保存・再利用した日時')),
+            ],
+            options={
+                'db_table': 'ocr_cache_entries',
+                'unique_together': {('content_hash', 'prompt_version', 'model')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ocrcacheentry',
+            index=models.Index(fields=['last_used_at'], name='ocr_cache_last_used_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_create_ocr_cache_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrcacheentry',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, help_text='画像の知覚ハッシュ（dHash、16進数）。似た画像の検索に使用する', max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ocrcacheentry',
+            index=models.Index(fields=['created_at'], name='ocr_cache_created_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_add_ocr_cache_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problemlatexdocument',
+            name='template',
+            field=models.ForeignKey(blank=True, help_text='作成時に使用したテンプレート（コンパイルするエンジンの指定に使用する）', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='problem_latex_documents', to='app.latextemplate'),
+        ),
+        migrations.AddField(
+            model_name='explanation',
+            name='template',
+            field=models.ForeignKey(blank=True, help_text='作成時に使用したテンプレート（コンパイルするエンジンの指定に使用する）', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='explanations', to='app.latextemplate'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated manually
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def delete_ownerless_entries(apps, schema_editor):
+    # 既存のエントリはアップロードしたユーザーが分からないため削除する（次回のOCRで作り直される）
+    OCRCacheEntry = apps.get_model('app', 'OCRCacheEntry')
+    OCRCacheEntry.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('app', '0019_add_document_template'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_ownerless_entries, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='ocrcacheentry',
+            name='user',
+            field=models.ForeignKey(help_text='画像をアップロードしたユーザー（他のユーザーの結果は再利用しない）', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ocr_cache_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ocrcacheentry',
+            name='user',
+            field=models.ForeignKey(help_text='画像をアップロードしたユーザー（他のユーザーの結果は再利用しない）', on_delete=django.db.models.deletion.CASCADE, related_name='ocr_cache_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ocrcacheentry',
+            unique_together={('user', 'content_hash', 'prompt_version', 'model')},
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_add_ocr_cache_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrcacheentry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='作成・更新した日時（再利用では変わらない）'),
+            preserve_default=False,
+        ),
+        migrations.RemoveIndex(
+            model_name='ocrcacheentry',
+            name='ocr_cache_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ocrcacheentry',
+            index=models.Index(fields=['updated_at'], name='ocr_cache_updated_idx'),
+        ),
+    ]
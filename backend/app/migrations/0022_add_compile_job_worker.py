@@ -0,0 +1,23 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_add_ocr_cache_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compilejob',
+            name='worker_host',
+            field=models.CharField(blank=True, help_text='ジョブを実行しているホスト名（中断されたジョブの検出に使用）', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='compilejob',
+            name='worker_pid',
+            field=models.IntegerField(blank=True, help_text='ジョブを実行しているプロセスID（中断されたジョブの検出に使用）', null=True),
+        ),
+    ]
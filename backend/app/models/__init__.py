@@ -1,14 +1,22 @@
 from app.models.problem import Problem
 from app.models.latex_document import LatexDocument, DocumentType
-from app.models.latex_template import LatexTemplate
+from app.models.latex_template import LatexTemplate, LatexEngine
 from app.models.problem_latex_document import ProblemLatexDocument
 from app.models.explanation import Explanation
+from app.models.compile_job import CompileJob, CompileJobStatus
+from app.models.latex_draft import LatexDraft
+from app.models.ocr_cache_entry import OCRCacheEntry
 
 __all__ = [
     "Problem",
     "LatexDocument",
     "DocumentType",
     "LatexTemplate",
+    "LatexEngine",
     "ProblemLatexDocument",
     "Explanation",
+    "CompileJob",
+    "CompileJobStatus",
+    "LatexDraft",
+    "OCRCacheEntry",
 ]
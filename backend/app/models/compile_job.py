@@ -0,0 +1,101 @@
+import uuid
+from django.db import models
+from django.contrib.auth.models import User
+from app.models.problem import Problem
+from app.models.latex_document import DocumentType
+from app.models.problem_latex_document import ProblemLatexDocument
+from app.models.explanation import Explanation
+
+
+class CompileJobStatus(models.TextChoices):
+    QUEUED = 'queued', '待機中'
+    RUNNING = 'running', '実行中'
+    SUCCEEDED = 'succeeded', '成功'
+    FAILED = 'failed', '失敗'
+    CANCELLED = 'cancelled', 'キャンセル'
+
+
+class CompileJob(models.Model):
+    """
+    非同期LaTeXコンパイルのジョブ
+    run_compile_workerコマンドがDBをキューとして取り出して実行する
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="compile_jobs",
+        help_text="ジョブを作成したユーザー"
+    )
+    problem = models.ForeignKey(
+        Problem,
+        on_delete=models.CASCADE,
+        related_name="compile_jobs",
+        help_text="紐づく問題（プロジェクト）"
+    )
+    document_type = models.CharField(
+        max_length=20,
+        choices=DocumentType.choices,
+        help_text="コンパイル対象のドキュメントタイプ"
+    )
+    document_id = models.UUIDField(
+        help_text="コンパイル対象のドキュメントID（ProblemLatexDocumentまたはExplanation）"
+    )
+    output_filename = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="生成PDFのファイル名プレフィックス"
+    )
+    batch_id = models.UUIDField(
+        null=True,
+        blank=True,
+        help_text="一括コンパイルのバッチID（通常のレンダリングの場合はnull）"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=CompileJobStatus.choices,
+        default=CompileJobStatus.QUEUED,
+        help_text="ジョブの状態"
+    )
+    pdf_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="生成PDFのパス（存在しない場合は空文字列）"
+    )
+    error = models.TextField(blank=True, help_text="失敗時のエラー内容")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, help_text="実行開始日時")
+    worker_host = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="ジョブを実行しているホスト名（中断されたジョブの検出に使用）"
+    )
+    worker_pid = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="ジョブを実行しているプロセスID（中断されたジョブの検出に使用）"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="実行終了日時")
+
+    class Meta:
+        db_table = "compile_jobs"
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="compile_job_status_created_idx"),
+            models.Index(
+                fields=["problem", "document_type", "-created_at"],
+                name="compile_job_problem_type_idx",
+            ),
+            models.Index(fields=["batch_id", "status"], name="compile_job_batch_status_idx"),
+        ]
+
+    def get_document(self):
+        """
+        コンパイル対象のドキュメントを取得
+        """
+        if self.document_type == DocumentType.PROBLEM:
+            return ProblemLatexDocument.objects.get(id=self.document_id)
+        return Explanation.objects.get(id=self.document_id)
+
+    def __str__(self):
+        return f"CompileJob {self.id} ({self.document_type} {self.document_id}, {self.status})"
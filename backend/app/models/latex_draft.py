@@ -0,0 +1,37 @@
+import uuid
+from django.db import models
+from app.models.problem import Problem
+from app.models.latex_document import DocumentType
+
+
+class LatexDraft(models.Model):
+    """
+    エディタで編集中のLaTeXコードの下書き
+    プロジェクトとドキュメントタイプごとに1件だけ保持し、保存時にはコンパイルしない
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    problem = models.ForeignKey(
+        Problem,
+        on_delete=models.CASCADE,
+        related_name="latex_drafts",
+        help_text="紐づく問題（プロジェクト）"
+    )
+    document_type = models.CharField(
+        max_length=20,
+        choices=DocumentType.choices,
+        help_text="ドキュメントタイプ（問題または解説）"
+    )
+    latex_code = models.TextField(help_text="編集中のLaTeXコード")
+    revision = models.IntegerField(
+        default=0,
+        help_text="下書きのリビジョン番号（保存するたびに1増える）"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "latex_drafts"
+        unique_together = [["problem", "document_type"]]
+
+    def __str__(self):
+        return f"LatexDraft {self.id} (Problem {self.problem_id}, {self.document_type}, r{self.revision})"
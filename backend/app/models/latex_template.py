@@ -4,6 +4,12 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 
 
+class LatexEngine(models.TextChoices):
+    PDFLATEX = 'pdflatex', 'pdfLaTeX'
+    PLATEX = 'platex', 'pLaTeX + dvipdfmx'
+    UPLATEX = 'uplatex', 'upLaTeX + dvipdfmx'
+
+
 class LatexTemplate(models.Model):
     """
     LaTeXテンプレートのモデル
@@ -29,6 +35,12 @@ class LatexTemplate(models.Model):
         default=False,
         help_text="ユーザーのデフォルトテンプレートかどうか"
     )
+    engine = models.CharField(
+        max_length=20,
+        blank=True,
+        choices=LatexEngine.choices,
+        help_text="コンパイルに使うエンジン（空文字列の場合はドキュメントの内容から自動選択）"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
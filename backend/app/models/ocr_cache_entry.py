@@ -0,0 +1,52 @@
+import uuid
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class OCRCacheEntry(models.Model):
+    """
+    OCR結果とAI校正後のLaTeXコードのキャッシュ
+    同じユーザーが、正規化した画像の内容のハッシュ・プロンプトのバージョン・モデルが同じ画像をアップロードした場合に再利用する
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="ocr_cache_entries",
+        help_text="画像をアップロードしたユーザー（他のユーザーの結果は再利用しない）"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        help_text="正規化した画像データのSHA-256"
+    )
+    perceptual_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="画像の知覚ハッシュ（dHash、16進数）。似た画像の検索に使用する"
+    )
+    prompt_version = models.CharField(
+        max_length=64,
+        help_text="AI校正に使用したプロンプトのバージョン"
+    )
+    model = models.CharField(
+        max_length=100,
+        help_text="AI校正に使用したモデル"
+    )
+    ocr_text = models.TextField(help_text="OCR（Pix2Text）の認識結果")
+    latex_code = models.TextField(help_text="AI校正後のLaTeXコード")
+    hit_count = models.IntegerField(default=0, help_text="キャッシュを再利用した回数")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, help_text="作成・更新した日時（再利用では変わらない）")
+    last_used_at = models.DateTimeField(auto_now_add=True, help_text="最後に保存・再利用した日時")
+
+    class Meta:
+        db_table = "ocr_cache_entries"
+        unique_together = [["user", "content_hash", "prompt_version", "model"]]
+        indexes = [
+            models.Index(fields=["last_used_at"], name="ocr_cache_last_used_idx"),
+            models.Index(fields=["updated_at"], name="ocr_cache_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"OCRCacheEntry {self.content_hash[:12]} ({self.model}, {self.prompt_version[:8]})"
@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from app.models.problem import Problem
+from app.models.latex_template import LatexTemplate
 from app.utils.file_storage import FileStorage
 
 
@@ -21,6 +22,19 @@ class ProblemLatexDocument(models.Model):
         blank=True,
         help_text="生成PDFのパス（存在しない場合は空文字列）"
     )
+    template = models.ForeignKey(
+        LatexTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="problem_latex_documents",
+        help_text="作成時に使用したテンプレート（コンパイルするエンジンの指定に使用する）"
+    )
+    engine = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="PDF生成に使用したエンジン（未生成の場合は空文字列）"
+    )
     version = models.IntegerField(default=1, help_text="バージョン番号")
     is_confirmed = models.BooleanField(
         default=False,
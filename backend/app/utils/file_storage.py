@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 from datetime import datetime
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
@@ -28,16 +30,52 @@ class FileStorage:
         return saved_path
 
     @staticmethod
-    def save_pdf(pdf_content, folder_name="pdfs", prefix=""):
+    def save_pdf_file(source_path, folder_name="pdfs", prefix="", move=False):
+        """
+        ディスク上のPDFファイルをメモリに読み込まずにMEDIA_ROOTへ保存する
+        保存先と同じディレクトリの一時ファイルに書き込んでからリネームするため、書き込み途中の状態は見えない
+        move=Trueの場合は元のファイルを移動し（別のファイルシステムの場合はコピーして削除し）、
+        それ以外はコピーする（キャッシュなどの元のファイルと保存したファイルが影響し合わないようにする）
+        """
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
         file_name = f"{prefix}_{timestamp}.pdf" if prefix else f"{timestamp}.pdf"
-        file_path = os.path.join(folder_name, file_name)
 
         storage = FileSystemStorage(location=settings.MEDIA_ROOT)
-        content_file = ContentFile(pdf_content)
-        saved_path = storage.save(file_path, content_file)
+        saved_path = storage.get_available_name(os.path.join(folder_name, file_name))
+        full_path = storage.path(saved_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(full_path), prefix=".", suffix=".pdf.tmp")
+        os.close(fd)
+        try:
+            moved = False
+            if move:
+                try:
+                    os.replace(source_path, tmp_path)
+                    moved = True
+                except OSError:
+                    pass
+            if not moved:
+                FileStorage._copy_file_chunked(source_path, tmp_path)
+                if move:
+                    try:
+                        os.remove(source_path)
+                    except OSError:
+                        pass
+            if settings.FILE_UPLOAD_PERMISSIONS is not None:
+                os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS)
+            os.replace(tmp_path, full_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         return saved_path
 
+    @staticmethod
+    def _copy_file_chunked(source_path, dest_path, chunk_size=1024 * 1024):
+        with open(source_path, "rb") as source_file, open(dest_path, "wb") as dest_file:
+            shutil.copyfileobj(source_file, dest_file, chunk_size)
+
     @staticmethod
     def get_file_url(file_path):
         # PDFファイルの場合は専用のエンドポイントを使用（X-Frame-Optionsを無効化）
@@ -147,8 +147,113 @@ SPECTACULAR_SETTINGS = {
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
+# OCR（Pix2Text）settings
+# プロセス内で共有するモデルのインスタンス数（同時にOCRできるスレッド数）
+OCR_MODEL_POOL_SIZE = int(os.getenv("OCR_MODEL_POOL_SIZE", "1"))
+# 起動時にモデルを読み込んでおくかどうか（最初のOCRリクエストの待ち時間をなくす）
+OCR_MODEL_PRELOAD = os.getenv("OCR_MODEL_PRELOAD", "False") == "True"
+# local: Webのプロセス内でOCRする / worker: run_ocr_workerで起動した専用プロセスに任せる
+OCR_BACKEND = os.getenv("OCR_BACKEND", "local")
+OCR_WORKER_SOCKET = Path(os.getenv("OCR_WORKER_SOCKET") or BASE_DIR / "cache" / "ocr_worker.sock")
+OCR_WORKER_TIMEOUT = int(os.getenv("OCR_WORKER_TIMEOUT", "120"))
+# 同じ画像のOCR結果とAI校正後のLaTeXコードを再利用する（最大件数と、最後に使われてからの保持日数）
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "True") == "True"
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "10000"))
+OCR_CACHE_TTL_DAYS = int(os.getenv("OCR_CACHE_TTL_DAYS", "30"))
+# 知覚ハッシュ（256ビットのdHash）のハミング距離がこの値以下の画像の結果も再利用する（0で無効）
+# 1行だけ内容が違うページでも13ビット程度しか離れないため、有効にする場合は再圧縮を吸収できる4程度にする
+OCR_CACHE_NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_NEAR_DUPLICATE_MAX_DISTANCE", "0"))
+
 # LaTeX to PDF settings
-LATEX_TO_PDF_COMMAND = os.getenv("LATEX_TO_PDF_COMMAND", "pdflatex")
+# "auto"の場合はドキュメントの内容（日本語の文字・クラス・パッケージ）からエンジンを選ぶ
+LATEX_TO_PDF_COMMAND = os.getenv("LATEX_TO_PDF_COMMAND", "auto")
+# 自動選択時に英数字のみのドキュメントで使うエンジン
+LATEX_LATIN_ENGINE = os.getenv("LATEX_LATIN_ENGINE", "pdflatex")
+# 自動選択時に日本語のドキュメントで使うエンジン（platexまたはuplatex）
+LATEX_JAPANESE_ENGINE = os.getenv("LATEX_JAPANESE_ENGINE", "platex")
+# コンパイル前にLaTeXソースの構文を静的にチェックする
+LATEX_PREFLIGHT_ENABLED = os.getenv("LATEX_PREFLIGHT_ENABLED", "True") == "True"
+# 相互参照の解決のために実行するLaTeXの最大回数
+LATEX_MAX_PASSES = int(os.getenv("LATEX_MAX_PASSES", "3"))
+# TeXのプロセス1回あたりの実行時間の上限（秒）
+LATEX_PROCESS_TIMEOUT = int(os.getenv("LATEX_PROCESS_TIMEOUT", "30"))
+# 実行開始からこの秒数を過ぎても実行中のコンパイルジョブ（一括コンパイルを含む）は中断されたものとみなして再実行する
+# （同じホストのジョブは、取り出したプロセスが終了していればすぐに再実行する）
+LATEX_COMPILE_JOB_LEASE_SECONDS = int(os.getenv("LATEX_COMPILE_JOB_LEASE_SECONDS", "900"))
+# TeXのプロセスに適用するリソース制限（0の場合は制限しない）
+# 超えた場合はプロセスグループごと終了させ、コンパイル統計のcontainmentに記録する
+LATEX_LIMIT_CPU_SECONDS = int(os.getenv("LATEX_LIMIT_CPU_SECONDS", "20"))
+LATEX_LIMIT_MEMORY_BYTES = int(os.getenv("LATEX_LIMIT_MEMORY_BYTES", str(2 * 1024 * 1024 * 1024)))
+LATEX_LIMIT_FILE_BYTES = int(os.getenv("LATEX_LIMIT_FILE_BYTES", str(64 * 1024 * 1024)))
+LATEX_LIMIT_OPEN_FILES = int(os.getenv("LATEX_LIMIT_OPEN_FILES", "256"))
+LATEX_LIMIT_WORK_DIR_BYTES = int(os.getenv("LATEX_LIMIT_WORK_DIR_BYTES", str(256 * 1024 * 1024)))
+# エラー時などにLaTeXのログ・出力の末尾から読み込む最大バイト数
+LATEX_LOG_TAIL_BYTES = int(os.getenv("LATEX_LOG_TAIL_BYTES", str(64 * 1024)))
+
+# PDFコンパイルの既定の実行方式（sync: リクエスト内で実行 / async: ジョブとして登録）
+# asyncの場合は `python manage.py run_compile_worker` でジョブを処理する
+LATEX_COMPILE_MODE = os.getenv("LATEX_COMPILE_MODE", "sync")
+
+# コンパイルの同時実行数の制御（0の場合はCPUコア数）
+LATEX_SCHEDULER_ENABLED = os.getenv("LATEX_SCHEDULER_ENABLED", "True") == "True"
+LATEX_SCHEDULER_MAX_CONCURRENT = int(os.getenv("LATEX_SCHEDULER_MAX_CONCURRENT", "0"))
+LATEX_SCHEDULER_PER_USER_LIMIT = int(os.getenv("LATEX_SCHEDULER_PER_USER_LIMIT", "2"))
+# 上記の上限を同じホストの全プロセス（gunicornの全ワーカーとコンパイルワーカー）の合計に適用する
+# （Falseの場合はプロセスごとの上限になる）
+LATEX_SCHEDULER_HOST_WIDE = os.getenv("LATEX_SCHEDULER_HOST_WIDE", "True") == "True"
+# 待ち行列の上限（超えた場合は429を返す。プロセスごとに数える）
+LATEX_SCHEDULER_MAX_QUEUED = int(os.getenv("LATEX_SCHEDULER_MAX_QUEUED", "64"))
+LATEX_SCHEDULER_PER_USER_MAX_QUEUED = int(os.getenv("LATEX_SCHEDULER_PER_USER_MAX_QUEUED", "8"))
+LATEX_SCHEDULER_MAX_WAIT_SECONDS = float(os.getenv("LATEX_SCHEDULER_MAX_WAIT_SECONDS", "60"))
+
+# LaTeXキャッシュのルートディレクトリ
+LATEX_CACHE_ROOT = Path(os.getenv("LATEX_CACHE_ROOT") or BASE_DIR / "cache" / "latex")
+
+# コンパイル済みPDFのキャッシュ（同一ソースの再コンパイルを省略）
+LATEX_COMPILE_CACHE_ENABLED = os.getenv("LATEX_COMPILE_CACHE_ENABLED", "True") == "True"
+LATEX_COMPILE_CACHE_DIR = LATEX_CACHE_ROOT / "pdf"
+LATEX_COMPILE_CACHE_MAX_BYTES = int(
+    os.getenv("LATEX_COMPILE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# テンプレートのプリアンブルをダンプしたフォーマットファイル（.fmt）のキャッシュ
+LATEX_FORMAT_CACHE_ENABLED = os.getenv("LATEX_FORMAT_CACHE_ENABLED", "True") == "True"
+LATEX_FORMAT_CACHE_DIR = LATEX_CACHE_ROOT / "formats"
+# コンパイルの同時実行数をホスト全体で制限するためのロックファイルの置き場所
+LATEX_SCHEDULER_LOCK_DIR = LATEX_CACHE_ROOT / "scheduler"
+# 同じドキュメントに対する古いコンパイルを他のプロセスから取り消すためのマーカーファイルの置き場所
+LATEX_COALESCER_DIR = LATEX_CACHE_ROOT / "coalescer"
+
+# 一括コンパイル（manage.py compile_batch）のプロセス数（0の場合はCPU数）
+LATEX_BATCH_WORKERS = int(os.getenv("LATEX_BATCH_WORKERS", "0"))
+# 1回に取り出すジョブ数（プロセスあたり）
+LATEX_BATCH_CHUNK_SIZE = int(os.getenv("LATEX_BATCH_CHUNK_SIZE", "4"))
+# APIから一度に登録できるドキュメント数の上限
+LATEX_BATCH_MAX_DOCUMENTS = int(os.getenv("LATEX_BATCH_MAX_DOCUMENTS", "1000"))
+
+# 必ず失敗するソースのコンパイル結果のキャッシュ（再送時にTeXを再実行しない）
+LATEX_FAILURE_CACHE_ENABLED = os.getenv("LATEX_FAILURE_CACHE_ENABLED", "True") == "True"
+LATEX_FAILURE_CACHE_DIR = LATEX_CACHE_ROOT / "failures"
+LATEX_FAILURE_CACHE_TTL_SECONDS = int(os.getenv("LATEX_FAILURE_CACHE_TTL_SECONDS", "300"))
+
+# DBにバージョンを作成しないプレビュー用PDFの一時保存先（MEDIA_ROOTからの相対パス）と有効期限
+LATEX_EPHEMERAL_PREVIEW_FOLDER = "ephemeral"
+LATEX_EPHEMERAL_PREVIEW_TTL_SECONDS = int(os.getenv("LATEX_EPHEMERAL_PREVIEW_TTL_SECONDS", "1800"))
+
+# ページプレビュー画像（pdftoppmで生成）のキャッシュ
+LATEX_PREVIEW_COMMAND = os.getenv("LATEX_PREVIEW_COMMAND", "pdftoppm")
+LATEX_PREVIEW_DPI = int(os.getenv("LATEX_PREVIEW_DPI", "72"))
+LATEX_PREVIEW_TIMEOUT = int(os.getenv("LATEX_PREVIEW_TIMEOUT", "10"))
+LATEX_PREVIEW_CACHE_DIR = LATEX_CACHE_ROOT / "previews"
+LATEX_PREVIEW_CACHE_MAX_BYTES = int(
+    os.getenv("LATEX_PREVIEW_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# ドキュメントごとのビルドディレクトリ（.auxなどの中間ファイルを再レンダリングで再利用）
+LATEX_BUILD_DIR_ENABLED = os.getenv("LATEX_BUILD_DIR_ENABLED", "True") == "True"
+LATEX_BUILD_DIR_ROOT = LATEX_CACHE_ROOT / "builds"
+LATEX_BUILD_DIR_MAX_DIRS = int(os.getenv("LATEX_BUILD_DIR_MAX_DIRS", "500"))
+LATEX_BUILD_DIR_MAX_IDLE_SECONDS = int(os.getenv("LATEX_BUILD_DIR_MAX_IDLE_SECONDS", "86400"))
 
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24時間